@@ -1,14 +1,31 @@
 import os
 import time
 import argparse
+import threading
 import traceback
 import bittensor as bt
-from typing import Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
-from reasoning.puzzle import SlidingPuzzle
-from reasoning.search import AStarSearch
+from reasoning.puzzle import (
+    PackedSlidingPuzzle, AdditivePatternDatabase, PDBSlidingPuzzle, SolutionCache, puzzle_key,
+    canonicalize, transform_actions, encode_moves, decode_board, DistanceTable, HierarchicalSolver,
+)
+from reasoning.search import (
+    ARAStarSearch, AStarSearch, BidirectionalSearch, BucketFrontier, IDAStarSearch, SolverPool,
+    PoolFullError, Portfolio, Configuration, RETURN_MARGIN, HDAStarSearch,
+)
 
-from protocol import ReasoningSynapse
+from protocol import ReasoningSynapse, BATCH_TYPE
+
+
+class PendingSolve(NamedTuple):
+    """A sliding puzzle being answered: from the cache, a pool solve, or both."""
+    transform: int  # Symmetry transform from the board as sent to the canonical board
+    cached: Optional[Tuple[List[Tuple[int, int, int, int]], bool]]  # Cached (solution, optimal)
+    future: Optional[Future]  # Pool solve of the canonical board
+    started: bool  # Whether this request started the solve
+    parallel: Optional[Future] = None  # HDA* solve of the canonical board beside the pool solve
 
 
 class Miner:
@@ -16,6 +33,10 @@ class Miner:
         self.config = self.get_config()
         self.setup_logging()
         self.setup_bittensor_objects()
+        self.setup_pattern_databases()
+        self.setup_hierarchical_solver()
+        self.setup_solver_pool()
+        self.setup_solution_cache()
 
     def get_config(self):
         # Set up the configuration parser
@@ -30,6 +51,88 @@ class Miner:
         parser.add_argument(
             "--netuid", type=int, default=1, help="The chain subnet uid."
         )
+        # Directory of pattern databases built with `python -m reasoning.puzzle.pdb`.
+        parser.add_argument(
+            "--pdb_dir",
+            default=None,
+            help="Directory holding sliding puzzle pattern databases.",
+        )
+        # Seconds kept back from the validator's timeout for serialization and transfer.
+        parser.add_argument(
+            "--safety_margin",
+            type=float,
+            default=1.0,
+            help="Seconds reserved from the request timeout for returning the response.",
+        )
+        parser.add_argument(
+            "--return_margin",
+            type=float,
+            default=RETURN_MARGIN,
+            help="Seconds by which solves end before the miner stops waiting, for returning their result.",
+        )
+        # Solver process pool sizing.
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of solver processes.",
+        )
+        parser.add_argument(
+            "--max_pending",
+            type=int,
+            default=None,
+            help="Maximum queued solves before requests are turned away (default 2 x workers).",
+        )
+        parser.add_argument(
+            "--memory_limit",
+            type=int,
+            default=None,
+            help="Resident memory budget per solver process in MB; searches degrade to IDA* near it.",
+        )
+        # Boards this wide or wider are solved by stages instead of searched.
+        parser.add_argument(
+            "--hierarchical_size",
+            type=int,
+            default=5,
+            help="Smallest board width answered by the fast hierarchical solver.",
+        )
+        # Portfolio solving: race several search configurations per puzzle.
+        parser.add_argument(
+            "--portfolio_size",
+            type=int,
+            default=0,
+            help="Number of search configurations raced per puzzle, best by past wins first; 0 runs ARA* alone.",
+        )
+        parser.add_argument(
+            "--portfolio_history",
+            default="~/.reasoning/portfolio.jsonl",
+            help="Append-only log of portfolio winners; empty to keep win counts in memory only.",
+        )
+        # Parallel HDA* for hard boards, in worker processes of its own.
+        parser.add_argument(
+            "--hda_workers",
+            type=int,
+            default=0,
+            help="Worker processes of an HDA* solve run beside the pool on hard boards; 0 disables HDA*.",
+        )
+        parser.add_argument(
+            "--hda_min_heuristic",
+            type=float,
+            default=40,
+            help="Heuristic estimate of the solution length from which a board is also solved with HDA*.",
+        )
+        # Solution cache.
+        parser.add_argument(
+            "--cache_path",
+            default="~/.reasoning/solutions.jsonl",
+            help="Append-only file of cached solutions; empty to keep the cache in memory only.",
+        )
+        parser.add_argument(
+            "--cache_size",
+            type=int,
+            default=10000,
+            help="Number of cached solutions held in memory.",
+        )
         # Adds subtensor specific arguments.
         bt.subtensor.add_args(parser)
         # Adds logging specific arguments.
@@ -90,6 +193,66 @@ class Miner:
             )
             bt.logging.info(f"Running miner on uid: {self.my_subnet_uid}")
 
+    def setup_pattern_databases(self):
+        # Memory-map pattern databases for every board size found in pdb_dir.
+        self.pattern_databases = {}
+        if self.config.pdb_dir is None:
+            return
+        pdb_dir = os.path.expanduser(self.config.pdb_dir)
+        for size in (3, 4):
+            try:
+                self.pattern_databases[size] = AdditivePatternDatabase.load(pdb_dir, size)
+                bt.logging.info(f"Loaded {size}x{size} pattern databases from {pdb_dir}")
+            except FileNotFoundError:
+                bt.logging.info(f"No {size}x{size} pattern databases in {pdb_dir}")
+
+    def setup_hierarchical_solver(self):
+        # Finishes the last 3x3 of large boards from the distance table when available.
+        distance_table = None
+        if self.config.pdb_dir is not None:
+            try:
+                distance_table = DistanceTable.load(os.path.expanduser(self.config.pdb_dir), 3)
+            except FileNotFoundError:
+                bt.logging.info("No 3x3 distance table; large boards finish with IDA*.")
+        self.hierarchical_solver = HierarchicalSolver(distance_table)
+
+    def setup_solver_pool(self):
+        # Start solver processes up front, so searches run in parallel and
+        # never hold the GIL of the axon's request threads.
+        bt.logging.info(f"Starting {self.config.workers} solver processes.")
+        self.pool = SolverPool(
+            workers=self.config.workers,
+            max_pending=self.config.max_pending,
+            preload=["reasoning.puzzle"],
+            memory_limit=self.config.memory_limit * 2**20 if self.config.memory_limit else None,
+        )
+        self.portfolio = None
+        if self.config.portfolio_size > 0:
+            self.portfolio = Portfolio(self.pool, self.config.portfolio_history or None)
+            bt.logging.info(f"Racing {self.config.portfolio_size} search configurations per puzzle.")
+        self.hda_executor = None
+        if self.config.hda_workers > 0:
+            # HDA* starts worker processes for every solve, which the pool's
+            # daemonic workers cannot, so it runs from a thread of the miner,
+            # one solve at a time.
+            self.hda_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hda")
+            self.hda_slot = threading.Lock()
+            bt.logging.info(f"Solving hard boards with HDA* on {self.config.hda_workers} processes as well.")
+            # Start the forkserver now rather than on the first hard board, which
+            # would otherwise spend about two seconds of its budget on it
+            warmup = [[1, 0, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11], [12, 13, 14, 15]]
+            for problem in self.search_problems(warmup).values():
+                HDAStarSearch(problem, workers=1).solve(time_limit=30)
+
+    def setup_solution_cache(self):
+        # Solutions survive restarts in an append-only file; identical puzzles
+        # being solved right now share one solve.
+        path = os.path.expanduser(self.config.cache_path) if self.config.cache_path else None
+        self.solution_cache = SolutionCache(path, capacity=self.config.cache_size)
+        bt.logging.info(f"Loaded {len(self.solution_cache)} cached solutions.")
+        self.inflight: Dict[str, Tuple[Future, float]] = {}  # Key -> (solve, monotonic deadline)
+        self.inflight_lock = threading.Lock()
+
     def blacklist_fn(self, synapse: ReasoningSynapse) -> Tuple[bool, str]:
         # Ignore requests from unrecognized entities.
         if synapse.dendrite.hotkey not in self.metagraph.hotkeys:
@@ -102,9 +265,206 @@ class Miner:
         )
         return False, None
 
+    def get_time_budget(self, synapse: ReasoningSynapse) -> float:
+        """
+        Seconds the validator is still listening for a response, minus the safety margin.
+        The dendrite stamps the request nonce with its send time in nanoseconds; the
+        elapsed time is only trusted if clocks look in sync.
+        """
+        timeout = synapse.timeout or 12.0
+        elapsed = 0.0
+        if synapse.dendrite is not None and synapse.dendrite.nonce:
+            sent_elapsed = time.time() - synapse.dendrite.nonce / 1e9
+            if 0 <= sent_elapsed < timeout:
+                elapsed = sent_elapsed
+        return max(0.0, timeout - elapsed - self.config.safety_margin)
+
+    def search_problems(self, board: List[List[int]]) -> Dict[str, PackedSlidingPuzzle]:
+        # Search formulations of board by heuristic, strongest first.
+        problems: Dict[str, PackedSlidingPuzzle] = {}
+        pdb = self.pattern_databases.get(len(board))
+        if pdb is not None:
+            problems["pdb"] = PDBSlidingPuzzle(board, pdb)
+        problems["md+lc"] = PackedSlidingPuzzle(board)
+        return problems
+
+    def submit_solve(self, key: str, board: List[List[int]], time_budget: float) -> Tuple[Future, bool]:
+        """
+        Start solving board in the pool, or attach to the solve of the same puzzle already running
+        if it ends within time_budget; a solve that ends later would not answer this request in
+        time, so a solve with this request's own deadline is started instead.
+        Returns the future and whether this call started it. Raises PoolFullError.
+        """
+        expires_at = time.monotonic() + time_budget
+        with self.inflight_lock:
+            running = self.inflight.get(key)
+            if running is not None and running[1] <= expires_at:
+                return running[0], False
+            if self.portfolio is not None:
+                configurations = self.portfolio.schedule(
+                    self.portfolio_configurations(board), self.config.portfolio_size
+                )
+                future = self.portfolio.submit(configurations, time_budget, instance=key)
+            else:
+                # Anytime search: a solution is available long before the deadline
+                # and is improved towards optimal while time remains.
+                problem = next(iter(self.search_problems(board).values()))
+                future = self.pool.submit(ARAStarSearch, problem, time_limit=time_budget)
+            if running is None:
+                self.inflight[key] = (future, expires_at)
+        future.add_done_callback(lambda done: self.finish_solve(key, done))
+        return future, True
+
+    def portfolio_configurations(self, board: List[List[int]]) -> List[Configuration]:
+        # Anytime weighted search, and optimal searches that stop the race when they finish,
+        # each with every available heuristic: pattern databases are stronger, but
+        # Manhattan + linear conflict is cheaper per node.
+        configurations = []
+        for heuristic, problem in self.search_problems(board).items():
+            configurations += [
+                Configuration(f"ara*/{heuristic}", ARAStarSearch, problem),
+                Configuration(f"a*-bucket/{heuristic}", AStarSearch, problem,
+                              {"frontier": BucketFrontier}, optimal=True),
+                Configuration(f"ida*/{heuristic}", IDAStarSearch, problem, optimal=True),
+                Configuration(f"mm/{heuristic}", BidirectionalSearch, problem, optimal=True),
+            ]
+        return configurations
+
+    def submit_parallel(self, board: List[List[int]], time_budget: float) -> Optional[Future]:
+        """
+        Start an HDA* solve of board if HDA* is enabled, the heuristic estimate
+        reaches hda_min_heuristic and no other HDA* solve is running.
+        """
+        if self.hda_executor is None:
+            return None
+        problem = next(iter(self.search_problems(board).values()))
+        if problem.heuristic(problem.initial_state()) < self.config.hda_min_heuristic:
+            return None
+        if not self.hda_slot.acquire(blocking=False):
+            bt.logging.debug("HDA* is busy with another board.")
+            return None
+        try:
+            future = self.hda_executor.submit(self.solve_parallel, problem, time_budget)
+        except RuntimeError:
+            self.hda_slot.release()
+            raise
+        future.add_done_callback(lambda done: self.hda_slot.release())
+        return future
+
+    def solve_parallel(self, problem: PackedSlidingPuzzle, time_budget: float) -> Dict:
+        result = HDAStarSearch(problem, workers=self.config.hda_workers).solve(time_limit=time_budget)
+        # HDA* only returns once it has proven its solution optimal
+        return dict(result, weight=1.0, suboptimality_bound=1.0 if result['success'] else None)
+
+    def cancel_solve(self, future: Future):
+        if self.portfolio is not None:
+            self.portfolio.cancel(future)
+        else:
+            self.pool.cancel(future)
+
+    def finish_solve(self, key: str, future: Future):
+        # Runs once per solve, whichever request is waiting on it.
+        with self.inflight_lock:
+            running = self.inflight.get(key)
+            if running is not None and running[0] is future:
+                del self.inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if result['success']:
+            optimal = result['suboptimality_bound'] <= 1.0
+            if self.solution_cache.put(key, result['solution'], optimal):
+                bt.logging.debug(f"Cached {'optimal' if optimal else 'bounded'} solution for {key}")
+
+    def set_solution(self, synapse: ReasoningSynapse, solution: List[Tuple[int, int, int, int]]):
+        # Validators that send the compact problem also read the compact solution.
+        if synapse.problem_compact is not None:
+            synapse.solution_moves = encode_moves(solution)
+        else:
+            synapse.solution = solution
+
+    def begin_solve(self, problem: List[List[int]], time_budget: float) -> PendingSolve:
+        """Answer problem from the cache if it holds an optimal solution; otherwise start or join its solve."""
+        # Transposed puzzles share one cache entry and one solve; solutions
+        # are found for the canonical board and mapped back.
+        board, transform = canonicalize(problem)
+        key = puzzle_key(board)
+        cached = self.solution_cache.get(key)
+        if cached is not None and cached[1]:
+            bt.logging.info("Using cached optimal solution.")
+            return PendingSolve(transform, cached, None, False)
+        if len(board) >= self.config.hierarchical_size:
+            # No search finishes on boards this large; answer in milliseconds
+            try:
+                solution = self.hierarchical_solver.solve(board)
+            except (ValueError, RuntimeError) as e:
+                bt.logging.warning(f"Cannot solve problem: {e}")
+                return PendingSolve(transform, None, None, False)
+            bt.logging.info(f"Solved {len(board)}x{len(board)} board by stages in {len(solution)} moves.")
+            return PendingSolve(transform, (solution, False), None, False)
+        try:
+            future, started = self.submit_solve(key, board, time_budget)
+        except PoolFullError as e:
+            bt.logging.warning(f"Solver pool is full, skipping problem: {e}")
+            return PendingSolve(transform, cached, None, False)
+        if not started:
+            bt.logging.info("Attached to the running solve of the same puzzle.")
+            return PendingSolve(transform, cached, future, started)
+        parallel = self.submit_parallel(board, time_budget)
+        if parallel is not None:
+            bt.logging.info("Solving the board with HDA* as well.")
+            parallel.add_done_callback(lambda done: self.finish_solve(key, done))
+        return PendingSolve(transform, cached, future, started, parallel)
+
+    def end_solve(self, pending: PendingSolve, wait_until: float) -> Optional[List[Tuple[int, int, int, int]]]:
+        """
+        Wait until the monotonic time wait_until for a solve started by begin_solve.
+        Returns the best solution found or cached, for the board as sent, or None.
+        """
+        solution = pending.cached[0] if pending.cached is not None else None
+        if pending.future is not None:
+            try:
+                result = pending.future.result(timeout=max(0.0, wait_until - time.monotonic()))
+            except Exception as e:
+                if pending.started:
+                    self.cancel_solve(pending.future)
+                bt.logging.warning(f"Solve failed: {e!r}")
+                result = {'success': False}
+            bt.logging.info(f"Result: {result}")
+            if result.get('degraded'):
+                bt.logging.warning(
+                    f"Solve reached the memory limit at {result['peak_memory'] >> 20} MB and degraded."
+                )
+            if result['success']:
+                bt.logging.info(
+                    f"Problem solved with weight {result['weight']}, suboptimality bound "
+                    f"{result['suboptimality_bound']}."
+                )
+                if result.get('configuration'):
+                    bt.logging.info(f"Portfolio winner: {result['configuration']}.")
+                # A bounded solution cached earlier may still beat this one
+                if solution is None or len(result['solution']) < len(solution):
+                    solution = result['solution']
+        if pending.parallel is not None:
+            try:
+                result = pending.parallel.result(timeout=max(0.0, wait_until - time.monotonic()))
+            except Exception as e:
+                bt.logging.warning(f"HDA* solve failed: {e!r}")
+                result = {'success': False}
+            if result['success']:
+                bt.logging.info(f"HDA* solved the problem optimally in {result['time']:.2f} s.")
+                if solution is None or len(result['solution']) < len(solution):
+                    solution = result['solution']
+        if solution is None:
+            return None
+        return transform_actions(solution, pending.transform)
+
     def forward(self, synapse: ReasoningSynapse) -> ReasoningSynapse:
         """
-        Processes the incoming synapse by performing AStarSearch on the data.
+        Processes the incoming synapse by performing anytime ARA* search on the data.
+        Optimal solutions are answered from the cache, and concurrent requests for the
+        same puzzle share one search. The items of a batch synapse are solved in
+        parallel in the solver pool, under the deadline of the whole request.
 
         Args:
             synapse (ReasoningSynapse): The synapse object containing the starting state of the reasoning problem.
@@ -112,16 +472,39 @@ class Miner:
         Returns:
             ReasoningSynapse: The synapse object with a list of actions to solve the problem.
         """
+        time_budget = self.get_time_budget(synapse)
+        wait_until = time.monotonic() + time_budget
+        # Solves stop early enough for their result to arrive before wait_until
+        solve_budget = max(0.0, time_budget - self.config.return_margin)
         if synapse.type == "sliding_puzzle":
-            problem = synapse.problem
+            problem = synapse.get_problem()
             bt.logging.info(f"Received {synapse.type} problem from validator: {problem}")
-            problem = SlidingPuzzle(problem)
-            solver = AStarSearch(problem)
-            result = solver.solve(time_limit=30)
-            bt.logging.info(f"Result: {result}")
-            if result['success']:
-                bt.logging.info("Problem solved. Submitting solution to validator.")
-                synapse.solution = result['solution']
+            solution = self.end_solve(self.begin_solve(problem, solve_budget), wait_until)
+            if solution is not None:
+                bt.logging.info("Submitting solution to validator.")
+                self.set_solution(synapse, solution)
+        elif synapse.type == BATCH_TYPE and synapse.batch:
+            bt.logging.info(f"Received batch of {len(synapse.batch)} problems from validator.")
+            # Start every solve before waiting on any, so they run side by side
+            pending: List[Optional[PendingSolve]] = []
+            for item in synapse.batch:
+                if item.type != "sliding_puzzle":
+                    pending.append(None)
+                    continue
+                try:
+                    problem = decode_board(item.problem)
+                except ValueError as e:
+                    bt.logging.warning(f"Skipping malformed batch problem: {e}")
+                    pending.append(None)
+                    continue
+                pending.append(self.begin_solve(problem, solve_budget))
+            for item, item_pending in zip(synapse.batch, pending):
+                if item_pending is not None:
+                    solution = self.end_solve(item_pending, wait_until)
+                    if solution is not None:
+                        item.solution = encode_moves(solution)
+            solved = sum(item.solution is not None for item in synapse.batch)
+            bt.logging.info(f"Submitting {solved} of {len(synapse.batch)} batch solutions to validator.")
         return synapse
 
     def setup_axon(self):
@@ -167,6 +550,10 @@ class Miner:
 
             except KeyboardInterrupt:
                 self.axon.stop()
+                self.pool.close()
+                if self.hda_executor is not None:
+                    self.hda_executor.shutdown(wait=False)
+                self.solution_cache.close()
                 bt.logging.success("Miner killed by keyboard interrupt.")
                 break
             except Exception as e:
@@ -1,6 +1,26 @@
 from typing import List, Optional, Tuple, Dict
 
 import bittensor as bt
+from pydantic import BaseModel
+
+from reasoning.puzzle.encoding import decode_board
+
+
+BATCH_TYPE = "batch"
+
+
+class ProblemItem(BaseModel):
+    """
+    One problem of a batch synapse, in compact form.
+
+    Attributes:
+    - type: The problem type, as ReasoningSynapse.type.
+    - problem: The board, one character per tile (reasoning.puzzle.encoding.encode_board).
+    - solution: The solution as a string of U/D/L/R moves, filled by the miner.
+    """
+    type: str
+    problem: str
+    solution: Optional[str] = None
 
 
 class ReasoningSynapse(bt.Synapse):
@@ -10,11 +30,43 @@ class ReasoningSynapse(bt.Synapse):
 
     Attributes:
     - problem: A list of lists of ints indicating the game board state.
+    - problem_compact: The same board as a string of one character per tile
+      (reasoning.puzzle.encoding.encode_board). Validators that send it accept
+      solution_moves.
     - solution: A list of actions  problem.
+    - solution_moves: The solution as a string of U/D/L/R moves of the empty tile
+      (reasoning.puzzle.encoding.encode_moves); used instead of solution when set.
+    - batch: Several problems, possibly of different types, each with its own
+      solution. Used instead of the single problem when type is BATCH_TYPE.
     """
     # Filled by validator
     type: str
-    problem: List[List[int]] # Update this when adding more problem types
+    problem: Optional[List[List[int]]] = None # Update this when adding more problem types
+    problem_compact: Optional[str] = None
 
     # Filled by miner
     solution: Optional[List[Tuple[int, int, int, int]]] = None # Update this when adding more problem types
+    solution_moves: Optional[str] = None
+
+    # Batch of problems, filled by the validator and solved in place by the miner
+    batch: Optional[List[ProblemItem]] = None
+
+    def get_problem(self) -> List[List[int]]:
+        """The board, from problem or else decoded from problem_compact."""
+        if self.problem is not None:
+            return self.problem
+        if self.problem_compact is None:
+            raise ValueError("Synapse has no problem")
+        return decode_board(self.problem_compact)
+
+    def get_solution(self):
+        """The solution in whichever form the miner sent it: a direction string, action tuples or None."""
+        if self.solution_moves is not None:
+            return self.solution_moves
+        return self.solution
+
+    def get_batch_solutions(self, count: int) -> List[Optional[str]]:
+        """Solution of each of the count batch items sent, None where missing."""
+        if self.batch is None or len(self.batch) != count:
+            return [None] * count
+        return [item.solution for item in self.batch]
@@ -1,3 +1,9 @@
-from reasoning.puzzle.puzzle import SlidingPuzzle
+from reasoning.puzzle.puzzle import SlidingPuzzle, PackedSlidingPuzzle
 from reasoning.puzzle.generator import SlidingPuzzleGenerator
-from reasoning.puzzle.reward import get_reward
+from reasoning.puzzle.reward import get_reward, get_rewards, get_batch_rewards, update_moving_average
+from reasoning.puzzle.pdb import PatternDatabase, AdditivePatternDatabase, PDBSlidingPuzzle
+from reasoning.puzzle.distance import DistanceTable
+from reasoning.puzzle.cache import SolutionCache, puzzle_key
+from reasoning.puzzle.symmetry import canonicalize, transform_board, transform_actions
+from reasoning.puzzle.encoding import encode_moves, decode_moves, encode_board, decode_board
+from reasoning.puzzle.hierarchical import HierarchicalSolver, shorten_moves
@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Action = Tuple[int, int, int, int]
+Entry = Tuple[List[Action], bool]  # Solution, proven optimal
+
+
+def puzzle_key(board: Sequence[Sequence[int]]) -> str:
+    """Canonical encoding of a board: width, then the tiles in row-major order."""
+    return f"{len(board)}:{','.join(str(tile) for row in board for tile in row)}"
+
+
+def is_better(solution: Sequence[Action], optimal: bool, entry: Optional[Entry]) -> bool:
+    """True if solution should replace entry: it is shorter, or as short and newly proven optimal."""
+    if entry is None:
+        return True
+    cached, cached_optimal = entry
+    if len(solution) != len(cached):
+        return len(solution) < len(cached)
+    return optimal and not cached_optimal
+
+
+class SolutionCache:
+    """
+    Solutions by puzzle key, with the most recently used entries held in
+    memory and every entry kept in an append-only JSON lines file.
+
+    An entry is replaced only by a better solution (is_better), and each
+    replacement is appended to the file, so the last record for a key is
+    its best. The file offset of that record is indexed for every key;
+    entries evicted from memory are read back from disk on the next lookup.
+    Safe to use from several threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 10000):
+        self.path = path
+        self.capacity = capacity
+        self._entries: 'OrderedDict[str, Entry]' = OrderedDict()
+        self._offsets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = open(path, "a+b")
+            self._load()
+
+    def _load(self) -> None:
+        """Index the last record of every key in the file."""
+        self._file.seek(0)
+        offset = 0
+        for line in self._file:
+            try:
+                record = json.loads(line)
+                self._offsets[record["key"]] = offset
+            except (ValueError, KeyError):
+                pass  # Torn write from a crash; later records still count
+            offset += len(line)
+        if offset and not line.endswith(b"\n"):
+            # Terminate a torn last record so the next append starts a new line
+            self._file.write(b"\n")
+            self._file.flush()
+
+    def _read(self, offset: int) -> Entry:
+        self._file.seek(offset)
+        record = json.loads(self._file.readline())
+        return [tuple(action) for action in record["solution"]], record["optimal"]
+
+    def _remember(self, key: str, entry: Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Entry]:
+        """(solution, optimal) for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            offset = self._offsets.get(key)
+            if offset is None:
+                return None
+            entry = self._read(offset)
+            self._remember(key, entry)
+            return entry
+
+    def put(self, key: str, solution: Sequence[Action], optimal: bool) -> bool:
+        """Store solution for key if it is better than the cached one. Returns True if stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and key in self._offsets:
+                entry = self._read(self._offsets[key])
+            if not is_better(solution, optimal, entry):
+                return False
+            entry = ([tuple(action) for action in solution], optimal)
+            self._remember(key, entry)
+            if self._file is not None:
+                record = json.dumps({"key": key, "solution": entry[0], "optimal": optimal})
+                self._file.seek(0, os.SEEK_END)
+                self._offsets[key] = self._file.tell()
+                self._file.write(record.encode() + b"\n")
+                self._file.flush()
+            return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._offsets.keys() | self._entries.keys())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,105 @@
+import argparse
+import os
+import random
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from reasoning.puzzle.tables import DEFAULT_TABLE_DIR, ByteTable, save_table
+from reasoning.puzzle.vectorized import SlideMoves, pack_boards, rank_boards, unpack_boards
+from reasoning.search.layers import breadth_first_layers
+from reasoning.search.ranking import permutation_count, rank_permutation, unrank_permutation
+
+UNREACHABLE = 255
+
+
+def distance_filename(size: int) -> str:
+    return f"distance-{size}x{size}.bin"
+
+
+def build_distance_table(size: int = 3) -> bytearray:
+    """
+    Optimal distance to the goal of every board, indexed by the
+    rank_permutation rank of its row-major tiles, by breadth-first search
+    from the goal over packed states (breadth_first_layers). Boards of the
+    other parity are UNREACHABLE. Only practical for 3x3 (9! entries) and smaller.
+    """
+    goal = [[i * size + j for j in range(size)] for i in range(size)]
+    table = np.full(permutation_count(size * size), UNREACHABLE, dtype=np.uint8)
+    for depth, layer in breadth_first_layers(pack_boards([goal]), SlideMoves(size).expand):
+        table[rank_boards(unpack_boards(layer, size))] = depth
+    return bytearray(table)
+
+
+class DistanceTable:
+    """
+    Exact optimal distance of every board of one size, held in memory after
+    building or memory-mapped from disk. Also samples boards at a given
+    distance uniformly.
+    """
+
+    def __init__(self, size: int, table: Union[bytearray, ByteTable]):
+        self.size = size
+        if len(table) != permutation_count(size * size):
+            raise ValueError("Table size does not match board size")
+        self.table = table
+        self._ranks: Dict[int, np.ndarray] = {}  # Distance -> ranks of the boards at that distance
+
+    @classmethod
+    def build(cls, size: int = 3) -> 'DistanceTable':
+        return cls(size, build_distance_table(size))
+
+    @classmethod
+    def load(cls, directory: str = DEFAULT_TABLE_DIR, size: int = 3) -> 'DistanceTable':
+        table = ByteTable(os.path.join(directory, distance_filename(size)))
+        return cls(table.meta["size"], table)
+
+    def save(self, directory: str = DEFAULT_TABLE_DIR) -> None:
+        data = self.table.view() if isinstance(self.table, ByteTable) else self.table
+        save_table(os.path.join(directory, distance_filename(self.size)), data, {
+            "kind": "distance",
+            "size": self.size,
+        })
+
+    def _array(self) -> np.ndarray:
+        data = self.table.view() if isinstance(self.table, ByteTable) else self.table
+        return np.frombuffer(data, dtype=np.uint8)
+
+    @property
+    def max_distance(self) -> int:
+        array = self._array()
+        return int(array[array != UNREACHABLE].max())
+
+    def distance(self, board: List[List[int]]) -> Optional[int]:
+        """Optimal number of moves to solve board, or None if it is unsolvable."""
+        value = self.table[rank_permutation([tile for row in board for tile in row])]
+        return None if value == UNREACHABLE else value
+
+    def sample(self, distance: int, rng: Optional[random.Random] = None) -> List[List[int]]:
+        """A uniformly random board exactly distance moves from the goal."""
+        ranks = self._ranks.get(distance)
+        if ranks is None:
+            ranks = self._ranks[distance] = np.flatnonzero(self._array() == distance)
+        if not len(ranks):
+            raise ValueError(f"No {self.size}x{self.size} boards at distance {distance}")
+        rank = int(ranks[(rng or random).randrange(len(ranks))])
+        flat = unrank_permutation(rank, self.size * self.size)
+        return [flat[i * self.size:(i + 1) * self.size] for i in range(self.size)]
+
+
+def main():
+    """
+    Build the distance table offline, e.g.
+    python -m reasoning.puzzle.distance --out ~/.reasoning/tables
+    """
+    parser = argparse.ArgumentParser(description="Build the sliding puzzle distance table.")
+    parser.add_argument("--size", type=int, default=3, help="Board width.")
+    parser.add_argument("--out", default=DEFAULT_TABLE_DIR, help="Output directory.")
+    args = parser.parse_args()
+    out = os.path.expanduser(args.out)
+    print(f"Building {os.path.join(out, distance_filename(args.size))}")
+    DistanceTable.build(args.size).save(out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from typing import Dict, List, Sequence, Tuple
+
+Action = Tuple[int, int, int, int]
+
+# Direction the empty tile moves in, one character per move
+DIRECTIONS: Dict[str, Tuple[int, int]] = {
+    "U": (-1, 0),
+    "D": (1, 0),
+    "L": (0, -1),
+    "R": (0, 1),
+}
+_LETTERS = {delta: letter for letter, delta in DIRECTIONS.items()}
+
+# One character per tile; boards up to 8x8 (64 tiles)
+TILE_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-_"
+_TILE_VALUES = {char: value for value, char in enumerate(TILE_ALPHABET)}
+
+
+def encode_moves(actions: Sequence[Action]) -> str:
+    """
+    Direction string of a solution, one of U, D, L, R per move.
+    Raises ValueError if an action does not move the empty tile by one cell.
+    """
+    letters = []
+    for r1, c1, r2, c2 in actions:
+        letter = _LETTERS.get((r2 - r1, c2 - c1))
+        if letter is None:
+            raise ValueError(f"Not a single-cell move: {(r1, c1, r2, c2)}")
+        letters.append(letter)
+    return "".join(letters)
+
+
+def decode_moves(moves: str, board: Sequence[Sequence[int]]) -> List[Action]:
+    """
+    Action tuples of a direction string, starting from the empty tile of board.
+    Moves are not checked against the board edges; use the verifier for that.
+    Raises ValueError on an unknown direction.
+    """
+    size = len(board)
+    empty = [tile for row in board for tile in row].index(0)
+    row, col = divmod(empty, size)
+    actions = []
+    for letter in moves:
+        delta = DIRECTIONS.get(letter)
+        if delta is None:
+            raise ValueError(f"Unknown direction: {letter!r}")
+        actions.append((row, col, row + delta[0], col + delta[1]))
+        row, col = row + delta[0], col + delta[1]
+    return actions
+
+
+def encode_board(board: Sequence[Sequence[int]]) -> str:
+    """Row-major tiles, one TILE_ALPHABET character each."""
+    if len(board) * len(board) > len(TILE_ALPHABET):
+        raise ValueError("Boards larger than 8x8 have no compact encoding")
+    return "".join(TILE_ALPHABET[tile] for row in board for tile in row)
+
+
+def decode_board(encoded: str) -> List[List[int]]:
+    """Inverse of encode_board. Raises ValueError if encoded is not a square board."""
+    size = int(round(len(encoded) ** 0.5))
+    if size * size != len(encoded):
+        raise ValueError(f"Encoded board of length {len(encoded)} is not square")
+    try:
+        flat = [_TILE_VALUES[char] for char in encoded]
+    except KeyError as e:
+        raise ValueError(f"Invalid tile character: {e}")
+    return [flat[i * size:(i + 1) * size] for i in range(size)]
@@ -1,24 +1,67 @@
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 import random
-import copy
+
+import numpy as np
+
+from reasoning.puzzle.distance import DistanceTable
+from reasoning.puzzle.pdb import AdditivePatternDatabase, PDBSlidingPuzzle
+from reasoning.puzzle.puzzle import PackedSlidingPuzzle, SlidingPuzzle
+from reasoning.puzzle.symmetry import transpose_cells
+from reasoning.search.algorithms import IDAStarSearch
+from reasoning.search.ranking import permutation_count
+
+# Largest optimal distance of any board, by board width
+DIAMETERS = {1: 0, 2: 6, 3: 31, 4: 80}
+
+
+def diameter_bound(size: int) -> int:
+    """
+    Largest optimal distance of a size x size board: exact up to 4x4, and
+    otherwise bounded by the number of solvable boards.
+    """
+    if size in DIAMETERS:
+        return DIAMETERS[size]
+    return permutation_count(size * size) // 2 - 1
+
 
 class SlidingPuzzleGenerator:
-    """Generates a random sliding puzzle."""
+    """
+    Generates a random sliding puzzle.
+    Puzzles at an exact optimal distance are sampled from distance_table when
+    it matches the board size, and otherwise found with an optimal solver
+    (IDA*, using pdb when given).
+    """
 
-    def __init__(self, size: int = 3):
+    def __init__(self, size: int = 3, distance_table: Optional[DistanceTable] = None,
+                 pdb: Optional[AdditivePatternDatabase] = None):
         self.size = size
+        if distance_table is not None and distance_table.size != size:
+            distance_table = None
+        if pdb is not None and pdb.size != size:
+            pdb = None
+        self.distance_table = distance_table
+        self.pdb = pdb
         self.goal_state = [
             [i * self.size + j for j in range(self.size)]
             for i in range(self.size)
         ]
+        # Neighbouring cells of every cell, padded with -1 to four entries
+        cells = self.size * self.size
+        self._neighbours = np.full((cells, 4), -1, dtype=np.int64)
+        for cell in range(cells):
+            i, j = divmod(cell, self.size)
+            for k, (di, dj) in enumerate([(-1, 0), (1, 0), (0, -1), (0, 1)]):
+                if 0 <= i + di < self.size and 0 <= j + dj < self.size:
+                    self._neighbours[cell, k] = (i + di) * self.size + j + dj
+        self._transpose = np.array(transpose_cells(self.size), dtype=np.uint8)
 
     def generate(self, num_moves: int = 100) -> List[List[int]]:
         """Generate a random puzzle by walking backwards from goal state."""
-        current = copy.deepcopy(self.goal_state)
+        current = [row[:] for row in self.goal_state]
+        empty_pos = (0, 0)
         prev_move = None  # Track previous move to avoid undoing it
         for _ in range(num_moves):
             # Get valid moves
-            empty_pos = self._find_empty(current)
             moves = self._get_valid_moves(empty_pos)
             # Remove the reverse of the previous move to avoid undoing it
             if prev_move:
@@ -29,22 +72,137 @@ class SlidingPuzzleGenerator:
             if moves:
                 move = random.choice(moves)
                 self._make_move(current, empty_pos, move)
+                empty_pos = (empty_pos[0] + move[0], empty_pos[1] + move[1])
                 prev_move = move
         return current
 
+    def generate_at_distance(self, distance: int, time_limit: Optional[float] = None,
+                             max_attempts: int = 100) -> List[List[int]]:
+        """
+        Generate a puzzle whose optimal solution has exactly distance moves.
+        Without a distance table, random walks are solved optimally until one
+        is at least distance moves from the goal; the board distance moves
+        from the goal along its optimal path is returned. Every solve is
+        limited to time_limit seconds; a timed out solve is retried with a
+        new walk. Raises ValueError if distance is beyond diameter_bound, or
+        if max_attempts walks do not reach it.
+        """
+        if not 0 <= distance <= diameter_bound(self.size):
+            raise ValueError(
+                f"No {self.size}x{self.size} puzzles at distance {distance}; "
+                f"the largest distance is at most {diameter_bound(self.size)}"
+            )
+        if self.distance_table is not None:
+            return self.distance_table.sample(distance)
+        walk = distance
+        for _ in range(max_attempts):
+            scramble = self.generate(walk)
+            if self.pdb is not None:
+                problem = PDBSlidingPuzzle(scramble, self.pdb)
+            else:
+                problem = PackedSlidingPuzzle(scramble)
+            result = IDAStarSearch(problem).solve(time_limit=time_limit)
+            if not result['success']:
+                continue
+            solution = result['solution']
+            if len(solution) < distance:
+                # Walks fold back on themselves; try longer ones
+                walk += 2
+                continue
+            # Every suffix of an optimal path is optimal
+            puzzle = SlidingPuzzle(scramble)
+            board = puzzle.initial_state()
+            for action in solution[:len(solution) - distance]:
+                board = puzzle.result(board, action)
+            return board
+        raise ValueError(f"No puzzle at distance {distance} found in {max_attempts} attempts")
+
+    def generate_from_distribution(self, distribution: Dict[int, float],
+                                   time_limit: Optional[float] = None) -> Tuple[List[List[int]], int]:
+        """Sample an optimal distance with the given relative weights; return a puzzle at it and the distance."""
+        distance = random.choices(list(distribution), weights=list(distribution.values()))[0]
+        return self.generate_at_distance(distance, time_limit), distance
+
     def generate_multiple(self, count: int, min_moves: int = 10,
                           max_moves: int = 100) -> List[List[List[int]]]:
-        """Generate multiple unique puzzles."""
-        puzzles = []
+        """Generate multiple unique puzzles; transposed copies count as the same puzzle."""
+        return [
+            board.reshape(self.size, self.size).tolist()
+            for board in self.generate_batch(count, min_moves, max_moves)
+        ]
+
+    def random_walks(self, count: int, min_moves: int, max_moves: int,
+                     rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        count random walks from the goal, as a (count, size * size) uint8 array
+        of row-major boards. Every walk has its own length in [min_moves,
+        max_moves] and never immediately undoes a move; all walks take each
+        step together as array operations.
+        """
+        rng = rng or np.random.default_rng()
+        cells = self.size * self.size
+        boards = np.tile(np.arange(cells, dtype=np.uint8), (count, 1))
+        rows = np.arange(count)
+        blanks = np.zeros(count, dtype=np.int64)
+        previous = np.full(count, -1, dtype=np.int64)
+        lengths = rng.integers(min_moves, max_moves + 1, size=count)
+        for step in range(int(lengths.max(initial=0))):
+            active = rows[lengths > step]
+            blank = blanks[active]
+            candidates = self._neighbours[blank]
+            legal = (candidates >= 0) & (candidates != previous[active, None])
+            # Pick the k-th legal neighbour, k uniform over the legal count
+            k = (rng.random(len(active)) * legal.sum(axis=1)).astype(np.int64)
+            choice = np.argmax(np.cumsum(legal, axis=1) > k[:, None], axis=1)
+            target = candidates[np.arange(len(active)), choice]
+            boards[active, blank] = boards[active, target]
+            boards[active, target] = 0
+            previous[active] = blank
+            blanks[active] = target
+        return boards
+
+    def canonical_boards(self, boards: np.ndarray) -> np.ndarray:
+        """symmetry.canonicalize of every row of a (count, size * size) board array."""
+        size = self.size
+        transposed = self._transpose[
+            boards.reshape(-1, size, size).transpose(0, 2, 1).reshape(len(boards), -1)
+        ]
+        differ = boards != transposed
+        first = np.argmax(differ, axis=1)
+        rows = np.arange(len(boards))
+        keep = ~differ.any(axis=1) | (boards[rows, first] < transposed[rows, first])
+        return np.where(keep[:, None], boards, transposed)
+
+    def generate_batch(self, count: int, min_moves: int = 10, max_moves: int = 100,
+                       rng: Optional[np.random.Generator] = None,
+                       max_rounds: int = 100) -> np.ndarray:
+        """
+        Generate count unique puzzles in one call, as a (count, size * size)
+        uint8 array of row-major boards. Puzzles come from random_walks, so
+        they are all solvable; transposed copies count as duplicates.
+        Duplicates are removed by hashing each canonical board's bytes, and
+        more walks are run until count puzzles are found. Raises ValueError
+        if max_rounds rounds do not find enough (too few distinct boards
+        within max_moves).
+        """
+        rng = rng or np.random.default_rng()
+        found: List[np.ndarray] = []
         seen = set()
-        while len(puzzles) < count:
-            moves = random.randint(min_moves, max_moves)
-            puzzle = self.generate(moves)
-            puzzle_tuple = tuple(tuple(row) for row in puzzle)
-            if puzzle_tuple not in seen and self.is_solvable(puzzle):
-                puzzles.append(puzzle)
-                seen.add(puzzle_tuple)
-        return puzzles
+        total = 0
+        for _ in range(max_rounds):
+            boards = self.random_walks(max(count - total, 16), min_moves, max_moves, rng)
+            canonical = self.canonical_boards(boards)
+            keys = canonical.view(np.dtype((np.void, canonical.shape[1]))).ravel()
+            fresh = []
+            for i, key in enumerate(keys.tolist()):
+                if key not in seen:
+                    seen.add(key)
+                    fresh.append(i)
+            found.append(boards[fresh])
+            total += len(fresh)
+            if total >= count:
+                return np.concatenate(found)[:count]
+        raise ValueError(f"Found only {total} distinct puzzles within {max_moves} moves")
 
     def _find_empty(self, state: List[List[int]]) -> Tuple[int, int]:
         """Find the empty tile (0) position."""
@@ -72,31 +230,25 @@ class SlidingPuzzleGenerator:
 
     def is_solvable(self, state: List[List[int]]) -> bool:
         """
-        Check if puzzle is solvable using inversion count.
-        For nxn boards:
-        - If n is odd, puzzle is solvable if inversion count is even
-        - If n is even, puzzle is solvable if:
-          * blank on even row from bottom + odd inversions, or
-          * blank on odd row from bottom + even inversions
+        Check if puzzle is solvable, in O(n) for n cells.
+        Every move swaps the empty tile with a neighbour, which flips the
+        parity of the board permutation and of the empty tile's Manhattan
+        distance from its goal cell (0, 0). A board is solvable exactly when
+        the two parities agree; the permutation parity is n minus its number
+        of cycles.
         """
-        # Flatten the puzzle and remove empty tile
-        flat = [num for row in state for num in row if num != 0]
-        # Count inversions
-        inversions = 0
-        for i in range(len(flat)):
-            for j in range(i + 1, len(flat)):
-                if flat[i] > flat[j]:
-                    inversions += 1
-        # Find empty tile row from bottom
-        empty_row = self.size - (self._find_empty(state)[0] + 1)
-        # Apply solvability rules
-        if self.size % 2 == 1:
-            return inversions % 2 == 0
-        else:
-            if empty_row % 2 == 0:
-                return inversions % 2 == 1
-            else:
-                return inversions % 2 == 0
+        flat = [num for row in state for num in row]
+        visited = [False] * len(flat)
+        cycles = 0
+        for start in range(len(flat)):
+            if not visited[start]:
+                cycles += 1
+                cell = start
+                while not visited[cell]:
+                    visited[cell] = True
+                    cell = flat[cell]
+        empty_row, empty_col = self._find_empty(state)
+        return (len(flat) - cycles) % 2 == (empty_row + empty_col) % 2
 
     def print_puzzle(self, puzzle: List[List[int]]) -> None:
         """Pretty print a puzzle."""
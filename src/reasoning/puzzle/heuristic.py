@@ -0,0 +1,52 @@
+from bisect import bisect_left
+from typing import List
+
+
+def line_conflicts(goal_offsets: List[int]) -> int:
+    """
+    Linear conflict penalty for one row or column.
+
+    goal_offsets lists, in board order, the goal offsets along the line of the
+    tiles that belong to this line. Tiles out of relative order must leave the
+    line to pass each other, so every tile outside the longest increasing
+    subsequence costs two extra moves.
+    """
+    tails: List[int] = []
+    for offset in goal_offsets:
+        k = bisect_left(tails, offset)
+        if k == len(tails):
+            tails.append(offset)
+        else:
+            tails[k] = offset
+    return 2 * (len(goal_offsets) - len(tails))
+
+
+def manhattan_distance(state: List[List[int]]) -> int:
+    """Sum of the Manhattan distances of all tiles (not the empty tile) from their goal positions."""
+    size = len(state)
+    distance = 0
+    for i, row in enumerate(state):
+        for j, tile in enumerate(row):
+            if tile != 0:
+                goal_i, goal_j = divmod(tile, size)
+                distance += abs(i - goal_i) + abs(j - goal_j)
+    return distance
+
+
+def linear_conflict(state: List[List[int]]) -> int:
+    """Sum of line_conflicts over all rows and columns."""
+    size = len(state)
+    conflicts = 0
+    for i in range(size):
+        row = [tile % size for tile in state[i] if tile != 0 and tile // size == i]
+        conflicts += line_conflicts(row)
+    for j in range(size):
+        column = [state[i][j] // size for i in range(size)
+                  if state[i][j] != 0 and state[i][j] % size == j]
+        conflicts += line_conflicts(column)
+    return conflicts
+
+
+def manhattan_linear_conflict(state: List[List[int]]) -> int:
+    """Admissible Manhattan distance plus linear conflict heuristic."""
+    return manhattan_distance(state) + linear_conflict(state)
@@ -0,0 +1,321 @@
+import heapq
+import random
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from reasoning.puzzle.distance import DistanceTable
+from reasoning.puzzle.generator import SlidingPuzzleGenerator
+from reasoning.puzzle.puzzle import PackedSlidingPuzzle
+from reasoning.search.algorithms import IDAStarSearch
+
+Action = Tuple[int, int, int, int]
+
+# Zobrist keys per board size: a random 64-bit key per (cell, tile)
+_ZOBRIST: Dict[int, List[List[int]]] = {}
+
+
+def _zobrist_keys(size: int) -> List[List[int]]:
+    keys = _ZOBRIST.get(size)
+    if keys is None:
+        rng = random.Random(size)
+        cells = size * size
+        keys = _ZOBRIST[size] = [[rng.getrandbits(64) for _ in range(cells)] for _ in range(cells)]
+    return keys
+
+
+def shorten_moves(board: Sequence[Sequence[int]], actions: Sequence[Action]) -> List[Action]:
+    """
+    Drop every part of a solution that returns to a board it already passed
+    through, which also removes moves immediately undone. Boards are
+    compared by an incrementally updated Zobrist hash.
+    """
+    size = len(board)
+    keys = _zobrist_keys(size)
+    tiles = [tile for row in board for tile in row]
+    h = 0
+    for cell, tile in enumerate(tiles):
+        h ^= keys[cell][tile]
+    kept: List[Action] = []
+    hashes = [h]  # Hash of the board after each kept move
+    seen = {h: 0}  # Hash -> number of kept moves that reach it
+    for action in actions:
+        r1, c1, r2, c2 = action
+        blank, cell = r1 * size + c1, r2 * size + c2
+        tile = tiles[cell]
+        h ^= keys[blank][0] ^ keys[cell][tile] ^ keys[blank][tile] ^ keys[cell][0]
+        tiles[blank], tiles[cell] = tile, 0
+        index = seen.get(h)
+        if index is None:
+            kept.append(tuple(action))
+            hashes.append(h)
+            seen[h] = len(kept)
+            continue
+        # Back on an earlier board: forget the loop
+        for dropped in hashes[index + 1:]:
+            del seen[dropped]
+        del hashes[index + 1:]
+        del kept[index:]
+    return kept
+
+
+class HierarchicalSolver:
+    """
+    Fast suboptimal solver for large boards.
+
+    The empty tile's goal cell is the top-left corner, so the board is
+    reduced from the bottom and right: the bottom row of the unsolved
+    top-left region is solved, then its right column, until a 3x3 region
+    remains, which is solved optimally (with distance_table when it holds
+    3x3 distances, IDA* otherwise). Each tile is placed by an A* search over
+    the positions of the empty tile and that tile alone, the other loose
+    tiles being interchangeable. The last two tiles of a line
+    are parked in a 3x2 window at its end and placed together by a search
+    over the window. Solutions are passed through shorten_moves.
+
+    The solver holds no state between solves, so one instance may be shared
+    by concurrent requests.
+    """
+
+    def __init__(self, distance_table: Optional[DistanceTable] = None, shorten: bool = True):
+        self.distance_table = distance_table
+        self.shorten = shorten
+
+    def solve(self, board: Sequence[Sequence[int]]) -> List[Action]:
+        """
+        Moves solving board. Raises ValueError if board is not solvable, and
+        RuntimeError if a stage fails to place its tiles.
+        """
+        size = len(board)
+        if not SlidingPuzzleGenerator(size).is_solvable([list(row) for row in board]):
+            raise ValueError("Board is not solvable")
+        actions = _Stages(board, self.distance_table).run()
+        if self.shorten:
+            return shorten_moves(board, actions)
+        return actions
+
+
+class _Stages:
+    """The state of one HierarchicalSolver solve: the board as it is moved, and the moves so far."""
+
+    def __init__(self, board: Sequence[Sequence[int]], distance_table: Optional[DistanceTable]):
+        size = len(board)
+        self.size = size
+        self.distance_table = distance_table
+        self.tiles = [tile for row in board for tile in row]
+        self.position = [0] * len(self.tiles)  # Tile -> cell
+        for cell, tile in enumerate(self.tiles):
+            self.position[tile] = cell
+        self.fixed = [False] * len(self.tiles)
+        self.region: List[bool] = []
+        self.actions: List[Action] = []
+        self.neighbors = []
+        for cell in range(size * size):
+            r, c = divmod(cell, size)
+            self.neighbors.append([
+                nr * size + nc
+                for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                if 0 <= nr < size and 0 <= nc < size
+            ])
+        self.distances = [
+            [abs(a // size - b // size) + abs(a % size - b % size) for b in range(size * size)]
+            for a in range(size * size)
+        ]
+
+    def run(self) -> List[Action]:
+        """Solve the board; returns the moves. Raises RuntimeError if a stage fails."""
+        # Unsolved region: rows < height, columns < width
+        height = width = self.size
+        while height > 3 or width > 3:
+            if height >= width:
+                self._solve_line(height - 1, width, height, width, transposed=False)
+                height -= 1
+            else:
+                self._solve_line(width - 1, height, height, width, transposed=True)
+                width -= 1
+        self._solve_corner(min(self.size, 3))
+        if self.tiles != list(range(self.size * self.size)):
+            raise RuntimeError("Hierarchical solve did not reach the goal")
+        return self.actions
+
+    def _cell(self, row: int, col: int, transposed: bool) -> int:
+        """Cell index of (row, col) in the row frame, or the column frame when transposed."""
+        return col * self.size + row if transposed else row * self.size + col
+
+    def _solve_line(self, line: int, length: int, height: int, width: int, transposed: bool) -> None:
+        """Place the goal tiles of the line's cells 0..length-1 and fix them."""
+        self.region = [
+            not self.fixed[cell] and cell // self.size < height and cell % self.size < width
+            for cell in range(self.size * self.size)
+        ]
+        for col in range(length - 2):
+            cell = self._cell(line, col, transposed)
+            self._require(self._place_tile(cell, cell), cell)
+            self._fix(cell)
+        first = self._cell(line, length - 2, transposed)
+        last = self._cell(line, length - 1, transposed)
+        if self.position[first] != first or self.position[last] != last:
+            window = {
+                self._cell(row, col, transposed)
+                for row in (line - 2, line - 1, line) for col in (length - 2, length - 1)
+            }
+            # Park the first tile in the line's corner and bring the last tile
+            # next to it, which leaves the empty tile in the window too; then
+            # finish in the window. Parking may fail (the last tile can be
+            # boxed in by the blocked corner); the searches below place both
+            # tiles from any position, so only their result is required
+            self._place_tile(first, last)
+            self.region[last] = False
+            self._place_tile(last, self._cell(line - 1, length - 1, transposed))
+            self.region[last] = True
+            done = lambda state: state[1] == first and state[2] == last
+            if not self._place([first, last], done, window):
+                self._require(self._place([first, last], done), last)
+        self._fix(first)
+        self._fix(last)
+
+    def _require(self, placed: bool, tile: int) -> None:
+        # Fixing a tile that is not in place would ship an invalid solution
+        if not placed:
+            raise RuntimeError(f"Hierarchical solve could not place tile {tile}")
+
+    def _fix(self, cell: int) -> None:
+        self.fixed[cell] = True
+        self.region[cell] = False
+
+    def _place_tile(self, tile: int, target: int) -> bool:
+        """
+        Move tile to target along a shortest path, by A* over (empty cell,
+        tile cell) states encoded as empty cell * cells + tile cell.
+        """
+        cells = self.size * self.size
+        distance = self.distances
+        neighbors = self.neighbors
+        allowed = self.region
+
+        def heuristic(blank: int, at: int) -> int:
+            # The empty tile must get next to the tile; after each step of the
+            # tile it is behind it and needs at least two more moves to get
+            # to another side, so every step but the first costs at least 3
+            steps = distance[at][target]
+            if not steps:
+                return 0
+            return max(0, distance[blank][at] - 1) + 3 * steps - 2
+
+        blank, at = self.position[0], self.position[tile]
+        start = blank * cells + at
+        costs = {start: 0}
+        parents = {start: -1}
+        frontier = [(heuristic(blank, at), 0, start)]
+        found = -1
+        while frontier:
+            _, g, state = heapq.heappop(frontier)
+            if g > costs[state]:
+                continue
+            blank, at = divmod(state, cells)
+            if at == target:
+                found = state
+                break
+            for cell in neighbors[blank]:
+                if not allowed[cell]:
+                    continue
+                child_at = blank if cell == at else at
+                child = cell * cells + child_at
+                if g + 1 >= costs.get(child, g + 2):
+                    continue
+                costs[child] = g + 1
+                parents[child] = state
+                heapq.heappush(frontier, (g + 1 + heuristic(cell, child_at), g + 1, child))
+        if found < 0:
+            return False
+        path = []
+        while parents[found] >= 0:
+            path.append(found // cells)
+            found = parents[found]
+        for cell in reversed(path):
+            self._move(cell)
+        return True
+
+    def _place(self, tracked: List[int], goal: Callable[[Tuple[int, ...]], bool],
+               cells: Optional[set] = None,
+               heuristic: Optional[Callable[[Tuple[int, ...]], int]] = None) -> bool:
+        """
+        Move the empty tile along a shortest path to a state where goal holds,
+        by A* (breadth-first without a heuristic). States are (empty cell,
+        cell of each tracked tile); moves stay inside the region, and inside
+        cells when given. Returns False if no path exists.
+        """
+        allowed = self.region
+        if cells is not None:
+            allowed = [allowed[cell] and cell in cells for cell in range(len(allowed))]
+            if not allowed[self.position[0]]:
+                return False
+        h = heuristic or (lambda state: 0)
+        start = (self.position[0],) + tuple(self.position[tile] for tile in tracked)
+        costs = {start: 0}
+        parents = {start: None}
+        frontier = [(h(start), 0, start)]
+        found = None
+        while frontier:
+            _, g, state = heapq.heappop(frontier)
+            if g > costs[state]:
+                continue
+            if goal(state):
+                found = state
+                break
+            blank = state[0]
+            for cell in self.neighbors[blank]:
+                if not allowed[cell]:
+                    continue
+                child = (cell,) + tuple(blank if position == cell else position for position in state[1:])
+                if g + 1 >= costs.get(child, g + 2):
+                    continue
+                costs[child] = g + 1
+                parents[child] = state
+                heapq.heappush(frontier, (g + 1 + h(child), g + 1, child))
+        if found is None:
+            return False
+        path = []
+        while parents[found] is not None:
+            path.append(found[0])
+            found = parents[found]
+        for cell in reversed(path):
+            self._move(cell)
+        return True
+
+    def _move(self, cell: int) -> None:
+        """Slide the tile at cell into the empty cell."""
+        blank = self.position[0]
+        tile = self.tiles[cell]
+        self.tiles[blank], self.tiles[cell] = tile, 0
+        self.position[tile], self.position[0] = blank, cell
+        self.actions.append(divmod(blank, self.size) + divmod(cell, self.size))
+
+    def _solve_corner(self, size: int) -> None:
+        """Solve the top-left size x size region optimally; every other tile is in place."""
+        # Relabel tiles by their goal cell within the region
+        board = [
+            [
+                (tile // self.size) * size + tile % self.size
+                for tile in self.tiles[row * self.size:row * self.size + size]
+            ]
+            for row in range(size)
+        ]
+        table = self.distance_table
+        if table is not None and table.size == size:
+            distance = table.distance(board)
+            while distance:
+                blank = self.position[0]
+                for cell in self.neighbors[blank]:
+                    r, c = divmod(cell, self.size)
+                    if r >= size or c >= size:
+                        continue
+                    br, bc = divmod(blank, self.size)
+                    board[br][bc], board[r][c] = board[r][c], 0
+                    if table.distance(board) == distance - 1:
+                        self._move(cell)
+                        distance -= 1
+                        break
+                    board[r][c], board[br][bc] = board[br][bc], 0
+            return
+        result = IDAStarSearch(PackedSlidingPuzzle(board)).solve()
+        for _, _, row, col in result['solution']:
+            self._move(row * self.size + col)
@@ -0,0 +1,232 @@
+import argparse
+import os
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from reasoning.puzzle.puzzle import PackedSlidingPuzzle
+from reasoning.puzzle.symmetry import transform_positions, transpose_cells
+from reasoning.puzzle.tables import DEFAULT_TABLE_DIR, ByteTable, save_table
+from reasoning.puzzle.vectorized import MAX_TILE, SlideMoves, check_size, pack_boards, pattern_ranks
+from reasoning.search.layers import breadth_first_layers
+
+UNKNOWN = 255
+RANK_CHUNK = 1 << 20  # States ranked at a time when filling a table
+
+# Disjoint partitions of the non-empty tiles used when none is given.
+# Goal layout has the empty tile at cell 0 and tile t at cell t.
+DEFAULT_PARTITIONS: Dict[int, List[Tuple[int, ...]]] = {
+    3: [(1, 2, 3, 4), (5, 6, 7, 8)],
+    4: [(1, 2, 3, 5, 6, 7), (4, 8, 9, 12, 13, 14), (10, 11, 15)],
+}
+
+
+def table_size(cells: int, k: int) -> int:
+    """Number of placements of k distinct tiles on cells cells."""
+    size = 1
+    for i in range(k):
+        size *= cells - i
+    return size
+
+
+def pattern_rank(positions: Sequence[int], cells: int) -> int:
+    """
+    Perfect hash of k distinct cell indices into [0, table_size(cells, k)).
+    Each position is numbered among the cells not used by earlier positions.
+    """
+    rank = 0
+    for i, position in enumerate(positions):
+        smaller = 0
+        for earlier in positions[:i]:
+            if earlier < position:
+                smaller += 1
+        rank = rank * (cells - i) + position - smaller
+    return rank
+
+
+def pattern_filename(size: int, pattern: Sequence[int]) -> str:
+    return f"pdb-{size}x{size}-{'-'.join(str(tile) for tile in pattern)}.bin"
+
+
+def build_pattern_database(size: int, pattern: Sequence[int], spill_dir: Optional[str] = None,
+                           spill_threshold: int = 1 << 24) -> bytearray:
+    """
+    Build the table for pattern by retrograde breadth-first search from the goal.
+
+    Abstract states are boards with every non-pattern tile relabelled as
+    one free tile. Moving the free tile costs 0 and moving a pattern tile
+    costs 1, so this is a 0-1 BFS, run a layer at a time over packed states
+    by breadth_first_layers. The first layer a pattern placement appears in
+    gives its table entry (the minimum over all empty cells). Layers of more
+    than spill_threshold states are memory-mapped from files in spill_dir.
+    Raises ValueError for sizes above 4x4, and for patterns that are not
+    distinct tiles of the board or that leave no tile free.
+    """
+    check_size(size)
+    cells = size * size
+    if len(set(pattern)) != len(pattern) or not all(1 <= tile < cells for tile in pattern):
+        raise ValueError(f"Pattern {tuple(pattern)} is not a set of distinct {size}x{size} tiles")
+    if len(pattern) >= cells - 1:
+        raise ValueError("Pattern must leave at least one tile out")
+    # The free tile takes the largest label not in the pattern; it need not be a tile of the board
+    free_tile = max(tile for tile in range(1, MAX_TILE + 1) if tile not in pattern)
+    goal = [
+        [tile if tile == 0 or tile in pattern else free_tile for tile in range(i * size, (i + 1) * size)]
+        for i in range(size)
+    ]
+    moves = SlideMoves(size, free_tile=free_tile)
+    table = np.full(table_size(cells, len(pattern)), UNKNOWN, dtype=np.uint8)
+    layers = breadth_first_layers(
+        pack_boards([goal]), moves.expand, moves.expand_free,
+        spill_threshold=spill_threshold, spill_dir=spill_dir,
+    )
+    for depth, layer in layers:
+        for start in range(0, len(layer), RANK_CHUNK):
+            ranks = pattern_ranks(np.asarray(layer[start:start + RANK_CHUNK]), size, pattern)
+            ranks = ranks[table[ranks] == UNKNOWN]
+            table[ranks] = depth
+    return bytearray(table)
+
+
+class PatternDatabase:
+    """
+    Table of the minimum number of moves of the pattern tiles needed to bring
+    them to their goal cells, for every placement of those tiles. Only moves
+    of pattern tiles are counted, so tables of disjoint patterns can be
+    summed. Held in memory after building, or memory-mapped from disk.
+    """
+
+    def __init__(self, size: int, pattern: Sequence[int],
+                 table: Union[bytearray, ByteTable]):
+        self.size = size
+        self.cells = size * size
+        self.pattern = tuple(pattern)
+        if len(table) != table_size(self.cells, len(self.pattern)):
+            raise ValueError("Table size does not match pattern")
+        self.table = table
+
+    @classmethod
+    def build(cls, size: int, pattern: Sequence[int], spill_dir: Optional[str] = None) -> 'PatternDatabase':
+        return cls(size, pattern, build_pattern_database(size, pattern, spill_dir=spill_dir))
+
+    @classmethod
+    def load(cls, path: str) -> 'PatternDatabase':
+        table = ByteTable(path)
+        return cls(table.meta["size"], table.meta["pattern"], table)
+
+    def save(self, path: str) -> None:
+        data = self.table.view() if isinstance(self.table, ByteTable) else self.table
+        save_table(path, data, {
+            "kind": "pdb",
+            "size": self.size,
+            "pattern": list(self.pattern),
+        })
+
+    def lookup(self, tile_positions: Sequence[int]) -> int:
+        """Table entry for a board given as the cell index of every tile."""
+        cells = self.cells
+        rank = 0
+        placed: List[int] = []
+        for i, tile in enumerate(self.pattern):
+            position = tile_positions[tile]
+            smaller = 0
+            for earlier in placed:
+                if earlier < position:
+                    smaller += 1
+            rank = rank * (cells - i) + position - smaller
+            placed.append(position)
+        return self.table[rank]
+
+
+class AdditivePatternDatabase:
+    """Sum of disjoint pattern databases; admissible for unit step costs."""
+
+    def __init__(self, databases: List[PatternDatabase]):
+        if not databases:
+            raise ValueError("At least one pattern database is required")
+        self.size = databases[0].size
+        seen = set()
+        for database in databases:
+            if database.size != self.size:
+                raise ValueError("Pattern databases must share a board size")
+            if seen.intersection(database.pattern) or 0 in database.pattern:
+                raise ValueError("Patterns must be disjoint and exclude the empty tile")
+            seen.update(database.pattern)
+        self.databases = databases
+
+    @classmethod
+    def load(cls, directory: str, size: int,
+             partition: Optional[List[Sequence[int]]] = None) -> 'AdditivePatternDatabase':
+        """Memory-map the tables of partition (default DEFAULT_PARTITIONS[size]) from directory."""
+        partition = partition or DEFAULT_PARTITIONS[size]
+        return cls([
+            PatternDatabase.load(os.path.join(directory, pattern_filename(size, pattern)))
+            for pattern in partition
+        ])
+
+    def heuristic(self, tile_positions: Sequence[int]) -> int:
+        return sum(database.lookup(tile_positions) for database in self.databases)
+
+
+class PDBSlidingPuzzle(PackedSlidingPuzzle):
+    """
+    Packed sliding puzzle whose heuristic is the larger of the additive
+    pattern database value and the cached Manhattan + linear conflict value.
+    With symmetric, the database is also looked up on the transposed board,
+    which is as far from the goal, and the larger value is used.
+    """
+
+    def __init__(self, initial: List[List[int]], pdb: AdditivePatternDatabase,
+                 symmetric: bool = True, ranked_keys: bool = False):
+        super().__init__(initial, ranked_keys=ranked_keys)
+        if pdb.size != self.size:
+            raise ValueError("Pattern database was built for a different board size")
+        self.pdb = pdb
+        self.symmetric = symmetric
+        self._transpose = transpose_cells(self.size)
+
+    def tile_positions(self, state: int) -> List[int]:
+        """Cell index of every tile, indexed by tile."""
+        positions = [0] * (self.size * self.size)
+        for cell in range(self.size * self.size):
+            positions[(state >> (cell * self.bits)) & self.tile_mask] = cell
+        return positions
+
+    def heuristic(self, state: int) -> float:
+        positions = self.tile_positions(state)
+        h = max(state >> self.h_shift, self.pdb.heuristic(positions))
+        if self.symmetric:
+            h = max(h, self.pdb.heuristic(transform_positions(positions, self._transpose)))
+        return float(h)
+
+
+def main():
+    """
+    Build pattern databases offline, e.g.
+    python -m reasoning.puzzle.pdb --size 4 --out ~/.reasoning/tables
+    """
+    parser = argparse.ArgumentParser(description="Build sliding puzzle pattern databases.")
+    parser.add_argument("--size", type=int, default=4, help="Board width.")
+    parser.add_argument(
+        "--pattern", action="append", default=None,
+        help="Comma separated tiles of one pattern; repeat for each pattern "
+             "of the partition. Defaults to DEFAULT_PARTITIONS[size].",
+    )
+    parser.add_argument("--out", default=DEFAULT_TABLE_DIR, help="Output directory.")
+    parser.add_argument(
+        "--spill_dir", default=None,
+        help="Directory for memory-mapped BFS layers (default: system temp directory).",
+    )
+    args = parser.parse_args()
+    if args.pattern:
+        partition = [tuple(int(tile) for tile in p.split(",")) for p in args.pattern]
+    else:
+        partition = DEFAULT_PARTITIONS[args.size]
+    for pattern in partition:
+        path = os.path.join(os.path.expanduser(args.out), pattern_filename(args.size, pattern))
+        print(f"Building {path}")
+        PatternDatabase.build(args.size, pattern, spill_dir=args.spill_dir).save(path)
+
+
+if __name__ == "__main__":
+    main()
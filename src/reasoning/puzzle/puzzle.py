@@ -1,7 +1,36 @@
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from reasoning.search.problem import Problem
+from reasoning.search.ranking import permutation_count, rank_permutation
+from reasoning.puzzle.heuristic import line_conflicts, manhattan_linear_conflict
 import copy
 
+
+def tile_bits(size: int) -> int:
+    """Number of bits used per tile when packing a size x size board."""
+    return max(4, (size * size - 1).bit_length())
+
+
+def pack_board(board: List[List[int]]) -> int:
+    """
+    Pack a board into a single int.
+    Cell i (row-major) occupies bits [i * b, (i + 1) * b) where b = tile_bits(size).
+    """
+    bits = tile_bits(len(board))
+    packed = 0
+    for i, tile in enumerate(num for row in board for num in row):
+        packed |= tile << (i * bits)
+    return packed
+
+
+def unpack_board(packed: int, size: int) -> List[List[int]]:
+    """Inverse of pack_board. Bits above the board area are ignored."""
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    return [
+        [(packed >> ((i * size + j) * bits)) & mask for j in range(size)]
+        for i in range(size)
+    ]
+
 class SlidingPuzzle(Problem[List[List[int]], Tuple[int, int, int, int]]):
     """
     Sliding puzzle problem implementation.
@@ -23,6 +52,8 @@ class SlidingPuzzle(Problem[List[List[int]], Tuple[int, int, int, int]]):
         # Deep copy the initial state
         self.initial = copy.deepcopy(initial)
         self.size = size
+        # (row, col) of every tile in the initial state, indexed by tile
+        self.initial_positions = [divmod(flat.index(tile), size) for tile in range(size * size)]
 
     def initial_state(self) -> List[List[int]]:
         return copy.deepcopy(self.initial)
@@ -72,21 +103,261 @@ class SlidingPuzzle(Problem[List[List[int]], Tuple[int, int, int, int]]):
                   next_state: List[List[int]]) -> float:
         return 1.0
 
+    def goal_state(self) -> List[List[int]]:
+        return [
+            [i * self.size + j for j in range(self.size)]
+            for i in range(self.size)
+        ]
+
+    def inverse(self, action: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+        r1, c1, r2, c2 = action
+        return (r2, c2, r1, c1)
+
+    def reverse_heuristic(self, state: List[List[int]]) -> float:
+        """Manhattan distance of all tiles from their positions in the initial state."""
+        distance = 0
+        for i, row in enumerate(state):
+            for j, tile in enumerate(row):
+                if tile != 0:
+                    initial_i, initial_j = self.initial_positions[tile]
+                    distance += abs(i - initial_i) + abs(j - initial_j)
+        return float(distance)
+
+    def supports_in_place(self) -> bool:
+        return True
+
+    def apply(self, state: List[List[int]], action: Tuple[int, int, int, int]) -> None:
+        """Swap the tiles of action in place. A swap is its own undo."""
+        r1, c1, r2, c2 = action
+        state[r1][c1], state[r2][c2] = state[r2][c2], state[r1][c1]
+
+    def undo(self, state: List[List[int]], action: Tuple[int, int, int, int],
+             undo_info: None) -> None:
+        self.apply(state, action)
+
+    def heuristic_after(self, state: List[List[int]], action: Tuple[int, int, int, int],
+                        h: float) -> float:
+        """
+        Manhattan distance plus linear conflict after an in-place move, from
+        the value h before it: only the moved tile's distance changes, and
+        only the linear conflict of the two lines it moved between.
+        """
+        r1, c1, r2, c2 = action
+        tile = state[r1][c1]  # Moved from (r2, c2) into the empty cell
+        goal_i, goal_j = divmod(tile, self.size)
+        h += abs(r1 - goal_i) + abs(c1 - goal_j) - abs(r2 - goal_i) - abs(c2 - goal_j)
+        if r1 != r2:
+            # The tile changed rows; the order of tiles along columns is unchanged
+            entered, left = list(state[r1]), list(state[r2])
+            lines, cells = (r1, r2), (c1, c2)
+        else:
+            entered, left = [row[c1] for row in state], [row[c2] for row in state]
+            lines, cells = (self.size + c1, self.size + c2), (r1, r2)
+        h += self._conflict(entered, lines[0]) + self._conflict(left, lines[1])
+        entered[cells[0]], left[cells[1]] = 0, tile
+        return h - self._conflict(entered, lines[0]) - self._conflict(left, lines[1])
+
+    def _conflict(self, tiles: List[int], line: int) -> int:
+        """Linear conflict of the tiles along row line (line < size) or column line - size."""
+        if line < self.size:
+            offsets = [t % self.size for t in tiles if t and t // self.size == line]
+        else:
+            column = line - self.size
+            offsets = [t // self.size for t in tiles if t and t % self.size == column]
+        return line_conflicts(offsets)
+
+    def state_key(self, state: List[List[int]]) -> Tuple[Tuple[int, ...], ...]:
+        return tuple(tuple(row) for row in state)
+
     def heuristic(self, state: List[List[int]]) -> float:
         """
-        Manhattan distance heuristic - calculates distance of empty tile (0) 
-        from its goal position at (0,0)
+        Manhattan distance plus linear conflict heuristic, summed over all
+        tiles except the empty one. Admissible for unit step costs.
         """
-        # Find empty tile position
-        empty_pos = None
-        for i in range(self.size):
-            for j in range(self.size):
-                if state[i][j] == 0:
-                    empty_pos = (i, j)
-                    break
-            if empty_pos:
-                break
-            
-        # Calculate Manhattan distance from empty tile to (0,0)
-        distance = abs(empty_pos[0] - 0) + abs(empty_pos[1] - 0)
+        return float(manhattan_linear_conflict(state))
+
+
+class PackedSlidingPuzzle(SlidingPuzzle):
+    """
+    Sliding puzzle with a compact integer state.
+    State: int holding the board packed by pack_board, with the index of the
+        empty tile cached in the bits above the board and the heuristic value
+        cached above that
+    Action: same (row1, col1, row2, col2) tuples as SlidingPuzzle, so solutions
+        are interchangeable with the list-of-lists form
+    With ranked_keys, state keys are permutation ranks of the board in
+    [0, cells!), so searches on boards up to 3x3 can keep bit-array closed sets.
+    """
+
+    def __init__(self, initial: List[List[int]], ranked_keys: bool = False):
+        super().__init__(initial)
+        cells = self.size * self.size
+        self.ranked_keys = ranked_keys
+        self.bits = tile_bits(self.size)
+        self.tile_mask = (1 << self.bits) - 1
+        self.blank_shift = cells * self.bits
+        self.blank_mask = (1 << max(1, (cells - 1).bit_length())) - 1
+        self.h_shift = self.blank_shift + self.blank_mask.bit_length()
+        self.board_mask = (1 << self.h_shift) - 1
+        self.row_mask = (1 << (self.size * self.bits)) - 1
+        # Goal board has the empty tile at index 0, so its blank field is 0
+        self.goal = pack_board([
+            [i * self.size + j for j in range(self.size)]
+            for i in range(self.size)
+        ])
+        # Rows 0..size-1 then columns, as lists of cell bit offsets
+        self._lines: List[List[int]] = [
+            [(i * self.size + j) * self.bits for j in range(self.size)]
+            for i in range(self.size)
+        ] + [
+            [(i * self.size + j) * self.bits for i in range(self.size)]
+            for j in range(self.size)
+        ]
+        # Linear conflict per line, memoised on the packed contents of the line
+        self._conflicts: List[Dict[int, int]] = [{} for _ in self._lines]
+        # Precompute legal actions per empty tile index, and the bit offsets
+        # and heuristic bookkeeping each action touches, so moves need no
+        # scanning and the heuristic is updated from the parent's value
+        self._moves: List[List[Tuple[int, int, int, int]]] = []
+        self._shifts: Dict[Tuple[int, int, int, int], Tuple] = {}
+        for empty in range(cells):
+            i, j = divmod(empty, self.size)
+            moves = []
+            for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                new_i, new_j = i + di, j + dj
+                if 0 <= new_i < self.size and 0 <= new_j < self.size:
+                    action = (i, j, new_i, new_j)
+                    target = new_i * self.size + new_j
+                    # The tile moves from target into the empty cell. Its
+                    # Manhattan distance changes by one, and only the lines it
+                    # leaves and enters (rows for vertical moves, columns for
+                    # horizontal ones) can change their linear conflict.
+                    manhattan_delta = [0] * cells
+                    for tile in range(1, cells):
+                        goal_i, goal_j = divmod(tile, self.size)
+                        manhattan_delta[tile] = (
+                            abs(i - goal_i) + abs(j - goal_j)
+                            - abs(new_i - goal_i) - abs(new_j - goal_j)
+                        )
+                    if di:
+                        lines = (new_i, i)
+                    else:
+                        lines = (self.size + new_j, self.size + j)
+                    moves.append(action)
+                    self._shifts[action] = (
+                        target * self.bits,
+                        empty * self.bits,
+                        (empty ^ target) << self.blank_shift,
+                        manhattan_delta,
+                        lines,
+                    )
+            self._moves.append(moves)
+        # Small integer codes of all actions, for compact node stores
+        self._action_list = list(self._shifts)
+        self._action_codes = {action: code for code, action in enumerate(self._action_list)}
+
+    def pack(self, board: List[List[int]]) -> int:
+        """Convert a list-of-lists board to the packed state."""
+        empty = [num for row in board for num in row].index(0)
+        return (
+            pack_board(board)
+            | (empty << self.blank_shift)
+            | (manhattan_linear_conflict(board) << self.h_shift)
+        )
+
+    def unpack(self, state: int) -> List[List[int]]:
+        """Convert a packed state back to a list-of-lists board."""
+        return unpack_board(state, self.size)
+
+    def line_conflict(self, state: int, line: int) -> int:
+        """Linear conflict of one row (line < size) or column (line - size)."""
+        cells = self._lines[line]
+        if line < self.size:
+            # Rows are contiguous in the packed board
+            key = (state >> cells[0]) & self.row_mask
+        else:
+            key = 0
+            for k, shift in enumerate(cells):
+                key |= ((state >> shift) & self.tile_mask) << (k * self.bits)
+        table = self._conflicts[line]
+        conflicts = table.get(key)
+        if conflicts is None:
+            tiles = [(key >> (k * self.bits)) & self.tile_mask for k in range(self.size)]
+            conflicts = table[key] = self._conflict(tiles, line)
+        return conflicts
+
+    def blank_index(self, state: int) -> int:
+        """Row-major index of the empty tile."""
+        return (state >> self.blank_shift) & self.blank_mask
+
+    def initial_state(self) -> int:
+        return self.pack(self.initial)
+
+    def is_goal(self, state: int) -> bool:
+        return state == self.goal
+
+    def actions(self, state: int) -> List[Tuple[int, int, int, int]]:
+        # Shared precomputed list; callers must not mutate it
+        return self._moves[(state >> self.blank_shift) & self.blank_mask]
+
+    def result(self, state: int, action: Tuple[int, int, int, int]) -> int:
+        """
+        Returns the new state after applying the action.
+        The empty cell holds 0, so moving the tile is a pair of XORs, and the
+        cached empty index is updated with a third. The cached heuristic is
+        adjusted by the moved tile's Manhattan delta and the linear conflict
+        change of the two lines it crossed.
+        """
+        tile_shift, empty_shift, blank_delta, manhattan_delta, lines = self._shifts[action]
+        tile = (state >> tile_shift) & self.tile_mask
+        board = state & self.board_mask
+        next_board = board ^ (tile << tile_shift) ^ (tile << empty_shift) ^ blank_delta
+        h = (state >> self.h_shift) + manhattan_delta[tile]
+        for line in lines:
+            h += self.line_conflict(next_board, line) - self.line_conflict(board, line)
+        return next_board | (h << self.h_shift)
+
+    def state_key(self, state: int) -> int:
+        if self.ranked_keys:
+            return rank_permutation([
+                (state >> (cell * self.bits)) & self.tile_mask
+                for cell in range(self.size * self.size)
+            ])
+        return state
+
+    def key_space_size(self) -> Optional[int]:
+        return permutation_count(self.size * self.size) if self.ranked_keys else None
+
+    def action_count(self) -> Optional[int]:
+        return len(self._action_list)
+
+    def encode_action(self, action: Tuple[int, int, int, int]) -> int:
+        return self._action_codes[action]
+
+    def decode_action(self, code: int) -> Tuple[int, int, int, int]:
+        return self._action_list[code]
+
+    def state_bit_length(self) -> Optional[int]:
+        # Board, blank index, and the cached heuristic, which stays below 2 ** 16
+        return self.h_shift + 16
+
+    def goal_state(self) -> int:
+        return self.goal
+
+    def reverse_heuristic(self, state: int) -> float:
+        """Manhattan distance of all tiles from their positions in the initial state."""
+        distance = 0
+        for cell in range(self.size * self.size):
+            tile = (state >> (cell * self.bits)) & self.tile_mask
+            if tile:
+                initial_i, initial_j = self.initial_positions[tile]
+                distance += abs(cell // self.size - initial_i) + abs(cell % self.size - initial_j)
         return float(distance)
+
+    def supports_in_place(self) -> bool:
+        # Ints are immutable; depth-first searches use result() instead
+        return False
+
+    def heuristic(self, state: int) -> float:
+        """Manhattan distance plus linear conflict, read from the state."""
+        return float(state >> self.h_shift)
@@ -1,25 +1,35 @@
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import bittensor as bt
 
 from reasoning.puzzle.verifier import SlidingPuzzleVerifier
 from reasoning.puzzle.puzzle import SlidingPuzzle
 
+# Solutions longer than this are rejected without being replayed; their
+# reward would be negligible anyway.
+MAX_SOLUTION_MOVES = 5000
 
-def get_reward(puzzle: List[List[int]], solution: List[Tuple[int, int, int, int]] | None) -> float:
+
+def get_reward(puzzle: List[List[int]], solution: List[Tuple[int, int, int, int]] | str | None,
+               max_moves: int = MAX_SOLUTION_MOVES, optimal_length: Optional[int] = None) -> float:
     """
     Reward the miner response based on the quality of their sliding puzzle solution.
     
     Args:
     - puzzle (List[List[int]]): The initial puzzle state
-    - solution (List[Tuple[int, int, int, int]] | None): The sequence of moves provided by the miner
+    - solution (List[Tuple[int, int, int, int]] | str | None): The sequence of moves provided by the
+      miner, as action tuples or a direction string
+    - max_moves (int): Solutions with more moves than this are rejected
+    - optimal_length (Optional[int]): Known optimal number of moves; if given, only
+      moves beyond it are penalised, so optimal solutions get 1.0 at any difficulty
     
     Returns:
     - float: The reward value between 0 and 1
     """
+    problem = SlidingPuzzle(puzzle)
     # Return 1.0 if puzzle is already solved
-    if SlidingPuzzle(puzzle).is_goal(puzzle) and (solution is None or solution == []):
+    if problem.is_goal(puzzle) and (solution is None or solution == []):
         bt.logging.debug(f"Puzzle already solved - returning 1.0 reward")
         return 1.0
     
@@ -28,20 +38,109 @@ def get_reward(puzzle: List[List[int]], solution: List[Tuple[int, int, int, int]
         bt.logging.debug(f"Solution was None - returning 0 reward")
         return 0.0
     
-    # Verify the solution
-    problem = SlidingPuzzle(puzzle)
-    verifier = SlidingPuzzleVerifier(problem)
-    is_valid = verifier.verify_solution(solution)
+    # Verify the solution and calculate its cost in a single replay
+    verifier = SlidingPuzzleVerifier(problem, max_moves=max_moves)
+    total_cost = verifier.replay(solution)
     
-    if not is_valid:
+    if total_cost is None:
         bt.logging.debug(f"Invalid solution - returning 0 reward")
         return 0.0
         
     # Calculate reward based on solution quality
-    total_cost = verifier.calculate_solution_cost(solution)
-    
     # Convert cost to reward using exponential decay: longer solutions get lower rewards
+    if optimal_length is not None:
+        total_cost = max(0.0, total_cost - optimal_length)
     reward = np.exp(-0.1 * total_cost)
     
     bt.logging.debug(f"Valid solution with cost {total_cost} - reward: {reward}")
     return float(reward)
+
+
+def get_rewards(puzzle: List[List[int]],
+                solutions: List[List[Tuple[int, int, int, int]] | str | None],
+                max_moves: int = MAX_SOLUTION_MOVES,
+                optimal_length: Optional[int] = None) -> np.ndarray:
+    """
+    Reward all miner responses to one puzzle, same as get_reward per response.
+    Identical solutions are verified once, and rewards are computed as one
+    array operation.
+
+    Args:
+    - puzzle (List[List[int]]): The initial puzzle state
+    - solutions (List[List[Tuple[int, int, int, int]] | str | None]): The solution of every miner,
+      as action tuples or a direction string
+    - max_moves (int): Solutions with more moves than this are rejected
+    - optimal_length (Optional[int]): Known optimal number of moves, as in get_reward
+
+    Returns:
+    - np.ndarray: The reward of every miner, between 0 and 1
+    """
+    problem = SlidingPuzzle(puzzle)
+    verifier = SlidingPuzzleVerifier(problem, max_moves=max_moves)
+    already_solved = problem.is_goal(puzzle)
+    costs = np.full(len(solutions), np.inf)
+    unique_costs = {}
+    for i, solution in enumerate(solutions):
+        if solution is None or (already_solved and solution == []):
+            if already_solved:
+                costs[i] = 0.0
+            continue
+        try:
+            # Oversized solutions are rejected before being copied and hashed
+            if len(solution) > max_moves:
+                continue
+            key = solution if isinstance(solution, str) else tuple(solution)
+            hash(key)
+        except TypeError:
+            key = None  # Malformed moves; verify on its own
+        if key is not None and key in unique_costs:
+            cost = unique_costs[key]
+        else:
+            cost = verifier.replay(solution)
+            if key is not None:
+                unique_costs[key] = cost
+        if cost is not None:
+            costs[i] = cost
+    bt.logging.debug(f"Verified {len(unique_costs)} unique solutions out of {len(solutions)}")
+    if optimal_length is not None:
+        costs = np.maximum(costs - optimal_length, 0.0)
+    # Invalid solutions have infinite cost and so zero reward
+    return np.exp(-0.1 * costs)
+
+
+def get_batch_rewards(puzzles: List[List[List[int]]],
+                      solutions: List[List[List[Tuple[int, int, int, int]] | str | None]],
+                      max_moves: int = MAX_SOLUTION_MOVES,
+                      optimal_lengths: Optional[List[Optional[int]]] = None) -> np.ndarray:
+    """
+    Reward all miner responses to a batch of puzzles: each miner's mean
+    get_rewards reward over the puzzles.
+
+    Args:
+    - puzzles (List[List[List[int]]]): The initial state of every puzzle of the batch
+    - solutions (List[List[...]]): For every miner, its solution to every puzzle
+    - max_moves (int): Solutions with more moves than this are rejected
+    - optimal_lengths (Optional[List[Optional[int]]]): Known optimal number of moves per puzzle
+
+    Returns:
+    - np.ndarray: The reward of every miner, between 0 and 1
+    """
+    if not puzzles:
+        return np.zeros(len(solutions))
+    optimal_lengths = optimal_lengths or [None] * len(puzzles)
+    rewards = np.zeros((len(solutions), len(puzzles)))
+    for j, (puzzle, optimal_length) in enumerate(zip(puzzles, optimal_lengths)):
+        rewards[:, j] = get_rewards(
+            puzzle, [miner_solutions[j] for miner_solutions in solutions],
+            max_moves=max_moves, optimal_length=optimal_length,
+        )
+    return rewards.mean(axis=1)
+
+
+def update_moving_average(scores: np.ndarray, rewards: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponential moving average of rewards; scores is extended with 1.0 if shorter."""
+    if len(scores) < len(rewards):
+        scores = np.concatenate([scores, np.ones(len(rewards) - len(scores))])
+    scores = scores.copy()
+    scores[:len(rewards)] = (1 - alpha) * scores[:len(rewards)] + alpha * rewards
+    return scores
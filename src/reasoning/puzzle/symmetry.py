@@ -0,0 +1,58 @@
+from typing import List, Sequence, Tuple
+
+Action = Tuple[int, int, int, int]
+
+# Symmetries of the goal layout (empty tile in the top-left corner, tile t
+# at cell t). Of the eight board symmetries only transposition keeps that
+# corner in place; relabelling tile t as the tile whose goal cell is the
+# transposed goal cell of t maps the goal to itself. Both transforms are
+# involutions, so each is its own inverse.
+IDENTITY = 0
+TRANSPOSE = 1
+TRANSFORMS = (IDENTITY, TRANSPOSE)
+
+
+def transpose_cells(size: int) -> List[int]:
+    """Cell index of the transposed cell, indexed by cell. Also the tile relabelling."""
+    return [(cell % size) * size + cell // size for cell in range(size * size)]
+
+
+def transform_board(board: Sequence[Sequence[int]], transform: int) -> List[List[int]]:
+    """Apply transform to a board; the result is as far from the goal as board."""
+    if transform == IDENTITY:
+        return [list(row) for row in board]
+    size = len(board)
+    relabel = transpose_cells(size)
+    return [[relabel[board[j][i]] for j in range(size)] for i in range(size)]
+
+
+def transform_actions(actions: Sequence[Action], transform: int) -> List[Action]:
+    """Map actions on a board to the same moves on the transformed board."""
+    if transform == IDENTITY:
+        return [tuple(action) for action in actions]
+    return [(c1, r1, c2, r2) for r1, c1, r2, c2 in actions]
+
+
+def transform_positions(tile_positions: Sequence[int], transpose: Sequence[int]) -> List[int]:
+    """
+    Cell index of every tile on the transposed board, given the same for the
+    board and transpose_cells(size).
+    """
+    positions = [0] * len(tile_positions)
+    for tile, cell in enumerate(tile_positions):
+        positions[transpose[tile]] = transpose[cell]
+    return positions
+
+
+def canonicalize(board: Sequence[Sequence[int]]) -> Tuple[List[List[int]], int]:
+    """
+    Canonical representative of board's symmetry class and the transform
+    that maps board to it. A solution of the representative is mapped back
+    to board with transform_actions(solution, transform).
+    """
+    best, best_transform = [list(row) for row in board], IDENTITY
+    for transform in TRANSFORMS[1:]:
+        candidate = transform_board(board, transform)
+        if candidate < best:
+            best, best_transform = candidate, transform
+    return best, best_transform
@@ -0,0 +1,65 @@
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Union
+
+MAGIC = b"RSNT"
+HEADER = struct.Struct("<4sI")  # magic, metadata length
+DEFAULT_TABLE_DIR = os.path.expanduser("~/.reasoning/tables")
+
+
+def save_table(path: str, data: Union[bytes, bytearray, memoryview], meta: Dict[str, Any]) -> None:
+    """
+    Write a byte table to path.
+    Layout: magic, metadata length, JSON metadata, then the raw table bytes.
+    The file is written to a temporary name and renamed, so readers never
+    map a partially written table.
+    """
+    encoded = json.dumps(meta, sort_keys=True).encode()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(encoded)))
+        f.write(encoded)
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ByteTable:
+    """
+    Read-only, memory-mapped view of a table written by save_table.
+    Pages are loaded lazily and shared through the page cache, so any number
+    of processes can map the same table for the cost of one copy.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a table file")
+        start = HEADER.size
+        self.meta: Dict[str, Any] = json.loads(self._mmap[start:start + meta_length])
+        self.offset = start + meta_length
+        self.length = len(self._mmap) - self.offset
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __reduce__(self):
+        # Pickle by path; the receiving process maps the same file
+        return (ByteTable, (self.path,))
+
+    def __getitem__(self, index: int) -> int:
+        return self._mmap[self.offset + index]
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the table bytes."""
+        return memoryview(self._mmap)[self.offset:]
+
+    def close(self) -> None:
+        self._mmap.close()
@@ -0,0 +1,125 @@
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from reasoning.puzzle.puzzle import pack_board, tile_bits
+
+# Boards are packed as by pack_board, 4 bits per cell, so up to 4x4 fit a uint64
+MAX_SIZE = 4
+MAX_TILE = 0xF  # Largest tile label a cell holds
+NIBBLE = np.uint64(MAX_TILE)
+
+
+def check_size(size: int) -> None:
+    if size > MAX_SIZE or tile_bits(size) != 4:
+        raise ValueError(f"Vectorized boards support sizes up to {MAX_SIZE}, got {size}")
+
+
+def pack_boards(boards: Iterable[List[List[int]]]) -> np.ndarray:
+    """Pack boards with pack_board into a uint64 array."""
+    return np.array([pack_board(board) for board in boards], dtype=np.uint64)
+
+
+def unpack_boards(states: np.ndarray, size: int) -> np.ndarray:
+    """Tiles of every state in row-major order, as a (len(states), size * size) uint8 array."""
+    check_size(size)
+    states = np.asarray(states, dtype=np.uint64)
+    cells = np.arange(size * size, dtype=np.uint64) * np.uint64(4)
+    return ((states[:, None] >> cells) & NIBBLE).astype(np.uint8)
+
+
+def blank_cells(states: np.ndarray, size: int) -> np.ndarray:
+    """Cell index of the empty tile of every state."""
+    blanks = np.zeros(len(states), dtype=np.int64)
+    for cell in range(1, size * size):
+        blanks[((states >> np.uint64(4 * cell)) & NIBBLE) == 0] = cell
+    return blanks
+
+
+class SlideMoves:
+    """
+    Vectorized successor generation for packed boards. Moving a tile is two
+    XORs, since the empty cell holds 0: one clears the tile's cell and one
+    writes the tile into the empty cell.
+
+    Moves of free_tile cost nothing (pattern database abstraction, where
+    every tile outside the pattern is relabelled free_tile); expand returns
+    the successors by the other moves and expand_free those by moving
+    free_tile.
+    """
+
+    def __init__(self, size: int, free_tile: Optional[int] = None):
+        check_size(size)
+        self.size = size
+        self.free_tile = free_tile
+        # (direction offset, mask of blank cells the move is legal from)
+        cells = np.arange(size * size)
+        rows, columns = cells // size, cells % size
+        self.moves = [
+            (-size, rows > 0),
+            (size, rows < size - 1),
+            (-1, columns > 0),
+            (1, columns < size - 1),
+        ]
+
+    def _successors(self, states: np.ndarray, free: Optional[bool]) -> np.ndarray:
+        states = np.asarray(states, dtype=np.uint64)
+        blanks = blank_cells(states, self.size)
+        parts = []
+        for offset, legal in self.moves:
+            selected = legal[blanks]
+            source = states[selected]
+            blank = blanks[selected].astype(np.uint64)
+            target = blank + np.uint64(offset) if offset > 0 else blank - np.uint64(-offset)
+            tile = (source >> (target * np.uint64(4))) & NIBBLE
+            if free is not None:
+                is_free = tile == np.uint64(self.free_tile)
+                keep = is_free if free else ~is_free
+                source, blank, target, tile = source[keep], blank[keep], target[keep], tile[keep]
+            parts.append(source ^ (tile << (target * np.uint64(4))) ^ (tile << (blank * np.uint64(4))))
+        return np.concatenate(parts)
+
+    def expand(self, states: np.ndarray) -> np.ndarray:
+        """Successors by unit-cost moves (all moves without a free tile)."""
+        return self._successors(states, None if self.free_tile is None else False)
+
+    def expand_free(self, states: np.ndarray) -> np.ndarray:
+        """Successors by moving free_tile."""
+        return self._successors(states, True)
+
+
+def rank_boards(tiles: np.ndarray) -> np.ndarray:
+    """
+    rank_permutation of every row of a (count, cells) array of tiles,
+    computed for all rows at once.
+    """
+    count, n = tiles.shape
+    p = tiles.astype(np.int64)
+    inverse = np.empty_like(p)
+    rows = np.arange(count)
+    inverse[rows[:, None], p] = np.arange(n)
+    ranks = np.zeros(count, dtype=np.int64)
+    radix = 1
+    for k in range(n, 1, -1):
+        item = p[:, k - 1].copy()
+        slot = inverse[:, k - 1].copy()
+        p[rows, slot] = item
+        inverse[rows, item] = slot
+        ranks += item * radix
+        radix *= k
+    return ranks
+
+
+def pattern_ranks(states: np.ndarray, size: int, pattern: Sequence[int]) -> np.ndarray:
+    """pdb.pattern_rank of the cells of the pattern tiles of every state."""
+    cells = size * size
+    tiles = unpack_boards(states, size)
+    # Scatter cell indices by tile; only the entries of pattern tiles are read
+    where = np.empty((len(states), 16), dtype=np.int8)
+    where[np.arange(len(states))[:, None], tiles] = np.arange(cells)
+    positions = where[:, list(pattern)].astype(np.int64)
+    ranks = np.zeros(len(states), dtype=np.int64)
+    for i in range(len(pattern)):
+        smaller = (positions[:, :i] < positions[:, i:i + 1]).sum(axis=1)
+        ranks = ranks * (cells - i) + positions[:, i] - smaller
+    return ranks
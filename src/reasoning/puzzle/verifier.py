@@ -1,41 +1,102 @@
 
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from reasoning.search.problem import Verifier
+from reasoning.puzzle.encoding import DIRECTIONS
+from reasoning.puzzle.puzzle import SlidingPuzzle
 
 
 class SlidingPuzzleVerifier(Verifier[List[List[int]], Tuple[int, int, int, int]]):
-    """Verifies the correctness of sliding puzzle solutions."""
+    """
+    Verifies the correctness of sliding puzzle solutions.
+    Solutions are action tuples or direction strings (encoding.encode_moves).
+    Solutions longer than max_moves are rejected without being replayed.
+    """
 
-    def verify_solution(self, solution: List[Tuple[int, int, int, int]]) -> bool:
+    def __init__(self, problem: SlidingPuzzle, max_moves: Optional[int] = None):
+        super().__init__(problem)
+        self.max_moves = max_moves
+        # Cell the empty tile moves to, by direction letter, for every cell
+        size = problem.size
+        self._targets: List[Dict[str, int]] = []
+        for cell in range(size * size):
+            i, j = divmod(cell, size)
+            self._targets.append({
+                letter: (i + di) * size + j + dj
+                for letter, (di, dj) in DIRECTIONS.items()
+                if 0 <= i + di < size and 0 <= j + dj < size
+            })
+
+    def replay(self, solution: Union[List[Tuple[int, int, int, int]], str]) -> Optional[float]:
         """
-        Verify if the solution is valid.
-        Returns True if valid, False otherwise.
+        Replay the solution once, in place on a flat copy of the board, tracking
+        the empty tile so each move is checked in O(1).
+        Returns the total cost if the solution is valid, None otherwise.
         """
-        current_state = self.problem.initial_state()
-        # Check each move in the solution
+        if isinstance(solution, str):
+            return self.replay_moves(solution)
+        if self.max_moves is not None and len(solution) > self.max_moves:
+            print(f"Solution too long: {len(solution)} moves")
+            return None
+        size = self.problem.size
+        board = [num for row in self.problem.initial for num in row]
+        empty = board.index(0)
+        empty_row, empty_col = divmod(empty, size)
         for i, action in enumerate(solution):
             # Verify action format
-            if not isinstance(action, tuple) or len(action) != 4:
+            if not (isinstance(action, tuple) and len(action) == 4
+                    and all(type(x) is int for x in action)):
                 print(f"Invalid action format at step {i}: {action}")
-                return False
-            # Verify action is legal
-            if action not in self.problem.actions(current_state):
+                return None
+            # Verify action moves the empty tile to an adjacent cell on the board
+            r1, c1, r2, c2 = action
+            if (r1 != empty_row or c1 != empty_col or abs(r2 - r1) + abs(c2 - c1) != 1
+                    or not (0 <= r2 < size and 0 <= c2 < size)):
                 print(f"Illegal move at step {i}: {action}")
-                return False
+                return None
             # Apply the move
-            current_state = self.problem.result(current_state, action)
+            target = r2 * size + c2
+            board[empty] = board[target]
+            board[target] = 0
+            empty, empty_row, empty_col = target, r2, c2
+        # Verify final state is goal state
+        if board != list(range(size * size)):
+            print("Final state is not the goal state.")
+            return None
+        # Every move costs 1
+        return float(len(solution))
+
+    def replay_moves(self, moves: str) -> Optional[float]:
+        """Same as replay, for a direction string, read without building action tuples."""
+        if self.max_moves is not None and len(moves) > self.max_moves:
+            print(f"Solution too long: {len(moves)} moves")
+            return None
+        size = self.problem.size
+        board = [num for row in self.problem.initial for num in row]
+        empty = board.index(0)
+        targets = self._targets
+        for i, letter in enumerate(moves):
+            # A missing entry is an unknown letter or a move off the board
+            target = targets[empty].get(letter)
+            if target is None:
+                print(f"Illegal move at step {i}: {letter!r}")
+                return None
+            board[empty] = board[target]
+            board[target] = 0
+            empty = target
         # Verify final state is goal state
-        if not self.problem.is_goal(current_state):
+        if board != list(range(size * size)):
             print("Final state is not the goal state.")
-            return False
-        return True
+            return None
+        # Every move costs 1
+        return float(len(moves))
+
+    def verify_solution(self, solution: List[Tuple[int, int, int, int]]) -> bool:
+        """
+        Verify if the solution is valid.
+        Returns True if valid, False otherwise.
+        """
+        return self.replay(solution) is not None
 
     def calculate_solution_cost(self, solution: List[Tuple[int, int, int, int]]) -> float:
-        """Calculate the total cost of the solution."""
-        total_cost = 0.0
-        current_state = self.problem.initial_state()
-        for action in solution:
-            next_state = self.problem.result(current_state, action)
-            total_cost += self.problem.step_cost(current_state, action, next_state)
-            current_state = next_state
-        return total_cost
+        """Calculate the total cost of the solution. Every move costs 1."""
+        return float(len(solution))
@@ -1 +1,10 @@
-from reasoning.search.algorithms import AStarSearch
+from reasoning.search.algorithms import AStarSearch, IDAStarSearch, BidirectionalSearch, ARAStarSearch
+from reasoning.search.frontier import Frontier, HeapFrontier, BucketFrontier
+from reasoning.search.deadline import Deadline
+from reasoning.search.pool import SolverPool, PoolFullError, RETURN_MARGIN
+from reasoning.search.ranking import rank_permutation, unrank_permutation, permutation_count, BitSet
+from reasoning.search.layers import breadth_first_layers
+from reasoning.search.node import SearchNode, NodeStore
+from reasoning.search.memory import MemoryBudget, current_rss
+from reasoning.search.parallel import HDAStarSearch
+from reasoning.search.portfolio import Portfolio, Configuration, load_history
@@ -1,9 +1,12 @@
 
 import time
-from typing import Generic, Optional, TypeVar, Dict, Any, Set, List
-from heapq import heappush, heappop
-from reasoning.search.node import SearchNode
+from typing import Callable, Generic, Optional, TypeVar, Dict, Any, Set, List, Tuple, Union
+from reasoning.search.deadline import Deadline
+from reasoning.search.frontier import Frontier, HeapFrontier
+from reasoning.search.memory import MemoryBudget
+from reasoning.search.node import NodeStore, SearchNode
 from reasoning.search.problem import Problem
+from reasoning.search.ranking import BitSet
 from abc import ABC, abstractmethod
 
 S = TypeVar('S')  # State type
@@ -16,17 +19,36 @@ class SearchAlgorithm(Generic[S, A], ABC):
         self.problem = problem
         self.nodes_generated = 0  # Total nodes discovered
         self.nodes_expanded = 0  # Total nodes visited
+        self.deadline: Optional[Deadline] = None  # Deadline of the running solve
+        self.memory = MemoryBudget()  # Memory budget of the running solve
+        self.degraded = False  # Whether the solve switched to a memory-bounded search
 
-    def solve(self, time_limit: Optional[float] = None, node_limit: Optional[int] = None) -> Dict[str, Any]:
+    def solve(self, time_limit: Optional[float] = None, node_limit: Optional[int] = None,
+              deadline: Optional[Deadline] = None,
+              memory_limit: Optional[int] = None) -> Dict[str, Any]:
         """
-        Run search algorithm and return results dictionary containing:
+        Run search algorithm until a solution is found, time_limit seconds
+        pass, node_limit nodes are generated or deadline expires or is
+        cancelled. A given deadline takes precedence over time_limit.
+        memory_limit is a resident memory budget in bytes for the whole
+        process; searches that store nodes switch to a memory-bounded search
+        when they approach it.
+
+        Returns results dictionary containing:
         - 'success': Whether a solution was found
         - 'solution': List of actions if found, None otherwise
         - 'nodes_generated': Total nodes generated
         - 'nodes_expanded': Total nodes expanded
         - 'time': Time taken in seconds
+        - 'peak_memory': Peak resident memory in bytes seen during the search
+        - 'degraded': Whether the memory budget forced a memory-bounded search
         """
         start_time = time.time()
+        if deadline is None:
+            deadline = Deadline(time_limit or None)
+        self.deadline = deadline
+        self.memory = MemoryBudget(memory_limit)
+        self.degraded = False
         initial_node = SearchNode(
             state=self.problem.initial_state(),
             action=None,
@@ -34,70 +56,153 @@ class SearchAlgorithm(Generic[S, A], ABC):
             path_cost=0,
             depth=0
         )
-        result = self._search(
-            initial_node,
-            start_time,
-            time_limit,
-            node_limit
-        )
+        result = self._search(initial_node, deadline, node_limit)
         end_time = time.time()
+        self.memory.sample()
         return {
             'success': result is not None,
             'solution': result.get_path() if result else None,
             'nodes_generated': self.nodes_generated,
             'nodes_expanded': self.nodes_expanded,
-            'time': end_time - start_time
+            'time': end_time - start_time,
+            'peak_memory': self.memory.peak,
+            'degraded': self.degraded
         }
 
     @abstractmethod
     def _search(
         self,
         initial_node: SearchNode[S, A],
-        start_time: float,
-        time_limit: Optional[float],
+        deadline: Deadline,
         node_limit: Optional[int]
     ) -> Optional[SearchNode[S, A]]:
-        """Implementation of the actual search algorithm."""
+        """
+        Implementation of the actual search algorithm.
+        Must call deadline.expired() once per iteration and stop when it is True.
+        """
         pass
 
+    def cancel(self) -> None:
+        """Stop the running solve at its next deadline check (thread-safe)."""
+        if self.deadline is not None:
+            self.deadline.cancel()
+
+    def _path_to_node(self, path: List[A]) -> SearchNode[S, A]:
+        """
+        Rebuild the node chain of a solution path from a fresh initial state,
+        for searches that do not keep a node chain (or mutate the root state).
+        """
+        node = SearchNode(
+            state=self.problem.initial_state(),
+            action=None,
+            parent=None,
+            path_cost=0,
+            depth=0
+        )
+        for action in path:
+            next_state = self.problem.result(node.state, action)
+            node = SearchNode(
+                state=next_state,
+                action=action,
+                parent=node,
+                path_cost=node.path_cost + self.problem.step_cost(node.state, action, next_state),
+                depth=node.depth + 1
+            )
+        return node
+
+    def _degrade(
+        self,
+        initial_node: SearchNode[S, A],
+        bound: float,
+        deadline: Deadline,
+        node_limit: Optional[int]
+    ) -> Optional[SearchNode[S, A]]:
+        """
+        Continue with IDA* from the root once the memory budget is reached.
+        bound must not exceed the optimal cost; IDA* starts its f bound there
+        rather than at h(root). The caller drops its node sets first.
+        """
+        self.degraded = True
+        fallback: IDAStarSearch[S, A] = IDAStarSearch(self.problem)
+        fallback.nodes_generated = self.nodes_generated
+        fallback.nodes_expanded = self.nodes_expanded
+        try:
+            return fallback._deepen(initial_node, bound, deadline, node_limit)
+        finally:
+            self.nodes_generated = fallback.nodes_generated
+            self.nodes_expanded = fallback.nodes_expanded
+
 class AStarSearch(SearchAlgorithm[S, A]):
-    """A* search algorithm implementation."""
+    """
+    A* search algorithm implementation.
+    frontier builds the open list; the default heap works with any costs,
+    BucketFrontier is faster when step costs and heuristics are integers.
+    If the problem's state keys are ranks (Problem.key_space_size) of at most
+    max_bitset_keys values, the closed set is a bit array instead of a set.
+    If the problem encodes its actions (Problem.action_count) and compact is
+    set, nodes are kept in a NodeStore and the frontier holds node ids.
+    Near the solve's memory_limit, the open and closed lists are dropped and
+    the search continues as IDA* from the largest f expanded so far.
+    """
+
+    def __init__(self, problem: Problem[S, A],
+                 frontier: Callable[[], Frontier] = HeapFrontier,
+                 max_bitset_keys: int = 1 << 28,
+                 compact: bool = True):
+        super().__init__(problem)
+        self.frontier = frontier
+        self.max_bitset_keys = max_bitset_keys
+        self.compact = compact
+        self.store: Optional[NodeStore] = None  # Node store of the last compact search
+
+    def _closed_set(self) -> Union[Set[Any], BitSet]:
+        key_space_size = self.problem.key_space_size()
+        if key_space_size is not None and key_space_size <= self.max_bitset_keys:
+            return BitSet(key_space_size)
+        return set()
 
     def _search(
         self,
         initial_node: SearchNode[S, A],
-        start_time: float,
-        time_limit: Optional[float],
+        deadline: Deadline,
         node_limit: Optional[int]
     ) -> Optional[SearchNode[S, A]]:
+        if self.compact and self.problem.action_count() is not None:
+            return self._search_compact(initial_node, deadline, node_limit)
         # Add counter for unique node IDs
         node_counter = 0
         initial_node.count = node_counter
-        frontier = []  # Priority queue
-        heappush(frontier, (0, initial_node))  # Priority = f(n) = g(n) + h(n)
-        explored: Set[Any] = set()  # Set of explored states
+        frontier = self.frontier()  # Priority = f(n) = g(n) + h(n)
+        frontier.push(initial_node, 0, 0)
+        explored = self._closed_set()  # Set of explored states
         self.nodes_generated = 1
         self.nodes_expanded = 0
+        lower_bound = 0.0  # Largest f popped, which never exceeds the optimal cost
 
         while frontier:
-            if time_limit and (time.time() - start_time) >= time_limit:
+            if deadline.expired():
                 return None
             if node_limit and self.nodes_generated >= node_limit:
                 return None
+            if self.memory.exceeded():
+                # Free the open and closed lists before going on with IDA*
+                del frontier, explored
+                return self._degrade(initial_node, lower_bound, deadline, node_limit)
 
             # Get node with lowest f-value
-            f, node = heappop(frontier)
+            f, node = frontier.pop()
+            lower_bound = max(lower_bound, f)
             if self.problem.is_goal(node.state):
                 return node
 
-            state_tuple = self._state_to_tuple(node.state)
-            if state_tuple not in explored:
-                explored.add(state_tuple)
+            state_key = self.problem.state_key(node.state)
+            if state_key not in explored:
+                explored.add(state_key)
                 self.nodes_expanded += 1
                 for action in self.problem.actions(node.state):
                     next_state = self.problem.result(node.state, action)
-                    next_state_tuple = self._state_to_tuple(next_state)
-                    if next_state_tuple not in explored:
+                    next_state_key = self.problem.state_key(next_state)
+                    if next_state_key not in explored:
                         step_cost = self.problem.step_cost(
                             node.state, action, next_state
                         )
@@ -111,11 +216,468 @@ class AStarSearch(SearchAlgorithm[S, A]):
                             count=node_counter  # Assign unique counter
                         )
                         f = child.path_cost + self.problem.heuristic(next_state)
-                        heappush(frontier, (f, child))
+                        frontier.push(child, f, child.path_cost)
                         self.nodes_generated += 1
         return None  # No solution found
 
-    def _state_to_tuple(self, state: S) -> Any:
-        """Helper method to convert state to a hashable tuple."""
-        # This method may need to be customized based on state representation
-        return tuple(tuple(row) for row in state)  # For 2D lists
+    def _search_compact(
+        self,
+        initial_node: SearchNode[S, A],
+        deadline: Deadline,
+        node_limit: Optional[int]
+    ) -> Optional[SearchNode[S, A]]:
+        """Same search as _search, with nodes in a NodeStore and node ids in the frontier."""
+        problem = self.problem
+        store = NodeStore(problem.state_bit_length(), problem.action_count())
+        self.store = store
+        # Node ids increase in creation order, so they also break heap ties
+        frontier = self.frontier()  # Priority = f(n) = g(n) + h(n)
+        frontier.push(store.add(initial_node.state, -1, 0.0, 0), 0, 0)
+        explored = self._closed_set()  # Set of explored states
+        self.nodes_generated = 1
+        self.nodes_expanded = 0
+        lower_bound = 0.0  # Largest f popped, which never exceeds the optimal cost
+
+        while frontier:
+            if deadline.expired():
+                return None
+            if node_limit and self.nodes_generated >= node_limit:
+                return None
+            if self.memory.exceeded():
+                # Free the open and closed lists before going on with IDA*
+                self.store = None
+                del frontier, explored, store
+                return self._degrade(initial_node, lower_bound, deadline, node_limit)
+
+            # Get node with lowest f-value
+            f, node = frontier.pop()
+            lower_bound = max(lower_bound, f)
+            state = store.state(node)
+            if problem.is_goal(state):
+                return self._path_to_node([problem.decode_action(code) for code in store.path_codes(node)])
+
+            state_key = problem.state_key(state)
+            if state_key not in explored:
+                explored.add(state_key)
+                self.nodes_expanded += 1
+                g = store.costs[node]
+                for action in problem.actions(state):
+                    next_state = problem.result(state, action)
+                    if problem.state_key(next_state) not in explored:
+                        path_cost = g + problem.step_cost(state, action, next_state)
+                        child = store.add(next_state, node, path_cost, problem.encode_action(action))
+                        frontier.push(child, path_cost + problem.heuristic(next_state), path_cost)
+                        self.nodes_generated += 1
+        return None  # No solution found
+
+class IDAStarSearch(SearchAlgorithm[S, A]):
+    """
+    Iterative deepening A* search.
+
+    Runs depth-first searches bounded by f = g + h, raising the bound to the
+    smallest f that exceeded it until a goal is found. Only the current path
+    is kept, so memory is linear in the solution depth. Problems that support
+    in-place moves (Problem.supports_in_place) are searched on a single state
+    with apply/undo and Problem.heuristic_after; otherwise one state per depth
+    is created with result(). Moves back to the parent state are skipped when
+    the problem defines Problem.inverse, and longer cycles by keeping the keys
+    of the states on the path, except for in-place states, whose keys would
+    have to be built for every child.
+    """
+
+    def _search(
+        self,
+        initial_node: SearchNode[S, A],
+        deadline: Deadline,
+        node_limit: Optional[int]
+    ) -> Optional[SearchNode[S, A]]:
+        self.nodes_generated = 1
+        self.nodes_expanded = 0
+        return self._deepen(initial_node, 0, deadline, node_limit)
+
+    def _deepen(
+        self,
+        initial_node: SearchNode[S, A],
+        bound: float,
+        deadline: Deadline,
+        node_limit: Optional[int]
+    ) -> Optional[SearchNode[S, A]]:
+        """Bounded passes with f bounds from max(bound, h(root)) upwards."""
+        if self.problem.is_goal(initial_node.state):
+            return initial_node
+        bound = max(bound, self.problem.heuristic(initial_node.state))
+        while bound != float('inf'):
+            path, bound = self._bounded_search(initial_node.state, bound, deadline, node_limit)
+            if path is not None:
+                return self._path_to_node(path)
+        return None  # No solution found, or limits reached
+
+    def _bounded_search(
+        self,
+        root: S,
+        bound: float,
+        deadline: Deadline,
+        node_limit: Optional[int]
+    ) -> Tuple[Optional[List[A]], float]:
+        """
+        One depth-first pass with f bounded by bound.
+        Returns (actions, bound) on success, (None, next bound) otherwise;
+        the next bound is infinite when the space is exhausted or limits hit.
+        """
+        problem = self.problem
+        in_place = problem.supports_in_place()
+        reversible = type(problem).inverse is not Problem.inverse
+        track_keys = not (in_place and reversible)
+        state = root
+        next_bound = float('inf')
+        # One entry per depth along the current path
+        path: List[A] = []
+        states: List[S] = [root]
+        undo_infos: List[Any] = []
+        costs: List[float] = [0.0]
+        heuristics: List[float] = [problem.heuristic(root)]
+        backs: List[Optional[A]] = [None]  # Inverse of the move into each state
+        keys: List[Any] = [problem.state_key(root)] if track_keys else []
+        on_path: Set[Any] = set(keys)
+        pending = [iter(problem.actions(root))]
+        self.nodes_expanded += 1
+        while pending:
+            if deadline.expired():
+                return None, float('inf')
+            if node_limit and self.nodes_generated >= node_limit:
+                return None, float('inf')
+
+            action = next(pending[-1], None)
+            if action is None:
+                # All children tried; backtrack one level
+                pending.pop()
+                if path:
+                    undone = path.pop()
+                    if in_place:
+                        problem.undo(state, undone, undo_infos.pop())
+                    else:
+                        states.pop()
+                        state = states[-1]
+                    costs.pop()
+                    heuristics.pop()
+                    backs.pop()
+                    if track_keys:
+                        on_path.discard(keys.pop())
+                continue
+            if action == backs[-1]:
+                continue
+
+            if in_place:
+                g = costs[-1] + problem.step_cost(state, action, None)
+                undo_info = problem.apply(state, action)
+                child = state
+                h = problem.heuristic_after(state, action, heuristics[-1])
+            else:
+                child = problem.result(state, action)
+                g = costs[-1] + problem.step_cost(state, action, child)
+                h = problem.heuristic(child)
+            self.nodes_generated += 1
+            key = problem.state_key(child) if track_keys else None
+            cycle = track_keys and key in on_path
+            f = g + h
+            if cycle or f > bound:
+                if not cycle and f < next_bound:
+                    next_bound = f
+                if in_place:
+                    problem.undo(state, action, undo_info)
+                continue
+            path.append(action)
+            if problem.is_goal(child):
+                return path, bound
+            # Descend into child
+            if in_place:
+                undo_infos.append(undo_info)
+            else:
+                states.append(child)
+                state = child
+            costs.append(g)
+            heuristics.append(h)
+            backs.append(problem.inverse(action) if reversible else None)
+            if track_keys:
+                keys.append(key)
+                on_path.add(key)
+            pending.append(iter(problem.actions(child)))
+            self.nodes_expanded += 1
+        return None, next_bound
+
+class BidirectionalSearch(SearchAlgorithm[S, A]):
+    """
+    Bidirectional heuristic search that meets in the middle (MM).
+
+    Searches forward from the initial state and backward from
+    Problem.goal_state(), expanding the direction with the lower priority
+    max(g + h, 2g), so neither search expands nodes beyond half the optimal
+    cost. The backward search applies actions from the goal and follows
+    reverse_heuristic; both paths are stitched using Problem.inverse.
+    Requires reversible actions; optimal when both heuristics are admissible.
+    """
+
+    def _search(
+        self,
+        initial_node: SearchNode[S, A],
+        deadline: Deadline,
+        node_limit: Optional[int]
+    ) -> Optional[SearchNode[S, A]]:
+        problem = self.problem
+        goal_node = SearchNode(
+            state=problem.goal_state(),
+            action=None,
+            parent=None,
+            path_cost=0,
+            depth=0
+        )
+        heuristics = (problem.heuristic, problem.reverse_heuristic)
+        # Per direction (0 = forward, 1 = backward): lazy heap of
+        # (priority, node), open and closed nodes by state key
+        frontiers: Tuple[HeapFrontier, HeapFrontier] = (HeapFrontier(), HeapFrontier())
+        opened: Tuple[Dict[Any, SearchNode], Dict[Any, SearchNode]] = ({}, {})
+        closed: Tuple[Dict[Any, SearchNode], Dict[Any, SearchNode]] = ({}, {})
+        node_counter = 0
+        for direction, node in enumerate((initial_node, goal_node)):
+            node.count = node_counter = node_counter + 1
+            opened[direction][problem.state_key(node.state)] = node
+            frontiers[direction].push(node, 0, 0)
+        self.nodes_generated = 2
+        self.nodes_expanded = 0
+
+        best_cost = float('inf')  # Cost of the cheapest meeting found so far
+        meeting: Optional[Tuple[SearchNode, SearchNode]] = None
+        start_key = problem.state_key(initial_node.state)
+        if start_key in opened[1]:
+            return initial_node
+
+        while frontiers[0] and frontiers[1]:
+            if deadline.expired():
+                return None
+            if node_limit and self.nodes_generated >= node_limit:
+                return None
+            if self.memory.exceeded():
+                # Free both searches and go on with IDA* from the start
+                frontiers = frontier = opened = closed = meeting = None
+                return self._degrade(initial_node, 0, deadline, node_limit)
+
+            # Drop stale heap entries, then read each direction's lowest priority
+            priorities = []
+            for direction in (0, 1):
+                frontier = frontiers[direction]
+                while frontier:
+                    priority, node = frontier.pop()
+                    if opened[direction].get(problem.state_key(node.state)) is node:
+                        frontier.push(node, priority, node.path_cost)
+                        break
+                priorities.append(priority if frontier else float('inf'))
+            # The lower priority is a lower bound on any undiscovered solution
+            if best_cost <= min(priorities):
+                break
+            direction = 0 if priorities[0] <= priorities[1] else 1
+            other = 1 - direction
+
+            _, node = frontiers[direction].pop()
+            key = problem.state_key(node.state)
+            del opened[direction][key]
+            closed[direction][key] = node
+            self.nodes_expanded += 1
+            for action in problem.actions(node.state):
+                next_state = problem.result(node.state, action)
+                if direction == 0:
+                    step_cost = problem.step_cost(node.state, action, next_state)
+                else:
+                    # Backward edges are forward moves from next_state to node
+                    step_cost = problem.step_cost(next_state, problem.inverse(action), node.state)
+                g = node.path_cost + step_cost
+                next_key = problem.state_key(next_state)
+                previous = opened[direction].get(next_key) or closed[direction].get(next_key)
+                if previous is not None and previous.path_cost <= g:
+                    continue
+                closed[direction].pop(next_key, None)
+                node_counter += 1
+                child = SearchNode(
+                    state=next_state,
+                    action=action,
+                    parent=node,
+                    path_cost=g,
+                    depth=node.depth + 1,
+                    count=node_counter
+                )
+                opened[direction][next_key] = child
+                h = heuristics[direction](next_state)
+                frontiers[direction].push(child, max(g + h, 2 * g), g)
+                self.nodes_generated += 1
+                match = opened[other].get(next_key) or closed[other].get(next_key)
+                if match is not None and g + match.path_cost < best_cost:
+                    best_cost = g + match.path_cost
+                    meeting = (child, match) if direction == 0 else (match, child)
+
+        if meeting is None:
+            return None
+        forward, backward = meeting
+        path = forward.get_path()
+        path.extend(problem.inverse(action) for action in reversed(backward.get_path()))
+        return self._path_to_node(path)
+
+class ARAStarSearch(SearchAlgorithm[S, A]):
+    """
+    Anytime Repairing A* (ARA*).
+
+    Runs weighted A* with f = g + weight * h, which finds a first solution
+    quickly, then lowers the weight by weight_step and repairs the search,
+    re-expanding only states whose cost improved, until the weight reaches 1
+    or the limits are hit. The best solution found so far (self.incumbent)
+    is always returned, along with a bound on how far its cost can be from
+    optimal, assuming an admissible heuristic. Near the solve's memory_limit
+    the incumbent is returned as it stands, or, before the first solution,
+    the search continues as IDA*.
+    """
+
+    def __init__(self, problem: Problem[S, A], initial_weight: float = 3.0,
+                 weight_step: float = 0.5):
+        super().__init__(problem)
+        self.initial_weight = initial_weight
+        self.weight_step = weight_step
+        self.incumbent: Optional[SearchNode[S, A]] = None  # Best goal node so far
+        self.weight: Optional[float] = None  # Weight of the last completed search pass
+        self.suboptimality_bound = float('inf')  # Incumbent cost / optimal cost <= this
+
+    def solve(self, time_limit: Optional[float] = None, node_limit: Optional[int] = None,
+              deadline: Optional[Deadline] = None,
+              memory_limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Same as SearchAlgorithm.solve, and additionally:
+        - 'weight': Weight of the last completed search pass
+        - 'suboptimality_bound': Bound on solution cost / optimal cost (1.0 = optimal)
+        """
+        self.incumbent = None
+        self.weight = None
+        self.suboptimality_bound = float('inf')
+        result = super().solve(time_limit, node_limit, deadline, memory_limit)
+        result['weight'] = self.weight
+        result['suboptimality_bound'] = self.suboptimality_bound if result['success'] else None
+        return result
+
+    def _search(
+        self,
+        initial_node: SearchNode[S, A],
+        deadline: Deadline,
+        node_limit: Optional[int]
+    ) -> Optional[SearchNode[S, A]]:
+        problem = self.problem
+        self.nodes_generated = 1
+        self.nodes_expanded = 0
+        if problem.is_goal(initial_node.state):
+            self.incumbent = initial_node
+            self.weight = self.initial_weight
+            self.suboptimality_bound = 1.0
+            return initial_node
+        weight = self.initial_weight
+        node_counter = 0
+        root_key = problem.state_key(initial_node.state)
+        nodes: Dict[Any, SearchNode[S, A]] = {root_key: initial_node}  # Best node per state
+        h_values: Dict[Any, float] = {root_key: problem.heuristic(initial_node.state)}
+        frontier = HeapFrontier()  # Lazy: entries are stale unless their node is current and open
+        opened: Set[Any] = {root_key}
+        closed: Set[Any] = set()
+        inconsistent: Set[Any] = set()  # Closed states whose cost improved this pass
+        frontier.push(initial_node, weight * h_values[root_key], 0)
+
+        while True:
+            # Improve the incumbent with the current weight
+            while frontier:
+                if deadline.expired() or (node_limit and self.nodes_generated >= node_limit):
+                    self._update_bound(nodes, h_values, opened | inconsistent)
+                    return self.incumbent
+                if self.memory.exceeded():
+                    self.degraded = True
+                    if self.incumbent is not None:
+                        # Stop improving and keep the current solution
+                        self._update_bound(nodes, h_values, opened | inconsistent)
+                        return self.incumbent
+                    # No solution yet: free every node and find an optimal one with IDA*
+                    del nodes, h_values, frontier, opened, closed, inconsistent
+                    goal = self._degrade(initial_node, 0, deadline, node_limit)
+                    if goal is not None:
+                        self.incumbent = goal
+                        self.weight = 1.0
+                        self.suboptimality_bound = 1.0
+                    return goal
+                f, node = frontier.pop()
+                key = problem.state_key(node.state)
+                if key not in opened or nodes[key] is not node:
+                    continue
+                if self.incumbent is not None and f >= self.incumbent.path_cost:
+                    frontier.push(node, f, node.path_cost)
+                    break
+                opened.discard(key)
+                closed.add(key)
+                self.nodes_expanded += 1
+                for action in problem.actions(node.state):
+                    next_state = problem.result(node.state, action)
+                    g = node.path_cost + problem.step_cost(node.state, action, next_state)
+                    next_key = problem.state_key(next_state)
+                    best = nodes.get(next_key)
+                    if best is not None and best.path_cost <= g:
+                        continue
+                    node_counter += 1
+                    child = SearchNode(
+                        state=next_state,
+                        action=action,
+                        parent=node,
+                        path_cost=g,
+                        depth=node.depth + 1,
+                        count=node_counter
+                    )
+                    nodes[next_key] = child
+                    self.nodes_generated += 1
+                    if problem.is_goal(next_state):
+                        if self.incumbent is None or g < self.incumbent.path_cost:
+                            self.incumbent = child
+                        continue
+                    if next_key not in h_values:
+                        h_values[next_key] = problem.heuristic(next_state)
+                    if next_key in closed:
+                        inconsistent.add(next_key)
+                    else:
+                        opened.add(next_key)
+                        frontier.push(child, g + weight * h_values[next_key], g)
+
+            if self.incumbent is None:
+                return None  # Search space exhausted without a solution
+            self.weight = weight
+            remaining = opened | inconsistent
+            self._update_bound(nodes, h_values, remaining)
+            if self.suboptimality_bound <= 1.0:
+                return self.incumbent
+
+            # Lower the weight and repair: reopen inconsistent states and
+            # re-prioritise everything open under the new weight
+            weight = max(1.0, weight - self.weight_step)
+            frontier = HeapFrontier()
+            opened = remaining
+            for key in opened:
+                node = nodes[key]
+                frontier.push(node, node.path_cost + weight * h_values[key], node.path_cost)
+            closed = set()
+            inconsistent = set()
+
+    def _update_bound(self, nodes: Dict[Any, SearchNode[S, A]], h_values: Dict[Any, float],
+                      remaining: Set[Any]) -> None:
+        """
+        Bound the incumbent's suboptimality. Some state on an optimal path is
+        open or inconsistent with its optimal g, so the smallest g + h among
+        them is a lower bound on the optimal cost.
+        """
+        if self.incumbent is None:
+            return
+        lower = min(
+            (nodes[key].path_cost + h_values[key] for key in remaining),
+            default=float('inf')
+        )
+        cost = self.incumbent.path_cost
+        bound = 1.0 if cost <= lower else (cost / lower if lower > 0 else float('inf'))
+        if self.weight is not None:
+            bound = min(bound, self.weight)
+        self.suboptimality_bound = max(1.0, min(self.suboptimality_bound, bound))
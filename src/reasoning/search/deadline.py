@@ -0,0 +1,59 @@
+import threading
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    Time budget and cancellation token for a search.
+
+    Search loops call expired() once per iteration. The clock and the cancel
+    flag are only read every check_interval calls, so the check costs a
+    counter decrement in the hot loop. cancel() may be called from any
+    thread; pass a multiprocessing Event as cancel_event to cancel a search
+    running in another process.
+    """
+
+    def __init__(self, time_limit: Optional[float] = None, cancel_event=None,
+                 check_interval: int = 256):
+        self.start = time.monotonic()
+        self.expires_at = None if time_limit is None else self.start + time_limit
+        self.event = cancel_event if cancel_event is not None else threading.Event()
+        self.check_interval = check_interval
+        self._countdown = check_interval
+        self._expired = False
+
+    def cancel(self) -> None:
+        """Ask the search using this deadline to stop at its next check."""
+        self.event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def remaining(self) -> float:
+        """Seconds left, or infinity without a time limit."""
+        if self.expires_at is None:
+            return float('inf')
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Amortised check, for use once per search iteration."""
+        if self._expired:
+            return True
+        self._countdown -= 1
+        if self._countdown > 0:
+            return False
+        self._countdown = self.check_interval
+        return self.check()
+
+    def check(self) -> bool:
+        """Read the clock and the cancel flag now."""
+        if self.event.is_set() or (
+            self.expires_at is not None and time.monotonic() >= self.expires_at
+        ):
+            self._expired = True
+        return self._expired
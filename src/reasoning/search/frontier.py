@@ -0,0 +1,105 @@
+from abc import ABC, abstractmethod
+from heapq import heappush, heappop
+from typing import Generic, List, Tuple, TypeVar
+
+T = TypeVar('T')  # Item type, usually SearchNode
+
+
+class Frontier(ABC, Generic[T]):
+    """Open list of a best-first search, ordered by f."""
+
+    @abstractmethod
+    def push(self, item: T, f: float, g: float) -> None:
+        """Add item with priority f; g is the path cost, used for tie-breaking."""
+        pass
+
+    @abstractmethod
+    def pop(self) -> Tuple[float, T]:
+        """Remove and return (f, item) with the lowest f."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class HeapFrontier(Frontier[T]):
+    """
+    Binary heap frontier; works with any real-valued costs.
+    Ties on f are broken by comparing items (SearchNode insertion order).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, T]] = []
+
+    def push(self, item: T, f: float, g: float) -> None:
+        heappush(self._heap, (f, item))
+
+    def pop(self) -> Tuple[float, T]:
+        return heappop(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class BucketFrontier(Frontier[T]):
+    """
+    Bucket queue indexed by integer f, for problems with small integer step
+    costs and heuristics. Push is O(1) and pop is amortised O(1) while f is
+    non-decreasing, as with a consistent heuristic.
+
+    tie_breaking selects the order within an f bucket:
+    - 'high_g': deepest node first, then LIFO. On the final f layer this
+      heads straight for the goal instead of expanding the layer breadth-first.
+    - 'lifo': most recently pushed node first.
+    """
+
+    def __init__(self, tie_breaking: str = 'high_g'):
+        if tie_breaking not in ('high_g', 'lifo'):
+            raise ValueError(f"Unknown tie_breaking: {tie_breaking}")
+        self.by_g = tie_breaking == 'high_g'
+        # f -> g -> stack of items (a single g slot when not ordering by g)
+        self._buckets: List[List[List[T]]] = []
+        self._counts: List[int] = []  # Items per f bucket
+        self._top_g: List[int] = []  # Highest possibly non-empty g slot per f bucket
+        self._min_f = 0
+        self._size = 0
+
+    def push(self, item: T, f: float, g: float) -> None:
+        f_index = int(f)
+        if f_index != f or f_index < 0:
+            raise ValueError(f"BucketFrontier needs non-negative integer f values, got {f}")
+        while len(self._buckets) <= f_index:
+            self._buckets.append([])
+            self._counts.append(0)
+            self._top_g.append(0)
+        g_index = int(g) if self.by_g else 0
+        bucket = self._buckets[f_index]
+        while len(bucket) <= g_index:
+            bucket.append([])
+        bucket[g_index].append(item)
+        if g_index > self._top_g[f_index]:
+            self._top_g[f_index] = g_index
+        self._counts[f_index] += 1
+        if f_index < self._min_f:
+            self._min_f = f_index
+        self._size += 1
+
+    def pop(self) -> Tuple[float, T]:
+        if not self._size:
+            raise IndexError("pop from empty frontier")
+        f_index = self._min_f
+        while not self._counts[f_index]:
+            f_index += 1
+        self._min_f = f_index
+        bucket = self._buckets[f_index]
+        g_index = self._top_g[f_index]
+        while not bucket[g_index]:
+            g_index -= 1
+        self._top_g[f_index] = g_index
+        self._counts[f_index] -= 1
+        self._size -= 1
+        return f_index, bucket[g_index].pop()
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+Expand = Callable[[np.ndarray], np.ndarray]
+
+
+def isin_sorted(values: np.ndarray, sorted_values: np.ndarray) -> np.ndarray:
+    """Boolean mask of values found in sorted_values, by binary search."""
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    index = np.searchsorted(sorted_values, values)
+    np.minimum(index, len(sorted_values) - 1, out=index)
+    return sorted_values[index] == values
+
+
+class LayerStore:
+    """
+    Holds BFS layers as sorted uint64 arrays. Layers with more than
+    spill_threshold states are written to memory-mapped files in a
+    temporary directory under spill_dir and read back through the page cache.
+    """
+
+    def __init__(self, spill_threshold: Optional[int] = None, spill_dir: Optional[str] = None):
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self._directory: Optional[str] = None
+        self._count = 0
+
+    def store(self, layer: np.ndarray) -> np.ndarray:
+        if self.spill_threshold is None or len(layer) <= self.spill_threshold:
+            return layer
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="bfs-", dir=self.spill_dir)
+        path = os.path.join(self._directory, f"layer-{self._count}.u64")
+        self._count += 1
+        spilled = np.memmap(path, dtype=np.uint64, mode="w+", shape=layer.shape)
+        spilled[:] = layer
+        spilled.flush()
+        # The mapping stays valid after the name is removed
+        os.unlink(path)
+        return spilled
+
+    def close(self) -> None:
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+
+def _expand_new(states: np.ndarray, expand: Expand, known: List[np.ndarray],
+                chunk_size: int) -> np.ndarray:
+    """Sorted unique successors of states that are in none of the sorted arrays in known."""
+    parts = []
+    for start in range(0, len(states), chunk_size):
+        successors = np.unique(expand(np.asarray(states[start:start + chunk_size])))
+        for layer in known:
+            successors = successors[~isin_sorted(successors, layer)]
+        parts.append(successors)
+    if not parts:
+        return np.empty(0, dtype=np.uint64)
+    return np.unique(np.concatenate(parts))
+
+
+def breadth_first_layers(
+    start: np.ndarray,
+    expand: Expand,
+    expand_free: Optional[Expand] = None,
+    chunk_size: int = 1 << 20,
+    spill_threshold: Optional[int] = None,
+    spill_dir: Optional[str] = None,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Breadth-first search over states packed into uint64, a whole layer at a time.
+    Yields (depth, layer) with layer the sorted unique states at that depth.
+
+    expand maps an array of states to their successors over unit-cost moves;
+    expand_free, if given, to their successors over zero-cost moves, and
+    every layer is closed under those before it is yielded (0-1 BFS).
+    Moves must be reversible at the same cost, so the unit-cost successors of
+    layer d lie in layers d-1 to d+1 and only the two latest layers are kept
+    for duplicate detection. Layers are expanded chunk_size states at a time;
+    layers larger than spill_threshold are moved to memory-mapped files.
+    """
+    store = LayerStore(spill_threshold, spill_dir)
+    try:
+        previous = np.empty(0, dtype=np.uint64)
+        layer = np.unique(np.asarray(start, dtype=np.uint64))
+        depth = 0
+        while len(layer):
+            if expand_free is not None:
+                frontier = layer
+                while len(frontier):
+                    frontier = _expand_new(frontier, expand_free, [layer], chunk_size)
+                    layer = np.union1d(layer, frontier)
+            layer = store.store(layer)
+            yield depth, layer
+            next_layer = _expand_new(layer, expand, [previous, layer], chunk_size)
+            previous, layer = layer, next_layer
+            depth += 1
+    finally:
+        store.close()
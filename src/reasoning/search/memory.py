@@ -0,0 +1,56 @@
+import os
+import resource
+import sys
+from typing import Optional
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes. Read from /proc on Linux;
+    elsewhere the peak RSS so far is the best available figure.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryBudget:
+    """
+    Resident memory budget for a search.
+
+    Search loops call exceeded() once per expansion. RSS is only sampled
+    every check_interval calls; exceeded() turns True once it reaches
+    threshold * limit, leaving the rest of the limit as headroom for the
+    growth between samples and for the search to degrade to a memory-bounded
+    one. Without a limit the budget only records the peak RSS.
+    """
+
+    def __init__(self, limit: Optional[int] = None, threshold: float = 0.9,
+                 check_interval: int = 1024):
+        self.limit = limit
+        self.threshold = threshold
+        self.check_interval = check_interval
+        self._countdown = check_interval
+        self.peak = current_rss()
+
+    def sample(self) -> int:
+        """Read the RSS now and update the peak."""
+        rss = current_rss()
+        if rss > self.peak:
+            self.peak = rss
+        return rss
+
+    def exceeded(self) -> bool:
+        """Amortised check, for use once per search iteration."""
+        self._countdown -= 1
+        if self._countdown > 0:
+            return False
+        self._countdown = self.check_interval
+        rss = self.sample()
+        return self.limit is not None and rss >= self.threshold * self.limit
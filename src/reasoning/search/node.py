@@ -1,19 +1,25 @@
-
-from dataclasses import dataclass
-from typing import Generic, Optional, TypeVar, List
+from array import array
+from typing import Any, Generic, Optional, TypeVar, List
 
 S = TypeVar('S')  # State type
 A = TypeVar('A')  # Action type
 
-@dataclass
 class SearchNode(Generic[S, A]):
-    """A single node in a search tree."""
-    state: S
-    action: Optional[A]  # Action that led to this state (None for root)
-    parent: Optional['SearchNode[S, A]']  # Parent node (None for root)
-    path_cost: float  # Cost from start to this node
-    depth: int  # Depth in the search tree
-    count: int = 0  # Unique counter for tie-breaking
+    """A single node in a search tree. Slotted, so nodes carry no __dict__."""
+    __slots__ = ('state', 'action', 'parent', 'path_cost', 'depth', 'count')
+
+    def __init__(self, state: S, action: Optional[A], parent: Optional['SearchNode[S, A]'],
+                 path_cost: float, depth: int, count: int = 0):
+        self.state = state
+        self.action = action  # Action that led to this state (None for root)
+        self.parent = parent  # Parent node (None for root)
+        self.path_cost = path_cost  # Cost from start to this node
+        self.depth = depth  # Depth in the search tree
+        self.count = count  # Unique counter for tie-breaking
+
+    def __repr__(self) -> str:
+        return (f"SearchNode(state={self.state!r}, action={self.action!r}, "
+                f"path_cost={self.path_cost}, depth={self.depth}, count={self.count})")
 
     def __lt__(self, other: 'SearchNode[S, A]') -> bool:
         # This is used by heapq for comparing nodes
@@ -27,3 +33,68 @@ class SearchNode(Generic[S, A]):
             path.append(current.action)
             current = current.parent
         return list(reversed(path))
+
+
+class NodeStore:
+    """
+    Search nodes as parallel typed arrays, addressed by integer node ids.
+
+    Each node holds its parent id (-1 for the root), path cost, action code
+    (Problem.encode_action) and state. States that are non-negative ints of
+    at most state_bits bits are split over 64-bit words of one array;
+    other states are kept in a list. Arrays over-allocate as they grow, so
+    appends are amortised O(1), and no per-node objects are kept.
+    """
+
+    def __init__(self, state_bits: Optional[int] = None, action_count: int = 256):
+        self.parents = array('q')
+        self.costs = array('d')
+        self.actions = array('B' if action_count <= 1 << 8 else 'H' if action_count <= 1 << 16 else 'L')
+        self.words = 0 if state_bits is None else max(1, (state_bits + 63) // 64)
+        self._states: Any = array('Q') if self.words else []
+
+    def add(self, state: Any, parent: int, cost: float, action: int) -> int:
+        """Store a node and return its id."""
+        node = len(self.parents)
+        self.parents.append(parent)
+        self.costs.append(cost)
+        self.actions.append(action)
+        if self.words == 1:
+            self._states.append(state)
+        elif self.words:
+            for _ in range(self.words):
+                self._states.append(state & 0xFFFFFFFFFFFFFFFF)
+                state >>= 64
+        else:
+            self._states.append(state)
+        return node
+
+    def state(self, node: int) -> Any:
+        if self.words == 1:
+            return self._states[node]
+        if self.words:
+            start = node * self.words
+            state = 0
+            for i in range(self.words - 1, -1, -1):
+                state = (state << 64) | self._states[start + i]
+            return state
+        return self._states[node]
+
+    def path_codes(self, node: int) -> List[int]:
+        """Action codes from the root to node, following parent ids."""
+        codes = []
+        while self.parents[node] >= 0:
+            codes.append(self.actions[node])
+            node = self.parents[node]
+        codes.reverse()
+        return codes
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def nbytes(self) -> int:
+        """Bytes used by the typed arrays (excluding over-allocation and list-held states)."""
+        arrays = [self.parents, self.costs, self.actions]
+        if self.words:
+            arrays.append(self._states)
+        return sum(len(a) * a.itemsize for a in arrays)
@@ -0,0 +1,267 @@
+import multiprocessing
+import os
+import queue
+import signal
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from reasoning.search.algorithms import SearchAlgorithm, S, A
+from reasoning.search.deadline import Deadline
+from reasoning.search.frontier import Frontier, HeapFrontier
+from reasoning.search.node import SearchNode
+from reasoning.search.problem import Problem
+
+# Trace request for the best goal of the receiving worker
+TRACE_GOAL = "goal"
+
+
+def state_owner(key: Any, workers: int) -> int:
+    """
+    Worker that owns the state with this key. Integer keys are hashed
+    multiplicatively (Fibonacci hashing); other keys by the CRC of their
+    repr, since str hashes differ between processes.
+    """
+    if isinstance(key, int):
+        return (((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % workers
+    return zlib.crc32(repr(key).encode()) % workers
+
+
+def _worker(index, problem, frontier_factory, inboxes, results, incumbent, goal_owner,
+            sent, received, idle, generated, expanded, stop, batch_size, expand_limit):
+    """
+    One HDA* worker: owns the states that state_owner maps to index, with
+    its own open list and best-g table, and forwards children to their
+    owners in batches, reading its inbox after every expand_limit
+    expansions. Messages are batches of (state, g, parent key, action)
+    lists, ('trace', key, actions) path requests and None to exit.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Unread batches are dropped at shutdown instead of blocking exit
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+    workers = len(inboxes)
+    inbox = inboxes[index]
+    encode = problem.action_count() is not None
+    frontier: Frontier = frontier_factory()
+    best: Dict[Any, Tuple[float, Any, Any]] = {}  # Key -> (g, parent key, action)
+    outboxes: List[list] = [[] for _ in range(workers)]
+    # Unlocked view of the incumbent cost for reads; updates take the lock
+    bound_view = incumbent.get_obj()
+    goal_key = None
+    counter = 0
+    resting = False
+
+    def flush(owner: int) -> None:
+        batch = outboxes[owner]
+        if batch:
+            sent[index] += len(batch)
+            inboxes[owner].put(batch)
+            outboxes[owner] = []
+
+    def receive(state, g: float, parent_key, action) -> None:
+        nonlocal counter, goal_key
+        key = problem.state_key(state)
+        entry = best.get(key)
+        if entry is not None and entry[0] <= g:
+            return
+        best[key] = (g, parent_key, action)
+        if problem.is_goal(state):
+            with incumbent.get_lock():
+                if g < incumbent.value:
+                    incumbent.value = g
+                    goal_owner.value = index
+                    goal_key = key
+            return
+        f = g + problem.heuristic(state)
+        if f < bound_view.value:
+            counter += 1
+            # Deeper nodes first among equal f, for heap frontiers
+            frontier.push((-g, counter, state), f, g)
+
+    def expand(limit: int) -> Tuple[int, int]:
+        count = children = 0
+        bound = bound_view.value
+        while frontier and count < limit:
+            f, item = frontier.pop()
+            if f >= bound:
+                frontier.push(item, f, -item[0])
+                break
+            g, state = -item[0], item[2]
+            key = problem.state_key(state)
+            if best[key][0] < g:
+                continue  # Reached again more cheaply since it was queued
+            count += 1
+            for action in problem.actions(state):
+                child = problem.result(state, action)
+                child_g = g + problem.step_cost(state, action, child)
+                code = problem.encode_action(action) if encode else action
+                owner = state_owner(problem.state_key(child), workers)
+                children += 1
+                if owner == index:
+                    receive(child, child_g, key, code)
+                else:
+                    outboxes[owner].append((child, child_g, key, code))
+                    if len(outboxes[owner]) >= batch_size:
+                        flush(owner)
+        return count, children
+
+    while True:
+        try:
+            message = inbox.get(timeout=0.01) if resting else inbox.get_nowait()
+        except queue.Empty:
+            message = []
+        if message is None:
+            break
+        if isinstance(message, tuple):
+            # Follow parent keys towards the root, handing over between owners
+            _, key, actions = message
+            if key == TRACE_GOAL:
+                key = goal_key
+            while True:
+                _, parent_key, action = best[key]
+                if parent_key is None:
+                    results.put(actions)
+                    break
+                actions.append(action)
+                owner = state_owner(parent_key, workers)
+                if owner != index:
+                    inboxes[owner].put(("trace", parent_key, actions))
+                    break
+                key = parent_key
+            continue
+        if stop.is_set():
+            resting = True
+            continue
+        if message:
+            idle[index] = 0
+            resting = False
+            for state, g, parent_key, action in message:
+                receive(state, g, parent_key, action)
+            received[index] += len(message)
+            continue
+        # Inbox drained: expand a batch of nodes, then pass their children on
+        count, children = expand(expand_limit)
+        expanded[index] += count
+        generated[index] += children
+        for owner in range(workers):
+            flush(owner)
+        if not count:
+            idle[index] = 1
+            resting = True
+
+
+class HDAStarSearch(SearchAlgorithm[S, A]):
+    """
+    Hash-distributed A* (HDA*) over worker processes.
+
+    Each worker owns the states whose key hashes to it (state_owner), keeps
+    their open list and best path costs, and sends generated children to
+    their owners through multiprocessing queues, batch_size at a time.
+    Workers read their inbox every expand_limit expansions, so cheap nodes
+    sent by others are not left behind a long run of local expansions.
+    Workers expand in parallel without a global f order, so states are
+    reopened when reached more cheaply and goals only tighten a shared
+    incumbent cost; nodes with f at or above it are pruned. The search ends
+    when every worker is idle and every sent child has been received in two
+    consecutive polls (counting termination detection), at which point the
+    incumbent is optimal for an admissible heuristic.
+
+    The problem is pickled to the workers. Workers are started per solve,
+    so the search cannot run inside daemonic processes such as SolverPool
+    workers. With the default forkserver context they are forked from a
+    server process that has imported the problem's module once, which keeps
+    the start-up cost per solve to milliseconds.
+    """
+
+    def __init__(self, problem: Problem[S, A], workers: Optional[int] = None,
+                 batch_size: int = 256, expand_limit: int = 16, frontier: Callable[[], Frontier] = HeapFrontier,
+                 context: str = "forkserver", poll_interval: float = 0.002):
+        super().__init__(problem)
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.expand_limit = expand_limit
+        self.frontier = frontier
+        self.context = context
+        self.poll_interval = poll_interval
+
+    def _search(
+        self,
+        initial_node: SearchNode[S, A],
+        deadline: Deadline,
+        node_limit: Optional[int]
+    ) -> Optional[SearchNode[S, A]]:
+        problem = self.problem
+        self.nodes_generated = 1
+        self.nodes_expanded = 0
+        if problem.is_goal(initial_node.state):
+            return initial_node
+        ctx = multiprocessing.get_context(self.context)
+        if self.context == "forkserver":
+            # Only takes effect before the server has started
+            ctx.set_forkserver_preload([__name__, type(problem).__module__])
+        workers = self.workers
+        inboxes = [ctx.Queue() for _ in range(workers)]
+        results = ctx.Queue()
+        incumbent = ctx.Value('d', float('inf'))
+        goal_owner = ctx.Value('i', -1, lock=False)
+        # Per-worker counters, each written only by its worker
+        sent = ctx.Array('q', workers, lock=False)
+        received = ctx.Array('q', workers, lock=False)
+        idle = ctx.Array('b', workers, lock=False)
+        generated = ctx.Array('q', workers, lock=False)
+        expanded = ctx.Array('q', workers, lock=False)
+        stop = ctx.Event()
+
+        root_owner = state_owner(problem.state_key(initial_node.state), workers)
+        sent[root_owner] += 1
+        inboxes[root_owner].put([(initial_node.state, 0, None, None)])
+        processes = [
+            ctx.Process(
+                target=_worker,
+                args=(i, problem, self.frontier, inboxes, results, incumbent, goal_owner,
+                      sent, received, idle, generated, expanded, stop, self.batch_size,
+                      self.expand_limit),
+                daemon=True,
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            terminated = False
+            previous = None
+            while not deadline.check():
+                time.sleep(self.poll_interval)
+                self.nodes_generated = 1 + sum(generated)
+                if node_limit and self.nodes_generated >= node_limit:
+                    break
+                quiet = all(idle) and sum(sent) == sum(received)
+                snapshot = (sum(sent), sum(received)) if quiet else None
+                if snapshot is not None and snapshot == previous:
+                    terminated = True
+                    break
+                previous = snapshot
+            stop.set()
+            self.nodes_generated = 1 + sum(generated)
+            self.nodes_expanded = sum(expanded)
+            if not terminated or goal_owner.value < 0:
+                return None
+            inboxes[goal_owner.value].put(("trace", TRACE_GOAL, []))
+            try:
+                # The trace takes one message per owner change along the path
+                codes = results.get(timeout=10.0)
+            except queue.Empty:
+                return None
+            decode = problem.action_count() is not None
+            path = [problem.decode_action(code) if decode else code for code in reversed(codes)]
+            return self._path_to_node(path)
+        finally:
+            stop.set()
+            for inbox in inboxes:
+                inbox.cancel_join_thread()
+                inbox.put(None)
+            for process in processes:
+                process.join(timeout=1.0)
+                if process.is_alive():
+                    process.terminate()
@@ -0,0 +1,182 @@
+import importlib
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Sequence, Type
+
+from reasoning.search.algorithms import SearchAlgorithm
+from reasoning.search.deadline import Deadline
+from reasoning.search.problem import Problem
+
+# Seconds for a solve that runs to its deadline to notice it (Deadline reads
+# the clock every few hundred iterations) and send its result back; callers
+# waiting until a time T should give the solve a deadline this much earlier
+RETURN_MARGIN = 0.25
+
+
+class PoolFullError(Exception):
+    """Raised when a solve is submitted while the pool's queue is full."""
+    pass
+
+
+def _worker(index, tasks, results, cancel_events, current_tasks, cancelled_below, lock, preload,
+            memory_limit):
+    """Worker process loop: run queued solves until a None task arrives."""
+    # Shutdown is driven by the parent; ignore the terminal's Ctrl-C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Import problem modules up front so the first solve does not pay for it
+    for module in preload:
+        importlib.import_module(module)
+    results.put((None, index, None))
+    cancel_event = cancel_events[index]
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, algorithm, problem, expires_at, node_limit, kwargs = task
+        with lock:
+            if task_id < cancelled_below.value:
+                results.put((task_id, None, "Cancelled while queued"))
+                continue
+            current_tasks[index] = task_id
+            cancel_event.clear()
+        try:
+            # The monotonic clock is shared by all processes on the host
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                results.put((task_id, None, "Deadline passed while queued"))
+                continue
+            deadline = Deadline(remaining, cancel_event=cancel_event)
+            result = algorithm(problem, **kwargs).solve(node_limit=node_limit, deadline=deadline,
+                                                       memory_limit=memory_limit)
+            results.put((task_id, result, None))
+        except Exception as e:
+            results.put((task_id, None, f"{type(e).__name__}: {e}"))
+        finally:
+            with lock:
+                current_tasks[index] = -1
+
+
+class SolverPool:
+    """
+    Pool of pre-started worker processes that run SearchAlgorithm solves, so
+    CPU-bound searches run in parallel outside the caller's GIL.
+
+    The task queue holds at most max_pending solves; submit raises
+    PoolFullError instead of queueing more (backpressure). Every solve has a
+    deadline that includes its time in the queue, and can be cancelled while
+    running. Problems are pickled to the workers; modules named in preload
+    are imported by every worker before the pool is ready. memory_limit is
+    the resident memory budget in bytes of each worker process, passed to
+    every solve.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 preload: Sequence[str] = (), context: str = "spawn",
+                 memory_limit: Optional[int] = None):
+        ctx = multiprocessing.get_context(context)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        self.tasks = ctx.Queue(maxsize=self.max_pending)
+        self.results = ctx.Queue()
+        self.lock = ctx.Lock()
+        self.cancel_events = [ctx.Event() for _ in range(self.workers)]
+        self.current_tasks = ctx.Array('q', [-1] * self.workers, lock=False)
+        # Queued tasks with a lower id than this are dropped by the workers
+        self.cancelled_below = ctx.Value('q', 0, lock=False)
+        self.futures: Dict[int, Future] = {}
+        self.futures_lock = threading.Lock()
+        self.task_ids = itertools.count()
+        self.processes = [
+            ctx.Process(
+                target=_worker,
+                args=(i, self.tasks, self.results, self.cancel_events, self.current_tasks,
+                      self.cancelled_below, self.lock, tuple(preload), memory_limit),
+                daemon=True,
+            )
+            for i in range(self.workers)
+        ]
+        for process in self.processes:
+            process.start()
+        # Wait until every worker has started and imported its modules
+        for _ in self.processes:
+            self.results.get()
+        self.collector = threading.Thread(target=self._collect, daemon=True)
+        self.collector.start()
+
+    def submit(self, algorithm: Type[SearchAlgorithm], problem: Problem, time_limit: float,
+               node_limit: Optional[int] = None, **kwargs: Any) -> Future:
+        """
+        Queue algorithm(problem, **kwargs).solve() with time_limit seconds from now.
+        The returned future resolves to the solve's result dictionary.
+        Raises PoolFullError if max_pending solves are already queued.
+        """
+        task_id = next(self.task_ids)
+        future: Future = Future()
+        future.task_id = task_id
+        with self.futures_lock:
+            self.futures[task_id] = future
+        expires_at = time.monotonic() + time_limit
+        try:
+            self.tasks.put_nowait((task_id, algorithm, problem, expires_at, node_limit, kwargs))
+        except queue.Full:
+            with self.futures_lock:
+                del self.futures[task_id]
+            # Queue.qsize is not implemented on macOS
+            raise PoolFullError(f"{self.max_pending} solves already queued")
+        return future
+
+    def solve(self, algorithm: Type[SearchAlgorithm], problem: Problem, time_limit: float,
+              node_limit: Optional[int] = None, **kwargs: Any) -> Dict[str, Any]:
+        """Submit and wait for the result. Raises PoolFullError or RuntimeError."""
+        future = self.submit(algorithm, problem, time_limit, node_limit, **kwargs)
+        # Workers stop at the deadline; allow a little for returning the result
+        return future.result(timeout=time_limit + 1.0)
+
+    def cancel(self, future: Future) -> None:
+        """Stop the solve behind future at its next deadline check."""
+        with self.lock:
+            for i in range(self.workers):
+                if self.current_tasks[i] == future.task_id:
+                    self.cancel_events[i].set()
+
+    def cancel_all(self) -> None:
+        """Stop every running solve and drop every queued one."""
+        with self.lock:
+            self.cancelled_below.value = next(self.task_ids)
+            for event in self.cancel_events:
+                event.set()
+
+    def close(self) -> None:
+        """Cancel running solves and stop the workers."""
+        self.cancel_all()
+        for _ in self.processes:
+            try:
+                self.tasks.put_nowait(None)
+            except queue.Full:
+                break
+        for process in self.processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+
+    def _collect(self) -> None:
+        """Resolve futures as workers report results."""
+        while True:
+            try:
+                task_id, result, error = self.results.get()
+            except (EOFError, OSError):
+                break
+            with self.futures_lock:
+                future = self.futures.pop(task_id, None)
+            if future is None:
+                continue
+            if error is not None:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(result)
@@ -0,0 +1,288 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Type
+
+from reasoning.search.algorithms import SearchAlgorithm
+from reasoning.search.pool import PoolFullError, SolverPool
+from reasoning.search.problem import Problem, ReplayVerifier
+
+
+class Configuration(NamedTuple):
+    """One portfolio entrant: an algorithm run on one formulation of the instance."""
+    name: str
+    algorithm: Type[SearchAlgorithm]
+    problem: Problem  # Same instance as the other entrants; the heuristic may differ
+    kwargs: Dict[str, Any] = {}  # Passed to the algorithm's constructor
+    optimal: bool = False  # Whether a solution from this entrant is proven optimal
+
+
+def proves_optimal(configuration: Configuration, result: Dict[str, Any]) -> bool:
+    """Whether a successful result of configuration is proven optimal."""
+    if not result['success']:
+        return False
+    bound = result.get('suboptimality_bound')
+    return configuration.optimal or (bound is not None and bound <= 1.0)
+
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    """Records written by Portfolio, oldest first; torn lines are skipped."""
+    records = []
+    try:
+        with open(os.path.expanduser(path)) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+class _Race:
+    """State of one portfolio solve, updated by the pool's result callbacks."""
+
+    def __init__(
+        self, configurations: Sequence[Configuration], instance: Optional[str]
+    ):
+        self.configurations = configurations
+        self.instance = instance
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.futures: Dict[str, Future] = {}
+        self.pending = 0
+        self.done = False
+        # Result of the best verified solution
+        self.best: Optional[Dict[str, Any]] = None
+        self.winner: Optional[str] = None
+        self.optimal = False
+        self.lower_bound = 0.0  # Proven lower bound on the optimal cost
+        self.outcomes: Dict[str, Dict[str, Any]] = {}  # Name -> summary for the history
+        self.future: Future = Future()
+
+
+class Portfolio:
+    """
+    Races several configurations of one instance in a SolverPool.
+
+    Every configuration is submitted as its own pool solve under the same
+    deadline. Solutions are replayed with ReplayVerifier on the entrant's
+    problem and the cheapest valid one is kept. As soon as a configuration
+    proves its solution optimal the others are cancelled; otherwise the
+    race ends when all of them have returned, at the latest at the deadline.
+    With history_path set, one JSON line per race records the winner and
+    every entrant's outcome. Win rates over the races each configuration
+    entered, including those in an existing history file, order the
+    entrants of later races (schedule).
+    """
+
+    def __init__(self, pool: SolverPool, history_path: Optional[str] = None):
+        self.pool = pool
+        self.history_path = os.path.expanduser(history_path) if history_path else None
+        self.history_lock = threading.Lock()
+        self.wins: Counter = Counter()  # Configuration name -> races won
+        self.entered: Counter = Counter()  # Configuration name -> races entered
+        self.races: Dict[Future, _Race] = {}  # Unfinished races by their future
+        self.races_lock = threading.Lock()
+        if self.history_path:
+            os.makedirs(os.path.dirname(self.history_path) or ".", exist_ok=True)
+            for record in load_history(self.history_path):
+                if record.get('winner') is not None:
+                    self.wins[record['winner']] += 1
+                self.entered.update(record.get('results', {}).keys())
+
+    def win_rate(self, name: str) -> float:
+        """
+        Share of its races a configuration won, smoothed towards 1/2, so
+        configurations that have not raced yet rank above proven losers.
+        """
+        with self.history_lock:
+            return (self.wins[name] + 1) / (self.entered[name] + 2)
+
+    def schedule(self, configurations: Sequence[Configuration],
+                 count: Optional[int] = None) -> List[Configuration]:
+        """
+        The count configurations with the best win_rate, best first; ties
+        keep their order. When some are left out, the last of two or more
+        slots goes to the configuration that has entered the fewest races,
+        so that left-out configurations keep being tried.
+        """
+        ranked = sorted(
+            configurations, key=lambda configuration: -self.win_rate(configuration.name)
+        )
+        if count is None or count >= len(ranked):
+            return ranked
+        chosen = ranked[:count]
+        if count >= 2:
+            with self.history_lock:
+                explore = min(
+                    ranked[count - 1:],
+                    key=lambda configuration: self.entered[configuration.name],
+                )
+            chosen[-1] = explore
+        return chosen
+
+    def submit(self, configurations: Sequence[Configuration], time_limit: float,
+               instance: Optional[str] = None) -> Future:
+        """
+        Start the race. The returned future resolves to a result dictionary
+        like SearchAlgorithm.solve's, with 'configuration' naming the winner,
+        'optimal', 'cost', 'suboptimality_bound' and per-entrant 'results'.
+        Entrants that do not fit in the pool's queue are left out; raises
+        PoolFullError if none fit.
+        """
+        race = _Race(configurations, instance)
+        for configuration in configurations:
+            try:
+                future = self.pool.submit(
+                    configuration.algorithm,
+                    configuration.problem,
+                    time_limit,
+                    **configuration.kwargs,
+                )
+            except PoolFullError:
+                if not race.futures:
+                    raise
+                break
+            race.futures[configuration.name] = future
+        race.pending = len(race.futures)
+        with self.races_lock:
+            self.races[race.future] = race
+        entrants = {entrant.name: entrant for entrant in configurations}
+        for name, future in list(race.futures.items()):
+            future.add_done_callback(
+                lambda done, entrant=entrants[name]: self._finish_entrant(
+                    race, entrant, done
+                )
+            )
+        return race.future
+
+    def solve(self, configurations: Sequence[Configuration], time_limit: float,
+              instance: Optional[str] = None) -> Dict[str, Any]:
+        """Submit and wait for the race. Raises PoolFullError."""
+        future = self.submit(configurations, time_limit, instance)
+        # Workers stop at the deadline; allow a little for returning the results
+        return future.result(timeout=time_limit + 1.0)
+
+    def cancel(self, future: Future) -> None:
+        """Stop every entrant of the race behind future; finished races have none."""
+        with self.races_lock:
+            race = self.races.get(future)
+        if race is None:
+            return
+        for entrant in race.futures.values():
+            self.pool.cancel(entrant)
+
+    def _finish_entrant(
+        self, race: _Race, configuration: Configuration, future: Future
+    ) -> None:
+        # Runs in the pool's collector thread as each entrant returns
+        name = configuration.name
+        outcome: Dict[str, Any] = {
+            'success': False,
+            'time': round(time.monotonic() - race.started, 3),
+        }
+        with race.lock:
+            race.pending -= 1
+            error = future.exception()
+            if error is not None:
+                outcome['error'] = str(error)
+            else:
+                result = future.result()
+                outcome['success'] = result['success']
+                if result['success']:
+                    verifier = ReplayVerifier(configuration.problem)
+                    cost = verifier.calculate_solution_cost(result['solution'])
+                    outcome['cost'] = cost
+                    if cost == float('inf'):
+                        outcome['success'] = False
+                        outcome['error'] = "Invalid solution"
+                    else:
+                        self._record_solution(race, configuration, result, cost)
+            race.outcomes[name] = outcome
+            if race.done or (not race.optimal and race.pending):
+                return
+            race.done = True
+            others = [
+                f
+                for other, f in race.futures.items()
+                if other != race.winner and not f.done()
+            ]
+        for other in others:
+            self.pool.cancel(other)
+        summary = self._summary(race)
+        self._log(race, summary)
+        with self.races_lock:
+            self.races.pop(race.future, None)
+        race.future.set_result(summary)
+
+    def _record_solution(self, race: _Race, configuration: Configuration,
+                         result: Dict[str, Any], cost: float) -> None:
+        """Keep a verified solution if it is the cheapest so far; raise the bound."""
+        optimal = proves_optimal(configuration, result)
+        bound = result.get('suboptimality_bound')
+        if optimal:
+            race.lower_bound = max(race.lower_bound, cost)
+        elif bound is not None and bound != float('inf'):
+            # cost <= bound * optimal cost
+            race.lower_bound = max(race.lower_bound, cost / bound)
+        best_cost = race.best['cost'] if race.best is not None else float('inf')
+        if cost < best_cost or (optimal and cost <= best_cost):
+            race.best = dict(result, cost=cost)
+            race.winner = configuration.name
+        # Proven optimal once no solution can be cheaper than the best one
+        race.optimal = race.best['cost'] <= race.lower_bound
+
+    def _summary(self, race: _Race) -> Dict[str, Any]:
+        best = race.best
+        summary: Dict[str, Any] = {
+            'success': best is not None,
+            'solution': best['solution'] if best else None,
+            'cost': best['cost'] if best else None,
+            'configuration': race.winner,
+            'optimal': race.optimal,
+            'suboptimality_bound': None,
+            'weight': best.get('weight') if best else None,
+            'nodes_generated': sum(
+                f.result()['nodes_generated']
+                for f in race.futures.values()
+                if f.done() and f.exception() is None
+            ),
+            'time': time.monotonic() - race.started,
+            'results': dict(race.outcomes),
+        }
+        for name in race.futures:
+            if name not in race.outcomes:
+                summary['results'][name] = {'success': False, 'cancelled': True}
+        if best is not None:
+            if race.optimal:
+                summary['suboptimality_bound'] = 1.0
+            elif race.lower_bound > 0:
+                summary['suboptimality_bound'] = best['cost'] / race.lower_bound
+            else:
+                summary['suboptimality_bound'] = float('inf')
+        return summary
+
+    def _log(self, race: _Race, summary: Dict[str, Any]) -> None:
+        with self.history_lock:
+            self.entered.update(race.futures.keys())
+            if summary['configuration'] is not None:
+                self.wins[summary['configuration']] += 1
+        if not self.history_path:
+            return
+        record = {
+            'timestamp': time.time(),
+            'instance': race.instance,
+            'winner': summary['configuration'],
+            'optimal': summary['optimal'],
+            'cost': summary['cost'],
+            'time': round(summary['time'], 3),
+            'results': summary['results'],
+        }
+        with self.history_lock:
+            with open(self.history_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
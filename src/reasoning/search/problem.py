@@ -1,6 +1,6 @@
 
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, List
+from typing import Any, Generic, Hashable, Optional, TypeVar, List
 
 S = TypeVar('S')  # State type
 A = TypeVar('A')  # Action type
@@ -37,6 +37,81 @@ class Problem(ABC, Generic[S, A]):
         """Estimate of cost from state to nearest goal. Default: optimistic 0."""
         return 0.0
 
+    def state_key(self, state: S) -> Hashable:
+        """
+        Return a hashable key identifying state, used for duplicate detection.
+        Default: the state itself, which must then be hashable.
+        """
+        return state
+
+    def key_space_size(self) -> Optional[int]:
+        """
+        Return n if every state_key is an int in range(n), such as a permutation
+        rank, so that searches can keep closed sets as bit arrays. Default: None.
+        """
+        return None
+
+    # Optional compact node storage extension. Problems implementing it return
+    # the number of distinct actions from action_count, and searches may then
+    # store nodes in a NodeStore with small integer action codes.
+
+    def action_count(self) -> Optional[int]:
+        """Return the number of distinct action codes, or None if actions are not encoded."""
+        return None
+
+    def encode_action(self, action: A) -> int:
+        """Return the code of action, in range(action_count())."""
+        raise NotImplementedError
+
+    def decode_action(self, code: int) -> A:
+        """Inverse of encode_action."""
+        raise NotImplementedError
+
+    def state_bit_length(self) -> Optional[int]:
+        """
+        Return b if every state is a non-negative int below 2 ** b, so node
+        stores can keep states in 64-bit words. Default: None.
+        """
+        return None
+
+    # Optional extension for bidirectional search, for problems with a single
+    # explicit goal state and reversible actions.
+
+    def goal_state(self) -> S:
+        """Return the unique goal state."""
+        raise NotImplementedError
+
+    def inverse(self, action: A) -> A:
+        """Return the action that undoes action, i.e. result(result(s, a), inverse(a)) == s."""
+        raise NotImplementedError
+
+    def reverse_heuristic(self, state: S) -> float:
+        """Estimate of cost from the initial state to state. Default: optimistic 0."""
+        return 0.0
+
+    # Optional in-place move extension, used by depth-first algorithms that keep
+    # a single state. Problems implementing it return True from supports_in_place.
+    # step_cost is then called before the move is applied, with next_state=None.
+
+    def supports_in_place(self) -> bool:
+        """Return True if apply and undo are implemented."""
+        return False
+
+    def apply(self, state: S, action: A) -> Any:
+        """Apply action to state in place and return whatever undo needs to revert it."""
+        raise NotImplementedError
+
+    def undo(self, state: S, action: A, undo_info: Any) -> None:
+        """Revert apply(state, action), which returned undo_info."""
+        raise NotImplementedError
+
+    def heuristic_after(self, state: S, action: A, h: float) -> float:
+        """
+        Heuristic of state just after apply(state, action), given its value h
+        before the move. Default: recomputed with heuristic(state).
+        """
+        return self.heuristic(state)
+
 class Verifier(Generic[S, A]):
     """Abstract base class for solution verifiers."""
 
@@ -52,3 +127,28 @@ class Verifier(Generic[S, A]):
     def calculate_solution_cost(self, solution: List[A]) -> float:
         """Calculate the total cost of the solution."""
         pass
+
+
+class ReplayVerifier(Verifier[S, A]):
+    """Verifies a solution by replaying it from the initial state with the problem's own moves."""
+
+    def _replay(self, solution: List[A]) -> Optional[float]:
+        """Cost of solution, or None if a move is not legal or it does not end at a goal."""
+        problem = self.problem
+        state = problem.initial_state()
+        cost = 0.0
+        for action in solution:
+            if action not in problem.actions(state):
+                return None
+            next_state = problem.result(state, action)
+            cost += problem.step_cost(state, action, next_state)
+            state = next_state
+        return cost if problem.is_goal(state) else None
+
+    def verify_solution(self, solution: List[A]) -> bool:
+        return self._replay(solution) is not None
+
+    def calculate_solution_cost(self, solution: List[A]) -> float:
+        """Cost of solution; infinite if it is not valid."""
+        cost = self._replay(solution)
+        return float('inf') if cost is None else cost
@@ -0,0 +1,64 @@
+from math import factorial
+from typing import List, Sequence
+
+
+def permutation_count(n: int) -> int:
+    """Number of permutations of n items, i.e. the range of rank_permutation."""
+    return factorial(n)
+
+
+def rank_permutation(perm: Sequence[int]) -> int:
+    """
+    Myrvold-Ruskey rank of a permutation of 0..n-1 in [0, n!), in O(n).
+    Not lexicographic order, but a bijection; unrank_permutation inverts it.
+    """
+    n = len(perm)
+    p = list(perm)
+    inverse = [0] * n
+    for i, item in enumerate(p):
+        inverse[item] = i
+    rank = 0
+    radix = 1
+    for k in range(n, 1, -1):
+        # Move item k - 1 into slot k - 1, recording what was there
+        item = p[k - 1]
+        slot = inverse[k - 1]
+        p[k - 1], p[slot] = k - 1, item
+        inverse[item] = slot
+        rank += item * radix
+        radix *= k
+    return rank
+
+
+def unrank_permutation(rank: int, n: int) -> List[int]:
+    """Permutation of 0..n-1 with the given rank_permutation rank, in O(n)."""
+    p = list(range(n))
+    for k in range(n, 0, -1):
+        rank, i = divmod(rank, k)
+        p[k - 1], p[i] = p[i], p[k - 1]
+    return p
+
+
+class BitSet:
+    """
+    Set of the integers 0..size-1 stored as one bit each, for closed sets
+    over ranked state spaces. Supports the add / in / len subset of set.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._bits = bytearray((size + 7) >> 3)
+        self._count = 0
+
+    def add(self, key: int) -> None:
+        index = key >> 3
+        mask = 1 << (key & 7)
+        if not self._bits[index] & mask:
+            self._bits[index] |= mask
+            self._count += 1
+
+    def __contains__(self, key: int) -> bool:
+        return bool(self._bits[key >> 3] & (1 << (key & 7)))
+
+    def __len__(self) -> int:
+        return self._count
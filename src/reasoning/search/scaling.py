@@ -0,0 +1,41 @@
+"""
+Measure how HDA* scales with workers against serial A* on scrambled boards, e.g.
+python -m reasoning.search.scaling --size 4 --moves 60 --workers 1 2 4 8
+Times include starting the worker processes, as every miner solve pays it;
+the first HDA* solve also starts the forkserver.
+"""
+import argparse
+import os
+import random
+
+from reasoning.puzzle.generator import SlidingPuzzleGenerator
+from reasoning.puzzle.puzzle import PackedSlidingPuzzle
+from reasoning.search.algorithms import AStarSearch
+from reasoning.search.parallel import HDAStarSearch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HDA* against serial A*.")
+    parser.add_argument("--size", type=int, default=4, help="Board width.")
+    parser.add_argument("--moves", type=int, default=60, help="Random moves per scramble.")
+    parser.add_argument("--boards", type=int, default=3, help="Number of boards.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4],
+                        help="HDA* worker counts to measure.")
+    parser.add_argument("--seed", type=int, default=0, help="Scramble seed.")
+    args = parser.parse_args()
+    random.seed(args.seed)
+    boards = [SlidingPuzzleGenerator(args.size).generate(args.moves) for _ in range(args.boards)]
+    print(f"{os.cpu_count()} CPUs, {args.boards} boards of {args.moves} random moves")
+    for board in boards:
+        problem = PackedSlidingPuzzle(board)
+        serial = AStarSearch(problem).solve()
+        line = f"length {len(serial['solution'])}: A* {serial['time']:.2f} s"
+        for workers in args.workers:
+            result = HDAStarSearch(problem, workers=workers).solve()
+            assert len(result['solution']) == len(serial['solution'])
+            line += f", HDA* x{workers} {result['time']:.2f} s ({serial['time'] / result['time']:.2f}x)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from reasoning.puzzle.distance import DistanceTable
+
+# The forkserver process does not inherit the sys.path entry pytest adds for
+# src (before Python 3.12), so module preloading there needs PYTHONPATH
+_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [_SRC, os.environ.get("PYTHONPATH")]))
+
+# Fixed 3x3 boards and their optimal solution lengths
+BOARDS = [
+    ([[0, 1, 2], [3, 4, 5], [6, 7, 8]], 0),
+    ([[3, 1, 2], [0, 4, 5], [6, 7, 8]], 1),
+    ([[1, 2, 5], [3, 0, 7], [6, 8, 4]], 8),
+    ([[1, 6, 2], [3, 7, 0], [8, 4, 5]], 15),
+    ([[1, 8, 6], [3, 7, 4], [5, 0, 2]], 21),
+    ([[8, 2, 0], [1, 5, 3], [7, 4, 6]], 26),
+]
+
+
+@pytest.fixture(scope="session")
+def distance_table():
+    return DistanceTable.build(3)
+
+
+def replay(board, actions):
+    """Board after applying actions, checking that each one moves the empty tile to a neighbour."""
+    board = [row[:] for row in board]
+    for r1, c1, r2, c2 in actions:
+        assert board[r1][c1] == 0 and abs(r1 - r2) + abs(c1 - c2) == 1
+        board[r1][c1], board[r2][c2] = board[r2][c2], 0
+    return board
+
+
+def goal(size):
+    return [[i * size + j for j in range(size)] for i in range(size)]
@@ -0,0 +1,40 @@
+"""Search algorithms with scripted behaviour, importable by pool workers."""
+import time
+from typing import Any, Dict, List, Optional
+
+from reasoning.search.algorithms import SearchAlgorithm
+
+
+class SlowSearch(SearchAlgorithm):
+    """Finds nothing and returns only at its deadline or when cancelled."""
+
+    def _search(self, initial_node, deadline, node_limit):
+        while not deadline.check():
+            time.sleep(0.005)
+        return None
+
+
+class FixedSearch(SearchAlgorithm):
+    """Returns a given solution, legal or not, with an optional suboptimality bound."""
+
+    def __init__(self, problem, solution: List, bound: Optional[float] = None, delay: float = 0.0):
+        super().__init__(problem)
+        self.solution = solution
+        self.bound = bound
+        self.delay = delay
+
+    def solve(self, time_limit=None, node_limit=None, deadline=None, memory_limit=None) -> Dict[str, Any]:
+        time.sleep(self.delay)
+        return {
+            'success': True,
+            'solution': list(self.solution),
+            'nodes_generated': 1,
+            'nodes_expanded': 0,
+            'time': self.delay,
+            'peak_memory': 0,
+            'degraded': False,
+            'suboptimality_bound': self.bound,
+        }
+
+    def _search(self, initial_node, deadline, node_limit):
+        return None
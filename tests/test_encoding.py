@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from reasoning.puzzle.encoding import decode_board, decode_moves, encode_board, encode_moves
+from reasoning.puzzle.generator import SlidingPuzzleGenerator
+
+from test_verifier import BOARD, MOVES, SOLUTION
+
+
+@pytest.mark.parametrize("size", range(2, 9))
+def test_board_round_trip(size):
+    random.seed(size)
+    board = SlidingPuzzleGenerator(size).generate(50)
+    encoded = encode_board(board)
+    assert len(encoded) == size * size
+    assert decode_board(encoded) == board
+
+
+def test_board_encoding():
+    assert encode_board(BOARD) == "125307684"
+    assert encode_board([[0, 1], [2, 3]]) == "0123"
+
+
+@pytest.mark.parametrize("encoded", ["12345678", "012!", "01 3"])
+def test_invalid_board(encoded):
+    with pytest.raises(ValueError):
+        decode_board(encoded)
+
+
+def test_board_too_large():
+    with pytest.raises(ValueError):
+        encode_board([list(range(i * 9, (i + 1) * 9)) for i in range(9)])
+
+
+def test_moves_round_trip():
+    assert encode_moves(SOLUTION) == MOVES
+    assert decode_moves(MOVES, BOARD) == SOLUTION
+    assert encode_moves([]) == ""
+    assert decode_moves("", BOARD) == []
+
+
+def test_invalid_moves():
+    with pytest.raises(ValueError):
+        encode_moves([(1, 1, 2, 2)])
+    with pytest.raises(ValueError):
+        decode_moves("RX", BOARD)
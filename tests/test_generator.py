@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from reasoning.puzzle.distance import DistanceTable
+from reasoning.puzzle.generator import SlidingPuzzleGenerator, diameter_bound
+
+
+@pytest.mark.parametrize("distance", [0, 1, 10, 20, 31])
+def test_with_table(distance_table, distance):
+    random.seed(distance)
+    board = SlidingPuzzleGenerator(3, distance_table=distance_table).generate_at_distance(distance)
+    assert distance_table.distance(board) == distance
+
+
+@pytest.mark.parametrize("distance", [0, 1, 6, 12])
+def test_without_table(distance_table, distance):
+    random.seed(distance)
+    board = SlidingPuzzleGenerator(3).generate_at_distance(distance)
+    assert distance_table.distance(board) == distance
+
+
+def test_2x2():
+    table = DistanceTable.build(2)
+    for distance in range(7):
+        assert table.distance(SlidingPuzzleGenerator(2).generate_at_distance(distance)) == distance
+
+
+@pytest.mark.parametrize("size, distance", [(2, 7), (2, 10), (3, 32), (4, 81), (3, -1)])
+def test_beyond_diameter(size, distance):
+    with pytest.raises(ValueError):
+        SlidingPuzzleGenerator(size).generate_at_distance(distance)
+
+
+def test_beyond_diameter_with_table(distance_table):
+    with pytest.raises(ValueError):
+        SlidingPuzzleGenerator(3, distance_table=distance_table).generate_at_distance(32)
+
+
+def test_diameter_bound(distance_table):
+    assert diameter_bound(3) == distance_table.max_distance
+    assert diameter_bound(2) == DistanceTable.build(2).max_distance
+    assert diameter_bound(5) > 0
+
+
+def test_gives_up():
+    # Walks this short are never 12 moves from the goal
+    generator = SlidingPuzzleGenerator(3)
+    generator.generate = lambda num_moves: SlidingPuzzleGenerator(3).generate(2)
+    with pytest.raises(ValueError):
+        generator.generate_at_distance(12, max_attempts=5)
+
@@ -0,0 +1,89 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from reasoning.puzzle import hierarchical
+from reasoning.puzzle.generator import SlidingPuzzleGenerator
+from reasoning.puzzle.hierarchical import HierarchicalSolver, shorten_moves
+
+from conftest import BOARDS, goal, replay
+
+
+@pytest.mark.parametrize("size", range(5, 9))
+@pytest.mark.parametrize("seed", range(3))
+def test_solves_large_boards(size, seed):
+    random.seed(size * 10 + seed)
+    board = SlidingPuzzleGenerator(size).generate(1000)
+    actions = HierarchicalSolver().solve(board)
+    assert replay(board, actions) == goal(size)
+    assert shorten_moves(board, actions) == actions
+
+
+@pytest.mark.parametrize("size", [2, 3, 4])
+def test_solves_small_boards(size):
+    random.seed(size)
+    board = SlidingPuzzleGenerator(size).generate(200)
+    assert replay(board, HierarchicalSolver().solve(board)) == goal(size)
+
+
+def test_corner_from_distance_table(distance_table):
+    # The last 3x3 region is solved optimally, so a board only scrambled
+    # there gets an optimal solution
+    for board3, optimal in BOARDS:
+        board = goal(5)
+        for i in range(3):
+            board[i][:3] = [(tile // 3) * 5 + tile % 3 for tile in board3[i]]
+        actions = HierarchicalSolver(distance_table).solve(board)
+        assert len(actions) == optimal
+        assert replay(board, actions) == goal(5)
+
+
+def test_shared_between_threads():
+    # The miner answers concurrent requests with one solver
+    solver = HierarchicalSolver()
+    rng = random.Random(0)
+    boards = []
+    for i in range(32):
+        random.seed(rng.random())
+        boards.append(SlidingPuzzleGenerator(5 + i % 4).generate(500))
+    with ThreadPoolExecutor(16) as executor:
+        solutions = list(executor.map(solver.solve, boards))
+    for board, actions in zip(boards, solutions):
+        assert replay(board, actions) == goal(len(board))
+
+
+def test_failed_placement_raises(monkeypatch):
+    monkeypatch.setattr(hierarchical._Stages, "_place_tile", lambda self, tile, target: False)
+    random.seed(0)
+    with pytest.raises(RuntimeError):
+        HierarchicalSolver().solve(SlidingPuzzleGenerator(5).generate(500))
+
+
+def test_goal():
+    assert HierarchicalSolver().solve(goal(6)) == []
+
+
+def test_unsolvable():
+    board = goal(5)
+    board[0][1], board[0][2] = board[0][2], board[0][1]
+    with pytest.raises(ValueError):
+        HierarchicalSolver().solve(board)
+
+
+def test_shorten_moves():
+    board = goal(5)
+    # Cycling the empty tile three times around a 2x2 square restores the board
+    square = [(0, 0, 1, 0), (1, 0, 1, 1), (1, 1, 0, 1), (0, 1, 0, 0)] * 3
+    assert replay(board, square) == board
+    assert shorten_moves(board, [(0, 0, 0, 1), (0, 1, 0, 0)] + square) == []
+    assert shorten_moves(board, square[:4]) == square[:4]
+
+    start = replay(board, [(0, 0, 1, 0), (1, 0, 1, 1)])
+    solution = [(1, 1, 1, 0), (1, 0, 0, 0)]
+    detour = [(1, 1, 2, 1), (2, 1, 2, 2), (2, 2, 1, 2), (1, 2, 1, 1)] * 3 + [(1, 1, 1, 2), (1, 2, 1, 1)]
+    shortened = shorten_moves(start, detour + solution)
+    assert shortened == solution
+    assert replay(start, shortened) == goal(5)
+    # A detour in the middle of a solution is dropped too
+    assert shorten_moves(start, solution[:1] + [(1, 0, 2, 0), (2, 0, 1, 0)] + solution[1:]) == solution
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from reasoning.puzzle.distance import UNREACHABLE
+from reasoning.puzzle.pdb import PatternDatabase, build_pattern_database
+from reasoning.puzzle.vectorized import SlideMoves, pack_boards, unpack_boards
+
+# Number of 3x3 boards at each optimal distance
+LAYER_SIZES_3X3 = [
+    1, 2, 4, 8, 16, 20, 39, 62, 116, 152, 286, 396, 748, 1024, 1893, 2512, 4485, 5638,
+    9529, 10878, 16993, 17110, 23952, 20224, 24047, 15578, 14560, 6274, 3910, 760, 221, 2,
+]
+
+
+def test_distance_table_layers(distance_table):
+    table = np.frombuffer(bytes(distance_table.table), dtype=np.uint8)
+    counts = np.bincount(table[table != UNREACHABLE])
+    assert counts.tolist() == LAYER_SIZES_3X3
+    assert (table == UNREACHABLE).sum() == len(table) // 2
+
+
+def test_slide_moves():
+    goal = [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
+    successors = unpack_boards(SlideMoves(3).expand(pack_boards([goal])), 3)
+    assert sorted(board.tolist() for board in successors) == [
+        [1, 0, 2, 3, 4, 5, 6, 7, 8],
+        [3, 1, 2, 0, 4, 5, 6, 7, 8],
+    ]
+
+
+def test_pattern_database_at_goal():
+    database = PatternDatabase.build(3, (1, 2, 3, 4))
+    assert database.lookup(list(range(9))) == 0
+    assert max(database.table) < 255
+
+
+@pytest.mark.parametrize("size, pattern", [
+    (5, (1, 2)),  # Does not fit 4 bits per cell
+    (3, (1, 2, 3, 4, 5, 6, 7, 8)),  # No free tile
+    (3, (1, 1)),
+    (3, (0, 1)),
+    (3, (9,)),
+])
+def test_invalid_pattern(size, pattern):
+    with pytest.raises(ValueError):
+        build_pattern_database(size, pattern)
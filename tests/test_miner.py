@@ -0,0 +1,112 @@
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from reasoning.puzzle.cache import SolutionCache
+from reasoning.puzzle.generator import SlidingPuzzleGenerator
+from reasoning.puzzle.pdb import AdditivePatternDatabase, PatternDatabase, PDBSlidingPuzzle
+
+from miner import Miner
+from conftest import BOARDS, goal, replay
+
+
+class RecordingPool:
+    """Stands in for SolverPool: records submits and hands out unresolved futures."""
+
+    def __init__(self):
+        self.submits = []
+
+    def submit(self, algorithm, problem, time_limit, **kwargs):
+        future = Future()
+        self.submits.append((future, time_limit))
+        return future
+
+    def cancel(self, future):
+        pass
+
+
+@pytest.fixture
+def miner():
+    # Only the solving state of a miner, without wallet or network
+    miner = Miner.__new__(Miner)
+    miner.config = SimpleNamespace(portfolio_size=0, hierarchical_size=5, hda_workers=0, hda_min_heuristic=40)
+    miner.pattern_databases = {}
+    miner.pool = RecordingPool()
+    miner.portfolio = None
+    miner.hda_executor = None
+    miner.solution_cache = SolutionCache(None)
+    miner.inflight = {}
+    miner.inflight_lock = threading.Lock()
+    return miner
+
+
+def test_attach_to_running_solve(miner):
+    board = BOARDS[3][0]
+    first, started = miner.submit_solve("key", board, 5.0)
+    assert started
+    second, started = miner.submit_solve("key", board, 10.0)
+    assert second is first and not started
+    assert len(miner.pool.submits) == 1
+
+
+def test_shorter_deadline_starts_own_solve(miner):
+    board = BOARDS[3][0]
+    first, _ = miner.submit_solve("key", board, 10.0)
+    second, started = miner.submit_solve("key", board, 2.0)
+    assert started and second is not first
+    assert miner.pool.submits[1][1] == 2.0
+    # Later requests still attach to the first solve while it runs
+    assert miner.submit_solve("key", board, 20.0) == (first, False)
+    # The shorter solve finishing does not unregister the first one
+    second.set_result({'success': False})
+    assert miner.inflight["key"][0] is first
+    first.set_result({'success': False})
+    assert "key" not in miner.inflight
+
+
+def test_portfolio_races_heuristics(miner):
+    # Without pattern databases only Manhattan + linear conflict is raced
+    names = [configuration.name for configuration in miner.portfolio_configurations(BOARDS[3][0])]
+    assert names == ["ara*/md+lc", "a*-bucket/md+lc", "ida*/md+lc", "mm/md+lc"]
+    miner.pattern_databases[3] = AdditivePatternDatabase([
+        PatternDatabase.build(3, (1, 2, 3, 4)),
+        PatternDatabase.build(3, (5, 6, 7, 8)),
+    ])
+    configurations = miner.portfolio_configurations(BOARDS[3][0])
+    names = {configuration.name for configuration in configurations}
+    assert {"ara*/pdb", "ara*/md+lc", "ida*/pdb", "ida*/md+lc"} <= names
+    heuristics = {type(configuration.problem) for configuration in configurations}
+    assert PDBSlidingPuzzle in heuristics and len(heuristics) == 2
+
+
+def test_hard_board_solved_with_hda(miner):
+    miner.config.hda_workers = 1
+    miner.config.hda_min_heuristic = 20
+    miner.hda_executor = ThreadPoolExecutor(max_workers=1)
+    miner.hda_slot = threading.Lock()
+    random.seed(0)
+    board = SlidingPuzzleGenerator(4).generate(60)
+    # Easy boards are left to the pool
+    assert miner.submit_parallel(BOARDS[3][0], 30) is None
+    pending = miner.begin_solve(board, 30)
+    assert pending.started and pending.parallel is not None
+    # The pool solve finds nothing; the answer comes from HDA*
+    miner.pool.submits[0][0].set_result({'success': False})
+    solution = miner.end_solve(pending, time.monotonic() + 30)
+    assert replay(board, solution) == goal(4)
+    assert len(solution) == 30
+    miner.hda_executor.shutdown()
+
+
+def test_one_hda_solve_at_a_time(miner):
+    miner.config.hda_workers = 1
+    miner.config.hda_min_heuristic = 0
+    miner.hda_executor = ThreadPoolExecutor(max_workers=1)
+    miner.hda_slot = threading.Lock()
+    with miner.hda_slot:
+        assert miner.submit_parallel(BOARDS[3][0], 30) is None
+    miner.hda_executor.shutdown()
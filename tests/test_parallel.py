@@ -0,0 +1,37 @@
+import pytest
+
+from reasoning.puzzle.puzzle import PackedSlidingPuzzle, SlidingPuzzle
+from reasoning.search.parallel import HDAStarSearch, state_owner
+
+from conftest import BOARDS, goal, replay
+
+
+@pytest.mark.parametrize("board, optimal", BOARDS)
+def test_optimal(board, optimal):
+    result = HDAStarSearch(PackedSlidingPuzzle(board), workers=2).solve(time_limit=60)
+    assert result['success']
+    assert len(result['solution']) == optimal
+    assert replay(board, result['solution']) == goal(3)
+
+
+def test_tuple_keys():
+    # Keys hashed by CRC and actions sent without encoding
+    board, optimal = BOARDS[3]
+    result = HDAStarSearch(SlidingPuzzle(board), workers=3, batch_size=8).solve(time_limit=60)
+    assert len(result['solution']) == optimal
+    assert replay(board, result['solution']) == goal(3)
+
+
+def test_deadline():
+    board, _ = BOARDS[-1]
+    result = HDAStarSearch(PackedSlidingPuzzle(board), workers=2).solve(time_limit=0.001)
+    # Stopped workers leave no solution, or a proven optimal one if they finished
+    assert not result['success'] or len(result['solution']) == 26
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3, 8])
+def test_state_owner(workers):
+    owners = [state_owner(key, workers) for key in range(1000)]
+    assert set(owners) == set(range(workers))
+    assert state_owner((1, 2), workers) == state_owner((1, 2), workers)
+    assert 0 <= state_owner("state", workers) < workers
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from reasoning.puzzle.pdb import AdditivePatternDatabase, PatternDatabase, PDBSlidingPuzzle, pattern_filename
+from reasoning.search.ranking import unrank_permutation
+
+from conftest import BOARDS
+
+
+@pytest.fixture(scope="module")
+def pdb():
+    return AdditivePatternDatabase([
+        PatternDatabase.build(3, (1, 2, 3, 4)),
+        PatternDatabase.build(3, (5, 6, 7, 8)),
+    ])
+
+
+def test_goal_is_zero(pdb):
+    problem = PDBSlidingPuzzle(BOARDS[0][0], pdb)
+    assert problem.heuristic(problem.initial_state()) == 0
+
+
+def test_admissible(pdb, distance_table):
+    rng = random.Random(0)
+    checked = 0
+    while checked < 2000:
+        flat = unrank_permutation(rng.randrange(362880), 9)
+        board = [flat[0:3], flat[3:6], flat[6:9]]
+        distance = distance_table.distance(board)
+        if distance is None:
+            continue
+        problem = PDBSlidingPuzzle(board, pdb)
+        state = problem.initial_state()
+        # The table sum on its own, and combined with Manhattan + linear conflict and the transpose
+        assert pdb.heuristic(problem.tile_positions(state)) <= distance
+        assert problem.heuristic(state) <= distance
+        checked += 1
+
+
+def test_save_and_load(pdb, tmp_path):
+    for database in pdb.databases:
+        database.save(str(tmp_path / pattern_filename(3, database.pattern)))
+    loaded = AdditivePatternDatabase.load(str(tmp_path), 3)
+    for board, _ in BOARDS:
+        a, b = PDBSlidingPuzzle(board, pdb), PDBSlidingPuzzle(board, loaded)
+        assert a.heuristic(a.initial_state()) == b.heuristic(b.initial_state())
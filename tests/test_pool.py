@@ -0,0 +1,50 @@
+import random
+import time
+
+import pytest
+
+from reasoning.puzzle.generator import SlidingPuzzleGenerator
+from reasoning.puzzle.puzzle import PackedSlidingPuzzle
+from reasoning.search.algorithms import ARAStarSearch
+from reasoning.search.pool import RETURN_MARGIN, PoolFullError, SolverPool
+
+from conftest import BOARDS, goal, replay
+from fakes import SlowSearch
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SolverPool(workers=1, max_pending=1, preload=["reasoning.puzzle"])
+    yield pool
+    pool.close()
+
+
+def test_pool_full(pool):
+    problem = PackedSlidingPuzzle(BOARDS[2][0])
+    futures = []
+    with pytest.raises(PoolFullError, match="1 solves already queued"):
+        # One solve runs and one waits in the queue; a later one is turned away
+        for _ in range(10):
+            futures.append(pool.submit(SlowSearch, problem, time_limit=30))
+    pool.cancel_all()
+    for future in futures:
+        # Dropped from the queue, or stopped while running
+        try:
+            assert not future.result(timeout=10)['success']
+        except RuntimeError:
+            pass
+
+
+def test_incumbent_returned_at_deadline(pool):
+    # ARA* does not prove these 4x4 boards optimal within the budget, so it
+    # runs to its deadline; its incumbent must still arrive before the
+    # caller stops waiting
+    random.seed(1)
+    budget = 1.5
+    for _ in range(3):
+        board = SlidingPuzzleGenerator(4).generate(200)
+        wait_until = time.monotonic() + budget
+        future = pool.submit(ARAStarSearch, PackedSlidingPuzzle(board), time_limit=budget - RETURN_MARGIN)
+        result = future.result(timeout=max(0.0, wait_until - time.monotonic()))
+        assert result['success']
+        assert replay(board, result['solution']) == goal(4)
@@ -0,0 +1,126 @@
+import time
+
+import pytest
+
+from reasoning.puzzle.puzzle import PackedSlidingPuzzle
+from reasoning.search.algorithms import AStarSearch, IDAStarSearch
+from reasoning.search.pool import SolverPool
+from reasoning.search.portfolio import Configuration, Portfolio, load_history
+
+from conftest import BOARDS, goal, replay
+from fakes import FixedSearch, SlowSearch
+
+BOARD, OPTIMAL = BOARDS[2]
+PROBLEM = PackedSlidingPuzzle(BOARD)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SolverPool(workers=2, preload=["reasoning.puzzle"])
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="module")
+def solution():
+    return AStarSearch(PROBLEM).solve()['solution']
+
+
+def detour(solution, count):
+    """solution with the empty tile moved away and back count times first."""
+    blank = next((r, c) for r, row in enumerate(BOARD) for c, tile in enumerate(row) if tile == 0)
+    neighbour = (blank[0], blank[1] + 1) if blank[1] + 1 < len(BOARD) else (blank[0], blank[1] - 1)
+    return [(*blank, *neighbour), (*neighbour, *blank)] * count + list(solution)
+
+
+def fixed(name, solution, bound=None, delay=0.0):
+    return Configuration(name, FixedSearch, PROBLEM,
+                         {"solution": solution, "bound": bound, "delay": delay})
+
+
+def test_optimal_result_cancels_others(pool):
+    started = time.monotonic()
+    result = Portfolio(pool).solve([
+        Configuration("ida*", IDAStarSearch, PROBLEM, optimal=True),
+        Configuration("slow", SlowSearch, PROBLEM),
+    ], time_limit=30)
+    assert time.monotonic() - started < 10
+    assert result['configuration'] == "ida*" and result['optimal']
+    assert result['cost'] == OPTIMAL and result['suboptimality_bound'] == 1.0
+    assert replay(BOARD, result['solution']) == goal(3)
+    assert not result['results']['slow']['success']
+
+
+def test_invalid_solution_rejected(pool, solution):
+    result = Portfolio(pool).solve([
+        fixed("illegal", [(1, 1, 1, 1)] * 3),
+        fixed("legal", detour(solution, 1), delay=0.2),
+    ], time_limit=5)
+    assert result['results']['illegal'] == {
+        'success': False, 'time': result['results']['illegal']['time'],
+        'cost': float('inf'), 'error': "Invalid solution",
+    }
+    assert result['configuration'] == "legal" and result['cost'] == OPTIMAL + 2
+
+
+def test_combined_suboptimality_bound(pool, solution):
+    # Neither entrant proves its solution optimal, but 12 / 1.2 moves are
+    # needed, so the other's 10 moves are optimal
+    portfolio = Portfolio(pool)
+    result = portfolio.solve([
+        fixed("loose", detour(solution, 1), bound=2.0),
+        fixed("tight", detour(solution, 2), bound=1.2),
+    ], time_limit=5)
+    assert result['configuration'] == "loose" and result['cost'] == 10
+    assert result['optimal'] and result['suboptimality_bound'] == 1.0
+
+    result = portfolio.solve([fixed("tight", detour(solution, 2), bound=1.2)], time_limit=5)
+    assert not result['optimal']
+    assert result['suboptimality_bound'] == pytest.approx(1.2)
+
+    result = portfolio.solve([fixed("unbounded", solution)], time_limit=5)
+    assert result['suboptimality_bound'] == float('inf')
+
+
+def test_history_round_trip(pool, solution, tmp_path):
+    path = tmp_path / "history" / "portfolio.jsonl"
+    portfolio = Portfolio(pool, history_path=str(path))
+    for _ in range(2):
+        portfolio.solve([
+            fixed("fast", solution, bound=1.0),
+            fixed("late", solution, delay=2.0),
+        ], time_limit=10, instance="board")
+    with open(path, "a") as f:
+        f.write('{"winner": "torn')
+
+    records = load_history(str(path))
+    assert len(records) == 2
+    assert records[0]['instance'] == "board" and records[0]['winner'] == "fast"
+    assert records[0]['optimal'] and records[0]['cost'] == OPTIMAL
+    assert records[0]['results']['fast']['success']
+    assert records[0]['results']['late'] == {'success': False, 'cancelled': True}
+
+    reloaded = Portfolio(pool, history_path=str(path))
+    assert reloaded.wins == {"fast": 2}
+    assert reloaded.entered == {"fast": 2, "late": 2}
+    assert reloaded.win_rate("fast") == portfolio.win_rate("fast") == 0.75
+    assert reloaded.win_rate("late") == 0.25
+
+
+def test_schedule():
+    portfolio = Portfolio(None)
+    configurations = [fixed(name, []) for name in "abcd"]
+    assert portfolio.schedule(configurations) == configurations
+    portfolio.wins.update({"c": 3})
+    portfolio.entered.update({"a": 4, "b": 4, "c": 4})
+    assert [c.name for c in portfolio.schedule(configurations)] == ["c", "d", "a", "b"]
+    # The best configuration keeps the first slot and the least tried of the
+    # others gets the second, so every configuration keeps entering races
+    tried = []
+    for _ in range(6):
+        chosen = portfolio.schedule(configurations, 2)
+        assert chosen[0].name == "c"
+        tried.append(chosen[1].name)
+        portfolio.entered.update(configuration.name for configuration in chosen)
+    assert tried[0] == "d" and set(tried) == {"a", "b", "d"}
+    assert [c.name for c in portfolio.schedule(configurations, 1)] == ["c"]
@@ -0,0 +1,40 @@
+import itertools
+import random
+
+import pytest
+
+from reasoning.search.ranking import BitSet, permutation_count, rank_permutation, unrank_permutation
+
+
+@pytest.mark.parametrize("n", range(1, 7))
+def test_bijection(n):
+    ranks = {rank_permutation(perm) for perm in itertools.permutations(range(n))}
+    assert ranks == set(range(permutation_count(n)))
+
+
+@pytest.mark.parametrize("n", range(1, 7))
+def test_unrank_inverts_rank(n):
+    for rank in range(permutation_count(n)):
+        perm = unrank_permutation(rank, n)
+        assert sorted(perm) == list(range(n))
+        assert rank_permutation(perm) == rank
+
+
+@pytest.mark.parametrize("n", [9, 16, 25])
+def test_round_trip_large(n):
+    rng = random.Random(n)
+    for _ in range(200):
+        perm = list(range(n))
+        rng.shuffle(perm)
+        assert unrank_permutation(rank_permutation(perm), n) == perm
+        rank = rng.randrange(permutation_count(n))
+        assert rank_permutation(unrank_permutation(rank, n)) == rank
+
+
+def test_bitset():
+    bits = BitSet(100)
+    for key in (0, 7, 8, 99, 7):
+        bits.add(key)
+    assert len(bits) == 4
+    assert all(key in bits for key in (0, 7, 8, 99))
+    assert not any(key in bits for key in (1, 6, 9, 98))
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from reasoning.puzzle.reward import get_batch_rewards, get_reward, get_rewards
+
+from test_verifier import BOARD, MOVES, SOLUTION
+
+GOAL = [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
+ONE_MOVE = [[1, 0, 2], [3, 4, 5], [6, 7, 8]]
+
+
+def test_rewards():
+    solutions = [SOLUTION, MOVES, "UD" + MOVES, [(1, 1, 1, 1)], MOVES[:-1], None]
+    expected = [np.exp(-0.8), np.exp(-0.8), np.exp(-1.0), 0.0, 0.0, 0.0]
+    np.testing.assert_allclose(get_rewards(BOARD, solutions), expected)
+    np.testing.assert_allclose([get_reward(BOARD, solution) for solution in solutions], expected)
+
+
+def test_optimal_length():
+    rewards = get_rewards(BOARD, [SOLUTION, "UD" + MOVES, None], optimal_length=8)
+    np.testing.assert_allclose(rewards, [1.0, np.exp(-0.2), 0.0])
+
+
+def test_duplicates():
+    # Identical solutions share one replay and get the same reward
+    solutions = [MOVES, MOVES, SOLUTION, list(SOLUTION), "RR", "RR"]
+    rewards = get_rewards(BOARD, solutions)
+    np.testing.assert_allclose(rewards, [np.exp(-0.8)] * 4 + [0.0, 0.0])
+
+
+def test_unhashable_solution():
+    assert get_rewards(BOARD, [[[1, 1, 1, 2]]])[0] == 0.0
+
+
+def test_already_solved():
+    np.testing.assert_allclose(get_rewards(GOAL, [[], None, "", "R"]), [1.0, 1.0, 1.0, 0.0])
+
+
+def test_batch_rewards():
+    puzzles = [BOARD, ONE_MOVE]
+    solutions = [
+        [MOVES, "L"],  # Both valid
+        [SOLUTION, "R"],  # Second illegal
+        [MOVES[:-1], [(0, 1, 0, 0)]],  # First stops short of the goal
+        [None, None],
+        [MOVES, "L"],  # Duplicate of the first miner
+    ]
+    rewards = get_batch_rewards(puzzles, solutions, optimal_lengths=[8, 1])
+    np.testing.assert_allclose(rewards, [1.0, 0.5, 0.5, 0.0, 1.0])
+    np.testing.assert_allclose(
+        get_batch_rewards(puzzles, solutions),
+        [(np.exp(-0.8) + np.exp(-0.1)) / 2, np.exp(-0.8) / 2, np.exp(-0.1) / 2, 0.0,
+         (np.exp(-0.8) + np.exp(-0.1)) / 2],
+    )
+
+
+def test_batch_matches_single_rewards():
+    solutions = [[MOVES], ["RR"], [None]]
+    np.testing.assert_allclose(
+        get_batch_rewards([BOARD], solutions),
+        get_rewards(BOARD, [s[0] for s in solutions]),
+    )
+
+
+@pytest.mark.parametrize("solutions", [[], [[MOVES]]])
+def test_batch_max_moves(solutions):
+    assert np.all(get_batch_rewards([BOARD], solutions, max_moves=7) == 0.0)
+
+
+class NoCopyList(list):
+    """A solution that fails the test if it is iterated, i.e. copied for hashing."""
+
+    def __iter__(self):
+        raise AssertionError("Oversized solution was copied")
+
+
+def test_oversized_not_hashed():
+    oversized = NoCopyList([(1, 1, 1, 2)] * 100)
+    np.testing.assert_allclose(get_rewards(BOARD, [oversized, MOVES], max_moves=50), [0.0, np.exp(-0.8)])
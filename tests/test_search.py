@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from reasoning.puzzle.generator import SlidingPuzzleGenerator
+from reasoning.puzzle.puzzle import PackedSlidingPuzzle, SlidingPuzzle
+from reasoning.search.algorithms import ARAStarSearch, AStarSearch, BidirectionalSearch, IDAStarSearch
+from reasoning.search.frontier import BucketFrontier
+
+from conftest import BOARDS, goal, replay
+
+SEARCHES = {
+    "astar": AStarSearch,
+    "bucket_astar": lambda problem: AStarSearch(problem, frontier=BucketFrontier),
+    "idastar": IDAStarSearch,
+    "mm": BidirectionalSearch,
+    "arastar": ARAStarSearch,  # Optimal once it runs down to weight 1
+}
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+@pytest.mark.parametrize("problem_type", [SlidingPuzzle, PackedSlidingPuzzle])
+@pytest.mark.parametrize("board, optimal", BOARDS)
+def test_optimal(search, problem_type, board, optimal, distance_table):
+    assert distance_table.distance(board) == optimal
+    result = SEARCHES[search](problem_type(board)).solve(time_limit=30)
+    assert result['success']
+    assert len(result['solution']) == optimal
+    assert replay(board, result['solution']) == goal(3)
+
+
+@pytest.mark.parametrize("board, optimal", BOARDS[2:])
+@pytest.mark.parametrize("node_limit", [200, 800, 3200])
+def test_arastar_bound(board, optimal, node_limit):
+    # Stopped early, the incumbent is within the reported bound of optimal
+    result = ARAStarSearch(PackedSlidingPuzzle(board), initial_weight=5.0).solve(node_limit=node_limit)
+    if not result['success']:
+        assert result['suboptimality_bound'] is None
+        return
+    assert replay(board, result['solution']) == goal(3)
+    assert len(result['solution']) <= result['suboptimality_bound'] * optimal + 1e-9
+    assert result['suboptimality_bound'] >= 1.0
+
+
+def test_idastar_restores_state():
+    # Make/unmake must leave the root state as it was
+    board, optimal = BOARDS[3]
+    problem = SlidingPuzzle(board)
+    result = IDAStarSearch(problem).solve()
+    assert len(result['solution']) == optimal
+    assert problem.initial_state() == board
+
+
+def test_idastar_in_place_is_incremental(monkeypatch):
+    # Children of the in-place state get no keys and no full heuristic
+    board, optimal = BOARDS[-1]
+    problem = SlidingPuzzle(board)
+    heuristic = problem.heuristic
+    calls = []
+    monkeypatch.setattr(problem, "heuristic", lambda state: calls.append(state) or heuristic(state))
+    monkeypatch.setattr(problem, "state_key", pytest.fail)
+    result = IDAStarSearch(problem).solve()
+    assert len(result['solution']) == optimal
+    assert replay(board, result['solution']) == goal(3)
+    # Once for the initial bound, then once per pass
+    assert len(calls) <= 2 + (optimal - heuristic(board)) / 2
+
+
+@pytest.mark.parametrize("size", [3, 4, 5])
+def test_heuristic_after(size):
+    random.seed(size)
+    problem = SlidingPuzzle(SlidingPuzzleGenerator(size).generate(100))
+    state = problem.initial_state()
+    h = problem.heuristic(state)
+    for _ in range(500):
+        action = random.choice(problem.actions(state))
+        problem.apply(state, action)
+        h = problem.heuristic_after(state, action, h)
+        assert h == problem.heuristic(state)
+
+
+def test_node_limit():
+    board, _ = BOARDS[-1]
+    result = IDAStarSearch(PackedSlidingPuzzle(board)).solve(node_limit=100)
+    assert not result['success']
+    assert result['solution'] is None
@@ -0,0 +1,66 @@
+import pytest
+
+from reasoning.puzzle.puzzle import SlidingPuzzle
+from reasoning.puzzle.verifier import SlidingPuzzleVerifier
+
+BOARD = [[1, 2, 5], [3, 0, 7], [6, 8, 4]]
+SOLUTION = [(1, 1, 1, 2), (1, 2, 2, 2), (2, 2, 2, 1), (2, 1, 1, 1),
+            (1, 1, 1, 2), (1, 2, 0, 2), (0, 2, 0, 1), (0, 1, 0, 0)]
+MOVES = "RDLURULL"
+
+
+@pytest.fixture
+def verifier():
+    return SlidingPuzzleVerifier(SlidingPuzzle(BOARD))
+
+
+def test_valid(verifier):
+    assert verifier.replay(SOLUTION) == 8.0
+    assert verifier.replay(MOVES) == 8.0
+    assert verifier.replay_moves(MOVES) == 8.0
+    assert verifier.verify_solution(SOLUTION)
+
+
+def test_longer_valid_solution(verifier):
+    # Moving the empty tile back and forth first is still a solution
+    detour = [(1, 1, 0, 1), (0, 1, 1, 1)] + SOLUTION
+    assert verifier.replay(detour) == 10.0
+    assert verifier.replay("UD" + MOVES) == 10.0
+
+
+@pytest.mark.parametrize("solution", [
+    [(1, 1, 1, 2), (1, 1, 1, 0)],  # Does not start from the empty tile
+    [(1, 1, 1, 1)],  # Stays in place
+    [(1, 1, 2, 2)],  # Diagonal
+    [(1, 1, 1, 2), (1, 2, 1, 3)],  # Off the board
+    [(1, 1, 1)],  # Malformed
+    [[1, 1, 1, 2]],  # Not a tuple
+    [(1.0, 1, 1, 2)],  # Not integers
+])
+def test_illegal(verifier, solution):
+    assert verifier.replay(solution) is None
+    assert not verifier.verify_solution(solution)
+
+
+@pytest.mark.parametrize("moves", ["RR", "LLL", "UUU", "DDD", "X", "r"])
+def test_illegal_moves(verifier, moves):
+    assert verifier.replay_moves(moves) is None
+
+
+def test_not_goal(verifier):
+    assert verifier.replay(SOLUTION[:-1]) is None
+    assert verifier.replay(MOVES[:-1]) is None
+    assert verifier.replay([]) is None
+    assert verifier.replay("") is None
+
+
+def test_max_moves():
+    verifier = SlidingPuzzleVerifier(SlidingPuzzle(BOARD), max_moves=7)
+    assert verifier.replay(SOLUTION) is None
+    assert verifier.replay(MOVES) is None
+    assert SlidingPuzzleVerifier(SlidingPuzzle(BOARD), max_moves=8).replay(MOVES) == 8.0
+
+
+def test_board_unchanged(verifier):
+    verifier.replay(SOLUTION)
+    assert verifier.problem.initial == BOARD
@@ -1,15 +1,21 @@
 import os
 import time
 import random
+import asyncio
 import argparse
 import traceback
+import numpy as np
 import bittensor as bt
+from typing import List, Optional, Tuple
 
-from reasoning.puzzle import SlidingPuzzleGenerator, get_reward
+from reasoning.puzzle import (
+    SlidingPuzzleGenerator, DistanceTable, get_batch_rewards, update_moving_average, encode_board
+)
 
-from protocol import ReasoningSynapse
+from protocol import ReasoningSynapse, ProblemItem, BATCH_TYPE
 
 PUZZLE_TYPES = ["sliding_puzzle"]
+BLOCK_TIME = 12.0  # Seconds per block
 
 
 class Validator:
@@ -22,9 +28,11 @@ class Validator:
         self.last_update = self.subtensor.blocks_since_last_update(
             self.config.netuid, self.my_uid
         )
+        self.last_update_read = time.monotonic()
         self.tempo = self.subtensor.tempo(self.config.netuid)
-        self.moving_avg_scores = [1.0] * len(self.metagraph.S)
+        self.moving_avg_scores = np.ones(len(self.metagraph.S))
         self.alpha = 0.1
+        self.setup_puzzle_generator()
 
     def get_config(self):
         # Set up the configuration parser.
@@ -35,6 +43,49 @@ class Validator:
             default="my_custom_value",
             help="Adds a custom value to the parser.",
         )
+        # Puzzle difficulty.
+        parser.add_argument(
+            "--table_dir",
+            default="~/.reasoning/tables",
+            help="Directory of the 3x3 distance table (build with python -m reasoning.puzzle.distance).",
+        )
+        parser.add_argument(
+            "--min_distance",
+            type=int,
+            default=10,
+            help="Smallest optimal solution length of generated puzzles.",
+        )
+        parser.add_argument(
+            "--max_distance",
+            type=int,
+            default=31,
+            help="Largest optimal solution length of generated puzzles.",
+        )
+        # Round pipelining.
+        parser.add_argument(
+            "--prefetch_rounds",
+            type=int,
+            default=4,
+            help="Number of rounds generated ahead of the current one.",
+        )
+        parser.add_argument(
+            "--round_interval",
+            type=float,
+            default=1.0,
+            help="Minimum seconds between the starts of consecutive rounds.",
+        )
+        # Wire format.
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=1,
+            help="Problems per query; above 1 they are sent as one batch synapse.",
+        )
+        parser.add_argument(
+            "--compact_only",
+            action="store_true",
+            help="Send only the compact problem encoding (miners must read problem_compact).",
+        )
         # Adds override arguments for network and netuid.
         parser.add_argument(
             "--netuid", type=int, default=1, help="The chain subnet uid."
@@ -106,79 +157,173 @@ class Validator:
         self.scores = [1.0] * len(self.metagraph.S)
         bt.logging.info(f"Weights: {self.scores}")
 
-    def run(self):
-        # The Main Validation Loop.
-        bt.logging.info("Starting validator loop.")
+    def setup_puzzle_generator(self):
+        # Memory-map the distance table, so puzzles can be generated at an exact
+        # optimal distance and rewards judged against it.
+        table_dir = os.path.expanduser(self.config.table_dir)
+        try:
+            distance_table = DistanceTable.load(table_dir, 3)
+            bt.logging.info(f"Loaded 3x3 distance table from {table_dir}")
+        except FileNotFoundError:
+            distance_table = None
+            bt.logging.warning(
+                f"No 3x3 distance table in {table_dir}; generating puzzles by random walks."
+            )
+        self.generator = SlidingPuzzleGenerator(3, distance_table=distance_table)
+
+    def generate_puzzle(self, puzzle_type: str) -> Tuple[List[List[int]], Optional[int]]:
+        """Generate one problem of puzzle_type and its optimal solution length, if known."""
+        # Create sliding puzzle problem
+        if puzzle_type == "sliding_puzzle":
+            # Generate the puzzle problem, at a known optimal distance if possible
+            if self.generator.distance_table is not None:
+                optimal_length = random.randint(
+                    self.config.min_distance, self.config.max_distance
+                )
+                puzzle = self.generator.generate_at_distance(optimal_length)
+            else:
+                optimal_length = None
+                puzzle = self.generator.generate()
+        return puzzle, optimal_length
+
+    def generate_round(self) -> Tuple[ReasoningSynapse, List[List[List[int]]], List[Optional[int]]]:
+        """Build the synapse of one round, its puzzles and their optimal solution lengths."""
+        # Select a random puzzle type for every problem of the round
+        puzzle_types = [random.choice(PUZZLE_TYPES) for _ in range(self.config.batch_size)]
+        puzzles, optimal_lengths = zip(*(self.generate_puzzle(t) for t in puzzle_types))
+
+        # Prepare the synapse object
+        if self.config.batch_size > 1:
+            synapse = ReasoningSynapse(
+                type=BATCH_TYPE,
+                batch=[
+                    ProblemItem(type=puzzle_type, problem=encode_board(puzzle))
+                    for puzzle_type, puzzle in zip(puzzle_types, puzzles)
+                ],
+            )
+        else:
+            synapse = ReasoningSynapse(
+                type=puzzle_types[0],
+                problem=None if self.config.compact_only else puzzles[0],
+                problem_compact=encode_board(puzzles[0]),
+            )
+        return synapse, list(puzzles), list(optimal_lengths)
+
+    async def produce_rounds(self, rounds: asyncio.Queue):
+        # Generate upcoming rounds in a worker thread while the current ones run.
+        # Failures are logged and retried after a pause, so that run_rounds is
+        # never left waiting for a round that will not come.
+        loop = asyncio.get_running_loop()
         while True:
             try:
-                # Select a random puzzle type
-                puzzle_type = random.choice(PUZZLE_TYPES)
+                next_round = await loop.run_in_executor(None, self.generate_round)
+            except Exception as e:
+                bt.logging.error(f"Failed to generate a round: {e}")
+                traceback.print_exc()
+                await asyncio.sleep(max(1.0, self.config.round_interval))
+                continue
+            await rounds.put(next_round)
 
-                # Create sliding puzzle problem
-                if puzzle_type == "sliding_puzzle":
-                    # Generate the puzzle problem
-                    generator = SlidingPuzzleGenerator(3)
-                    puzzle = generator.generate()
+    def score_round(self, puzzles: List[List[List[int]]], responses: List[List],
+                    optimal_lengths: List[Optional[int]]):
+        # Score all responses to all puzzles of the round in one pass (identical
+        # solutions are verified once) and update the moving average, extending
+        # it to the number of responses.
+        rewards = get_batch_rewards(puzzles, responses, optimal_lengths=optimal_lengths)
+        self.moving_avg_scores = update_moving_average(
+            self.moving_avg_scores, rewards, self.alpha
+        )
+        bt.logging.info(f"Moving Average Scores: {self.moving_avg_scores}")
 
-                    # Prepare the synapse object
-                    synapse = ReasoningSynapse(type="sliding_puzzle", problem=puzzle)
+    async def update_chain_state(self):
+        # Read blocks since the last weight update at most once per block, and
+        # advance the cached value by the elapsed blocks in between.
+        loop = asyncio.get_running_loop()
+        elapsed = time.monotonic() - self.last_update_read
+        if elapsed >= BLOCK_TIME:
+            self.last_update = await loop.run_in_executor(
+                None, self.subtensor.blocks_since_last_update, self.config.netuid, self.my_uid
+            )
+            self.last_update_read = time.monotonic()
+            elapsed = 0.0
+        blocks_since_update = self.last_update + int(elapsed // BLOCK_TIME)
 
-                # Broadcast a query to all miners on the network.
-                responses = self.dendrite.query(
-                    axons=self.metagraph.axons, synapse=synapse, timeout=12
-                )
-                bt.logging.info(f"sending input {synapse.problem}")
-                if responses:
-                    responses = [
-                        response.solution
-                        for response in responses
-                        if response is not None
-                    ]
-
-                # Log the results.
-                bt.logging.info(f"Received responses: {responses}")
-
-                # Adjust the length of moving_avg_scores to match the number of responses
-                if len(self.moving_avg_scores) < len(responses):
-                    self.moving_avg_scores.extend(
-                        [1] * (len(responses) - len(self.moving_avg_scores))
-                    )
+        # set weights once every tempo + 1
+        if blocks_since_update > self.tempo + 1:
+            weights = self.moving_avg_scores / self.moving_avg_scores.sum()
+            bt.logging.info(f"[blue]Setting weights: {weights}[/blue]")
+            # Update the incentive mechanism on the Bittensor blockchain.
+            result = await loop.run_in_executor(None, lambda: self.subtensor.set_weights(
+                netuid=self.config.netuid,
+                wallet=self.wallet,
+                uids=self.metagraph.uids,
+                weights=weights,
+                wait_for_inclusion=True,
+            ))
+            await loop.run_in_executor(None, self.metagraph.sync)
+            # Re-read after the update instead of extrapolating
+            self.last_update_read = float("-inf")
 
-                # Adjust the scores based on responses from miners and update moving average.
-                for i, resp_i in enumerate(responses):
-                    reward = get_reward(synapse.problem, resp_i)
-                    self.moving_avg_scores[i] = (
-                        1 - self.alpha
-                    ) * self.moving_avg_scores[i] + self.alpha * reward
+    async def run_rounds(self):
+        # Pipelined validation loop: puzzles are generated ahead of time, and
+        # each round's responses are scored while the next round's query is
+        # in flight.
+        loop = asyncio.get_running_loop()
+        rounds = asyncio.Queue(maxsize=self.config.prefetch_rounds)
+        producer = asyncio.create_task(self.produce_rounds(rounds))
+        scoring = None
+        try:
+            while True:
+                started = loop.time()
+                try:
+                    synapse, puzzles, optimal_lengths = await rounds.get()
 
-                bt.logging.info(f"Moving Average Scores: {self.moving_avg_scores}")
-                self.last_update = self.subtensor.blocks_since_last_update(
-                    self.config.netuid, self.my_uid
-                )
+                    # Broadcast a query to all miners on the network.
+                    bt.logging.info(f"sending input {puzzles}")
+                    responses = await self.dendrite.forward(
+                        axons=self.metagraph.axons, synapse=synapse, timeout=12, deserialize=False
+                    )
+                    # Solutions of every miner to every puzzle of the round
+                    if synapse.type == BATCH_TYPE:
+                        responses = [
+                            response.get_batch_solutions(len(puzzles)) if response is not None
+                            else [None] * len(puzzles)
+                            for response in responses
+                        ]
+                    else:
+                        responses = [
+                            [response.get_solution() if response is not None else None]
+                            for response in responses
+                        ]
 
-                # set weights once every tempo + 1
-                if self.last_update > self.tempo + 1:
-                    total = sum(self.moving_avg_scores)
-                    weights = [score / total for score in self.moving_avg_scores]
-                    bt.logging.info(f"[blue]Setting weights: {weights}[/blue]")
-                    # Update the incentive mechanism on the Bittensor blockchain.
-                    result = self.subtensor.set_weights(
-                        netuid=self.config.netuid,
-                        wallet=self.wallet,
-                        uids=self.metagraph.uids,
-                        weights=weights,
-                        wait_for_inclusion=True,
+                    # Log the results.
+                    bt.logging.info(f"Received responses: {responses}")
+
+                    # Moving averages are updated in round order, so the previous
+                    # round finishes scoring before this one starts.
+                    if scoring is not None:
+                        pending, scoring = scoring, None
+                        await pending
+                    scoring = loop.run_in_executor(
+                        None, self.score_round, puzzles, responses, optimal_lengths
                     )
-                    self.metagraph.sync()
-                time.sleep(5)
+                    await self.update_chain_state()
+                    await asyncio.sleep(max(0.0, self.config.round_interval - (loop.time() - started)))
 
-            except RuntimeError as e:
-                bt.logging.error(e)
-                traceback.print_exc()
+                except RuntimeError as e:
+                    bt.logging.error(e)
+                    traceback.print_exc()
+        finally:
+            producer.cancel()
 
-            except KeyboardInterrupt:
-                bt.logging.success("Keyboard interrupt detected. Exiting validator.")
-                exit()
+    def run(self):
+        # The Main Validation Loop.
+        bt.logging.info("Starting validator loop.")
+        try:
+            asyncio.run(self.run_rounds())
+        except KeyboardInterrupt:
+            bt.logging.success("Keyboard interrupt detected. Exiting validator.")
+            exit()
 
 
 # Run the validator.